@@ -0,0 +1 @@
+"""Benchmarks for the engine hot paths; run with `python -m benchmarks.run`."""
@@ -0,0 +1,440 @@
+"""Headless benchmark suite for the engine hot paths.
+
+    python -m benchmarks.run                          # all benchmarks, table on stdout
+    python -m benchmarks.run --save out.json          # keep the results
+    python -m benchmarks.run --compare benchmarks/baselines/reference.json
+
+Every benchmark uses fixed seeds, a fixed mid-shoe composition and one of the fixed
+rule sets below. Each reports throughput (units/s), per-call latency percentiles and the
+peak memory traced during one call. --compare flags every benchmark whose throughput
+fell by more than --threshold against a saved run and exits with status 1; so does any
+benchmark whose p99 call latency is over its budget (e.g. one GUI keypress).
+"""
+
+import argparse, itertools, json, math, os, platform, random, sys, time, tracemalloc
+
+from blackjack_core.cards import CARD_ORDER, Hand, Shoe, copy_counts, draw_one, hand_total
+from blackjack_core.cli import parse_rules
+from blackjack_core.counting import SYSTEMS, CountState, shoe_counts
+
+RULESETS = {
+    "6D-H17-DAS-LS":   (6, parse_rules("H17,DAS,LS")),
+    "8D-S17-ENHC-OBO": (8, parse_rules("S17,ENHC,OBO,LS=0")),
+    "1D-H17-6:5":      (1, parse_rules("H17,DAS=0,LS=0,BJ32=0")),
+}
+SEED = 20240601
+
+KEYPRESS_BUDGET_MS = 16.0   # one 60 Hz frame: card entry must keep up with the keyboard
+IMPORT_BUDGET_MS = 25.0     # engine import in a fresh interpreter (a pool worker, a CLI run)
+
+BENCHMARKS = []   # (name, unit, per_ruleset, budget_ms, setup)
+
+def bench(name, unit, per_ruleset=True, budget_ms=None):
+    """Register setup(decks, rules, quick) -> fn; fn() does one call and returns the units
+    it processed, or (units, seconds) when it times itself (e.g. work in a subprocess).
+    setup may return a string instead: the reason the benchmark is skipped. With
+    budget_ms, a p99 call latency above it fails the run."""
+    def deco(setup):
+        BENCHMARKS.append((name, unit, per_ruleset, budget_ms, setup))
+        return setup
+    return deco
+
+def mid_shoe(decks, frac=0.2, seed=SEED):
+    """Fixed composition with `frac` of the shoe already dealt."""
+    rnd = random.Random(seed)
+    counts = shoe_counts(decks)
+    for _ in range(int(decks*52*frac)):
+        draw_one(counts, rnd)
+    return counts
+
+def sample_hands(n, seed=SEED):
+    rnd = random.Random(seed)
+    ups = ['2', '3', '4', '5', '6', '7', '8', '9', 'T', 'A']
+    return [((rnd.choice(CARD_ORDER), rnd.choice(CARD_ORDER)), rnd.choice(ups)) for _ in range(n)]
+
+# --------- Import time ---------
+def import_time(module):
+    """fn() importing `module` in a fresh interpreter; the time is its own cumulative
+    entry in -X importtime, so interpreter startup and site are not counted. The package
+    is byte-compiled first: an installed package does not recompile its sources."""
+    import compileall, subprocess
+    cmd = [sys.executable, "-X", "importtime", "-c", f"import {module}"]
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    compileall.compile_dir(os.path.join(root, "blackjack_core"), quiet=1)
+    def fn():
+        err = subprocess.run(cmd, cwd=root, capture_output=True, text=True, check=True).stderr
+        line = next(l for l in err.splitlines() if l.rstrip().endswith(f"| {module}"))
+        return 1, int(line.split("|")[1])/1e6
+    return fn
+
+@bench("import_core", "imports", per_ruleset=False, budget_ms=IMPORT_BUDGET_MS)
+def _import_core(decks, rules, quick):
+    return import_time("blackjack_core")
+
+@bench("import_simulate", "imports", per_ruleset=False, budget_ms=IMPORT_BUDGET_MS)
+def _import_simulate(decks, rules, quick):
+    # everything simulate_ev needs: what every pool worker imports
+    return import_time("blackjack_core.simulate")
+
+# --------- Micro benchmarks ---------
+@bench("draw_one", "draws", per_ruleset=False)
+def _draw_one(decks, rules, quick):
+    full = shoe_counts(6); rnd = random.Random(SEED)
+    def fn():
+        counts = copy_counts(full)
+        for _ in range(234):
+            draw_one(counts, rnd)
+        return 234
+    return fn
+
+@bench("shoe_draw", "draws", per_ruleset=False)
+def _shoe_draw(decks, rules, quick):
+    shoe = Shoe(shoe_counts(6)); snap = shoe.snapshot(); rnd = random.Random(SEED)
+    def fn():
+        shoe.restore(snap)
+        for _ in range(234):
+            shoe.draw(rnd)
+        return 234
+    return fn
+
+@bench("hand_total", "hands", per_ruleset=False)
+def _hand_total(decks, rules, quick):
+    rnd = random.Random(SEED)
+    hands = [[rnd.choice(CARD_ORDER) for _ in range(rnd.randint(2, 5))] for _ in range(1000)]
+    def fn():
+        for h in hands:
+            hand_total(h)
+        return len(hands)
+    return fn
+
+@bench("hand_add", "cards", per_ruleset=False)
+def _hand_add(decks, rules, quick):
+    rnd = random.Random(SEED)
+    hands = [[rnd.choice(CARD_ORDER) for _ in range(rnd.randint(2, 5))] for _ in range(1000)]
+    n = sum(map(len, hands))
+    def fn():
+        for h in hands:
+            Hand(h)
+        return n
+    return fn
+
+@bench("count_add_undo", "cards", per_ruleset=False)
+def _count_add_undo(decks, rules, quick):
+    # the engine side of update_all: one card in, every table value read, card out
+    st = CountState(6, 75)
+    names = [name for name, _ in SYSTEMS]
+    ranks = [r for r, _ in sample_hands(500)]
+    def fn():
+        for a, b in ranks:
+            st.add(a)
+            den = st.decks_remaining()
+            for name in names:
+                math.floor(st.running(name)/den)
+            st.insurance_ev(); st.shoe_progress()
+            st.undo()
+        return len(ranks)
+    return fn
+
+# --------- Simulation ---------
+@bench("simulate_ev", "hands")
+def _simulate_ev(decks, rules, quick):
+    from blackjack_core.simulate import simulate_ev
+    rem = mid_shoe(decks); hands = 1000 if quick else 4000
+    def fn():
+        simulate_ev(rem, rules, hands=hands, seed=SEED, tc_floor=1)
+        return hands
+    return fn
+
+@bench("simulate_ev_telemetry", "hands")
+def _simulate_ev_telemetry(decks, rules, quick):
+    # same run as simulate_ev, instrumented: the difference is the cost of telemetry
+    from blackjack_core.simulate import simulate_ev
+    from blackjack_core.telemetry import Telemetry, instrument
+    rem = mid_shoe(decks); hands = 1000 if quick else 4000
+    def fn():
+        with instrument(Telemetry(hands)):
+            simulate_ev(rem, rules, hands=hands, seed=SEED, tc_floor=1)
+        return hands
+    return fn
+
+@bench("simulate_ev_numpy", "hands")
+def _simulate_ev_numpy(decks, rules, quick):
+    from blackjack_core.vectorized import numpy_available
+    if not numpy_available(): return "NumPy not installed"
+    from blackjack_core.simulate import simulate_ev
+    rem = mid_shoe(decks); hands = 20000 if quick else 100000
+    def fn():
+        simulate_ev(rem, rules, hands=hands, seed=SEED, tc_floor=1, engine="numpy")
+        return hands
+    return fn
+
+@bench("simulate_fixed_action", "hands")
+def _simulate_fixed_action(decks, rules, quick):
+    from blackjack_core.simulate import simulate_fixed_action
+    rem = mid_shoe(decks); hands = 1000 if quick else 4000
+    def fn():
+        for force in ('STAND', 'HIT', 'DOUBLE'):
+            simulate_fixed_action(rem, rules, ['T', '6'], 'T', hands=hands, seed=SEED, force=force)
+        return 3*hands
+    return fn
+
+@bench("game", "rounds")
+def _game(decks, rules, quick):
+    from blackjack_core.game import game_sums, DEFAULT_RAMP
+    rounds = 2000 if quick else 10000
+    def fn():
+        return int(game_sums(rules, decks, 75, rounds, SEED, DEFAULT_RAMP)[0])
+    return fn
+
+# --------- Workflows ---------
+@bench("advisor", "hands")
+def _advisor(decks, rules, quick):
+    # what the Advisor button computes: pair split, index override, basic action
+    from blackjack_core.strategy import compile_strategy
+    hands = sample_hands(1000)
+    def fn():
+        strat = compile_strategy(rules)
+        for (a, b), up in hands:
+            t, soft = hand_total((a, b))
+            pair = ('T' if a in 'TJQK' else a) == ('T' if b in 'TJQK' else b)
+            if not (pair and strat.split('T' if a in 'TJQK' else a, up)):
+                strat.override(t, soft, up, True, True, 1) or strat.action(t, soft, up, True)
+        return len(hands)
+    return fn
+
+@bench("compare_exact", "hands")
+def _compare_exact(decks, rules, quick):
+    # one Compare (exact) on a cold cache, as after every new card: p50/p99 are per spot
+    from blackjack_core.exact import exact_action_evs
+    from blackjack_core.dealer import dealer_dist
+    rem = mid_shoe(decks)
+    hands = itertools.cycle(sample_hands(4 if quick else 12, seed=SEED + 1))
+    def fn():
+        cards, up = next(hands)
+        dealer_dist.cache_clear()
+        exact_action_evs(rem, rules, list(cards), up)
+        return 1
+    return fn
+
+@bench("chart_column", "cells", per_ruleset=False)
+def _chart_column(decks, rules, quick):
+    # one upcard column of the strategy chart (33 cells, every action) on a cold cache
+    from blackjack_core.chart import _chart_column, chart_rows
+    from blackjack_core.dealer import comp10
+    comp = comp10(mid_shoe(decks))
+    def fn():
+        _chart_column(comp, rules, 8)
+        return len(chart_rows())
+    return fn
+
+@bench("bankroll_sweep", "rounds", per_ruleset=False)
+def _bankroll_sweep(decks, rules, quick):
+    # three Kelly fractions on shared random numbers: trajectories x rounds simulated
+    from blackjack_core.vectorized import numpy_available
+    if not numpy_available(): return "NumPy not installed"
+    from blackjack_core.bankroll import kelly_sweep
+    trials = 5000 if quick else 20000; rounds = 20000
+    def fn():
+        kelly_sweep(0.0185, 28.5, (1.0, 0.5, 0.25), rounds, trials=trials, seed=SEED)
+        return 3*trials*rounds
+    return fn
+
+@bench("calibrate_eor", "hands")
+def _calibrate_eor(decks, rules, quick):
+    from blackjack_core.simulate import calibrate_eor
+    rem = mid_shoe(decks); hands = 1000 if quick else 2000
+    def fn():
+        calibrate_eor(rem, rules, hands=hands, seed=SEED)
+        return hands + sum(max(2000, hands//2) for r in CARD_ORDER if rem[r] > 0)
+    return fn
+
+@bench("calibrate_eor_crn", "rounds")
+def _calibrate_eor_crn(decks, rules, quick):
+    from blackjack_core.simulate import calibrate_eor_crn
+    rem = mid_shoe(decks); hands = 100 if quick else 400
+    def fn():
+        calibrate_eor_crn(rem, rules, hands=hands, seed=SEED)
+        return hands
+    return fn
+
+def gui_app():
+    """(root, ProApp) on a hidden window, or the reason there is none (no display)."""
+    try:
+        import tkinter as tk
+        root = tk.Tk(); root.withdraw()
+    except Exception as e:
+        return f"no display ({type(e).__name__})"
+    gui = gui_module()
+    if isinstance(gui, str): return gui
+    return root, gui.ProApp(root)
+
+def gui_module():
+    """The GUI module (no window is opened), or the reason it cannot be imported."""
+    try:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        import blackjack_counter_gui_pro as gui
+    except ImportError as e:
+        return f"no tkinter ({e})"
+    return gui
+
+@bench("keypress_headless", "keys", per_ruleset=False, budget_ms=KEYPRESS_BUDGET_MS)
+def _keypress_headless(decks, rules, quick):
+    # what `keypress` times minus the Treeview calls: the card into the CountState, the
+    # rows update_all computes (count_view) and the cells show_row would push
+    gui = gui_module()
+    if isinstance(gui, str): return gui
+    st = CountState(decks, 75)
+    ranks = itertools.cycle(a for (a, _), _ in sample_hands(50))
+    eor = ({r: 0.01 for r in CARD_ORDER}, shoe_counts(decks))
+    shown = {}
+    def fn():
+        if st.seen_total > 100: st.reset()
+        st.add(next(ranks))
+        main, seen, remaining, progress = gui.count_view(st, decks, rules, True, eor)
+        for key, values in itertools.chain(main.items(), (("Seen", seen), ("Remaining", remaining), ("progress", (progress,)))):
+            if shown.get(key) != values:
+                gui.changed_cells(shown.get(key), values)
+                shown[key] = values
+        return 1
+    return fn
+
+@bench("update_all", "refreshes", per_ruleset=False)
+def _update_all(decks, rules, quick):
+    # a burst of 100 card entries and the one refresh they coalesce into; needs a display
+    app = gui_app()
+    if isinstance(app, str): return app
+    root, app = app
+    ranks = [a for (a, _), _ in sample_hands(50)]
+    def fn():
+        for r in ranks:
+            app.add_card(r)
+        for _ in ranks:
+            app.undo()
+        root.update_idletasks()
+        return 2*len(ranks)
+    return fn
+
+@bench("keypress", "keys", per_ruleset=False, budget_ms=KEYPRESS_BUDGET_MS)
+def _keypress(decks, rules, quick):
+    # one card entry and its refresh, drawn before the next key: the slow, unbatched case
+    app = gui_app()
+    if isinstance(app, str): return app
+    root, app = app
+    ranks = itertools.cycle(a for (a, _), _ in sample_hands(50))
+    def fn():
+        if app.count.seen_total > 100: app.reset_shoe()
+        app.add_card(next(ranks))
+        root.update_idletasks()
+        return 1
+    return fn
+
+# --------- Runner ---------
+def percentile(sorted_vals, q):
+    return sorted_vals[min(len(sorted_vals) - 1, int(q*len(sorted_vals)))]
+
+def measure(fn, min_time=1.0, min_calls=5, max_calls=100_000):
+    fn()   # warm-up (imports, compiled tables)
+    times = []; units = 0
+    start = time.perf_counter()
+    while len(times) < min_calls or (time.perf_counter() - start < min_time and len(times) < max_calls):
+        t0 = time.perf_counter()
+        done = fn()
+        t = time.perf_counter() - t0
+        if isinstance(done, tuple): done, t = done
+        units += done
+        times.append(t)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    times.sort()
+    per_call = units/len(times)
+    # throughput from the median call: one descheduled call should not read as a regression
+    med = percentile(times, 0.50)
+    return {
+        "calls": len(times), "units_per_call": per_call, "per_sec": per_call/med if med else 0.0,
+        "p50_ms": 1e3*percentile(times, 0.50), "p90_ms": 1e3*percentile(times, 0.90),
+        "p99_ms": 1e3*percentile(times, 0.99), "peak_kib": peak/1024.0,
+    }
+
+def run(quick=False, only=None, min_time=None, out=sys.stdout):
+    min_time = (0.3 if quick else 1.0) if min_time is None else min_time
+    results = {}
+    for name, unit, per_ruleset, budget_ms, setup in BENCHMARKS:
+        for rs in (RULESETS if per_ruleset else [None]):
+            key = name if rs is None else f"{name}/{rs}"
+            if only and not any(o in key for o in only): continue
+            decks, rules = RULESETS[rs or "6D-H17-DAS-LS"]
+            fn = setup(decks, dict(rules), quick)
+            if isinstance(fn, str):
+                results[key] = {"unit": unit, "skipped": fn}
+                print(f"{key:<36} skipped: {fn}", file=out, flush=True)
+                continue
+            r = measure(fn, min_time)
+            r["unit"] = unit
+            if budget_ms is not None:
+                r["budget_ms"] = budget_ms
+                r["over_budget"] = r["p99_ms"] > budget_ms
+            results[key] = r
+            print(f"{key:<36} {r['per_sec']:>12,.0f} {unit + '/s':<12} p50 {r['p50_ms']:9.3f} ms  "
+                  f"p90 {r['p90_ms']:9.3f}  p99 {r['p99_ms']:9.3f}  peak {r['peak_kib']:9.1f} KiB"
+                  + (f"  OVER BUDGET ({budget_ms:g} ms)" if r.get("over_budget") else ""), file=out, flush=True)
+    return results
+
+def machine():
+    return {"python": platform.python_version(), "implementation": platform.python_implementation(),
+            "platform": platform.platform(), "cpus": os.cpu_count(), "time": time.strftime("%Y-%m-%dT%H:%M:%S")}
+
+def compare(new, old, threshold):
+    """Rows (key, old/s, new/s, change) and the keys whose throughput fell by more than threshold."""
+    rows = []; regressions = []
+    for key, r in new.items():
+        o = old.get(key)
+        if not o or "per_sec" not in r or "per_sec" not in o or not o["per_sec"]: continue
+        change = r["per_sec"]/o["per_sec"] - 1.0
+        rows.append((key, o["per_sec"], r["per_sec"], change))
+        if change < -threshold:
+            regressions.append(key)
+    return rows, regressions
+
+def main(argv=None):
+    p = argparse.ArgumentParser(prog="python -m benchmarks.run", description=__doc__.split("\n\n")[0])
+    p.add_argument("-k", "--only", action="append", help="run benchmarks whose name contains this (repeatable)")
+    p.add_argument("--quick", action="store_true", help="smaller workloads and 0.3 s per benchmark")
+    p.add_argument("--min-time", type=float, help="seconds of timed calls per benchmark (default 1.0)")
+    p.add_argument("--save", help="write the results as JSON")
+    p.add_argument("--compare", help="JSON of a previous run to compare against")
+    p.add_argument("--threshold", type=float, default=0.20, help="throughput drop flagged as a regression (default 0.20)")
+    p.add_argument("--list", action="store_true")
+    args = p.parse_args(argv)
+    if args.list:
+        for name, unit, per_ruleset, budget_ms, _ in BENCHMARKS:
+            print(f"{name:<24} {unit:<10} {'per rule set' if per_ruleset else '':<13}"
+                  + (f"p99 <= {budget_ms:g} ms" if budget_ms is not None else ""))
+        return 0
+    results = run(args.quick, args.only, args.min_time)
+    over = [key for key, r in results.items() if r.get("over_budget")]
+    regressions = []
+    doc = {"machine": machine(), "quick": args.quick, "rulesets": {k: [d, r] for k, (d, r) in RULESETS.items()},
+           "results": results}
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(doc, f, indent=1)
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            old = json.load(f)
+        if old.get("quick") != args.quick:
+            print("note: comparing a --quick run with a full one (different workloads)", file=sys.stderr)
+        rows, regressions = compare(results, old["results"], args.threshold)
+        print(f"\nvs {args.compare} ({old['machine'].get('time', '?')}, {old['machine'].get('platform', '?')})")
+        for key, o, n, change in rows:
+            flag = "  REGRESSION" if key in regressions else ""
+            print(f"{key:<36} {o:>12,.0f} -> {n:>12,.0f}  {change:+7.1%}{flag}")
+        if regressions:
+            print(f"{len(regressions)} regression(s) beyond {args.threshold:.0%}", file=sys.stderr)
+    if over:
+        print(f"over latency budget: {', '.join(over)}", file=sys.stderr)
+    return 1 if regressions or over else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""Headless blackjack engine: counting, strategy, exact analysis and simulation.
+
+No tkinter. Submodules load on first use (PEP 562), so `import blackjack_core` is
+nearly free and `from blackjack_core import simulate_ev` pulls in only the modules
+that function needs. NumPy and the process pool are imported lazily as well.
+"""
+
+import importlib
+
+_EXPORTS = {
+    "cards": ("CARD_ORDER", "CARD_INDEX", "DISPLAY", "TEN_RANKS", "RANK_VALUE", "up_to_val",
+              "hand_total", "Hand", "as_hand", "is_blackjack", "copy_counts", "draw_one", "Shoe"),
+    "counting": ("HI_LO", "ZEN", "OMEGA2", "HIOPT2", "SYSTEMS", "INS_THRESH_HILO", "MIN_DECKS_DEN",
+                 "I18_F4", "estimate_base_edge", "slope_for", "shoe_counts", "TagMatrix", "CountState"),
+    "strategy": ("apply_indices_override", "should_split", "hard_action", "soft_action",
+                 "StrategyTables", "rules_key", "compile_strategy",
+                 "base_surrender", "INDEX_ALWAYS", "IndexTable", "load_index_table"),
+    "dealer": ("dealer_play", "DEALER_OUTCOMES", "comp10", "rank10", "dealer_dist",
+               "dealer_outcome_dist", "dealer_outcome_probs", "dealer_probs_by_upcard", "stand_ev_vs"),
+    "play": ("resolve_vs_dealer", "resolve_vs_dealer_stand", "dealer_start", "exact_dealer_result",
+             "play_hand", "play_hand_forced_first"),
+    "exact": ("MAX_SPLIT_DEPTH", "ExactEV", "exact_action_evs"),
+    "simulate": ("simulate_ev", "simulate_ev_sums", "simulate_ev_progressive", "PROGRESS_CHUNK", "mean_var", "simulate_one_hand", "calibrate_eor",
+                 "calibrate_eor_crn", "CRN_CHUNK", "eor_crn_sums", "ReplayShoe", "simulate_fixed_action",
+                 "simulate_actions", "fixed_action_sums"),
+    "parallel": ("default_workers", "spawn_seeds", "split_hands", "merge_sums", "get_pool",
+                 "warm_pool", "shutdown_pools", "run_tasks", "iter_tasks"),
+    "cache": ("default_cache_path", "result_key", "ResultCache", "result_cache", "cached_result",
+              "spot_key", "MemoCache"),
+    "game": ("DEFAULT_RAMP", "DealtShoe", "ramp_table", "parse_ramp", "game_sums", "game_stats", "simulate_game"),
+    "indexgen": ("index_cells", "index_sums", "crossover", "generate_indices"),
+    "vectorized": ("numpy_available", "simulate_ev_np", "simulate_ev_np_sums"),
+    "telemetry": ("COUNTERS", "PHASES", "Telemetry", "instrument"),
+    "jobs": ("Job", "JobScheduler"),
+    "sysmetrics": ("REFERENCE_EOR", "PLAYS", "tags10", "correlation", "play_effects", "evaluate_systems",
+                   "parse_tags"),
+    "chart": ("chart_rows", "row_label", "basic_play", "strategy_chart", "shoe_at_tc"),
+    "betting": ("CARDS_PER_ROUND", "VAR_PER_ROUND", "tc_histogram", "tc_histogram_sums", "linear_tc_model",
+                "simulated_tc_model", "ramp_stats", "ramp_pairs", "optimize_ramp"),
+    "bankroll": ("TRIALS", "round_moments", "kelly_bankroll", "simulate_bankrolls", "kelly_sweep"),
+}
+_WHERE = {name: mod for mod, names in _EXPORTS.items() for name in names}
+
+__all__ = sorted(_WHERE)
+
+def __getattr__(name):
+    mod = _WHERE.get(name)
+    if mod is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{mod}", __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
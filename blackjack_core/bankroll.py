@@ -0,0 +1,128 @@
+"""Bankroll simulator: risk of ruin, drawdowns and time to double over a finite horizon.
+
+Trajectories advance `step` rounds at a time: the sum of that many rounds is drawn as a
+normal with the ramp's per-round mean and variance (betting.ramp_stats), and the
+chance that the path touched zero (ruin) or the goal inside a step is added with the
+Brownian-bridge crossing probability, so a coarse step does not hide ruins. All
+bankrolls of a sweep ride the same random numbers, which keeps a sweep smooth and
+costs one array pass: with NumPy, 20,000 trajectories of 100,000 rounds take well
+under a second per bankroll.
+
+Rounds are independent given their TC, so the autocorrelation of the count within a
+shoe is ignored; it matters far less than the sample size.
+"""
+
+import math, random
+
+from .vectorized import numpy_available
+
+TRIALS = 20_000
+STEP = 100               # rounds per step (about an hour at a full table)
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+def round_moments(freq, model, bets):
+    """(mean, variance) per round in units of a bet ramp: bets {tc: units} or game ramp pairs."""
+    from .betting import ramp_stats
+    if not isinstance(bets, dict):
+        from .game import ramp_table, RAMP_TC_MIN
+        table = ramp_table(bets)
+        bets = {tc: table[tc - RAMP_TC_MIN] for tc in freq}
+    st = ramp_stats(bets, freq, model)
+    return st["win_rate"]/100.0, (st["sd"]/10.0)**2
+
+def kelly_bankroll(mean, var, fraction=1.0):
+    """Bankroll (units) for which a fixed one-unit ramp bets `fraction` of the Kelly unit."""
+    return var/(fraction*mean) if mean > 0 else math.inf
+
+def _steps(rounds, step):
+    return [step]*(int(rounds)//step) + ([int(rounds) % step] if int(rounds) % step else [])
+
+def _quantile(values, q):
+    """Nearest-rank quantile of a sorted list (infinite values allowed)."""
+    return values[max(0, math.ceil(q*len(values)) - 1)] if values else math.nan
+
+# A Brownian path from x to x1 (both above the barrier) over variance v touches it with
+# probability exp(-2*d0*d1/v), d the distances to it: with E ~ Exp(1), touched iff
+# d0*d1 < v*E/2. Ending past the barrier gives d1 = 0 and counts as touched.
+def _paths_np(mean, var, banks, steps, trials, goal, seed):
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    b0 = np.asarray(banks, dtype=float)[:, None]
+    x = np.repeat(b0, trials, axis=1); top = goal*b0
+    peak = x.copy(); dd = np.zeros_like(x)
+    alive = np.ones(x.shape, dtype=bool); reached = np.zeros(x.shape, dtype=bool)
+    ruin_t = np.full(x.shape, np.inf); goal_t = np.full(x.shape, np.inf)
+    t = 0
+    for k in steps:
+        t += k; hv = 0.5*k*var
+        x1 = x + (k*mean + math.sqrt(k*var)*rng.standard_normal(trials))
+        e_low = hv*rng.standard_exponential(trials); e_up = hv*rng.standard_exponential(trials)
+        hit = alive & (x*np.maximum(x1, 0.0) < e_low)
+        alive &= ~hit
+        np.copyto(ruin_t, t, where=hit)
+        up = alive & ~reached & ((top - x)*np.maximum(top - x1, 0.0) < e_up)
+        reached |= up
+        np.copyto(goal_t, t, where=up)
+        x = x1*alive
+        np.maximum(peak, x, out=peak); np.maximum(dd, peak - x, out=dd)
+    return [(ruin_t[i].tolist(), goal_t[i].tolist(), dd[i].tolist(), x[i].tolist()) for i in range(len(banks))]
+
+def _paths_py(mean, var, banks, steps, trials, goal, seed):
+    rnd = random.Random(seed)
+    draws = [[(rnd.gauss(0.0, 1.0), rnd.expovariate(1.0), rnd.expovariate(1.0)) for _ in range(trials)]
+             for _ in steps]
+    out = []
+    for b in banks:
+        top = goal*b
+        ruin_t, goal_t, dds, final = [], [], [], []
+        for i in range(trials):
+            x = peak = float(b); dd = 0.0; rt = gt = math.inf; t = 0
+            for k, row in zip(steps, draws):
+                z, e_low, e_up = row[i]
+                t += k; hv = 0.5*k*var
+                x1 = x + k*mean + math.sqrt(k*var)*z
+                if x*max(x1, 0.0) < hv*e_low:
+                    rt = t; x = 0.0; dd = max(dd, peak); break
+                if gt == math.inf and (top - x)*max(top - x1, 0.0) < hv*e_up:
+                    gt = t
+                x = x1; peak = max(peak, x); dd = max(dd, peak - x)
+            ruin_t.append(rt); goal_t.append(gt); dds.append(dd); final.append(x)
+        out.append((ruin_t, goal_t, dds, final))
+    return out
+
+def simulate_bankrolls(mean, var, bankrolls, rounds, trials=TRIALS, step=STEP, goal=2.0, seed=2024,
+                       engine="auto", quantiles=QUANTILES):
+    """Finite-horizon outcomes of a one-unit ramp with per-round (mean, var) for each bankroll.
+
+    Returns one dict per bankroll: "ror" (ruined within `rounds`), "ror_inf" (the
+    infinite-horizon exp(-2*mean*B/var)), "drawdown" {q: largest peak-to-trough fall,
+    units}, "final" {q: bankroll at the end, units} and "final_mean", "doubled" (reached
+    goal x the start) and "to_double" {q: rounds until then, inf if not reached}.
+    """
+    steps = _steps(rounds, max(1, int(step)))
+    engine = "numpy" if engine == "auto" and numpy_available() else engine
+    paths = (_paths_np if engine == "numpy" and numpy_available() else _paths_py)(
+        mean, var, list(bankrolls), steps, int(trials), goal, seed)
+    out = []
+    for b, (ruin_t, goal_t, dds, final) in zip(bankrolls, paths):
+        n = len(final)
+        ruin_t = sorted(ruin_t); goal_t = sorted(goal_t); dds = sorted(dds); final = sorted(final)
+        out.append({
+            "bankroll": b, "rounds": int(rounds), "trials": n,
+            "ror": sum(1 for t in ruin_t if t < math.inf)/n,
+            "ror_inf": (math.exp(-2.0*mean*b/var) if mean > 0 else 1.0),
+            "drawdown": {q: _quantile(dds, q) for q in quantiles},
+            "final": {q: _quantile(final, 1.0 - q) for q in quantiles},
+            "final_mean": sum(final)/n,
+            "doubled": sum(1 for t in goal_t if t < math.inf)/n,
+            "to_double": {q: _quantile(goal_t, q) for q in quantiles},
+        })
+    return out
+
+def kelly_sweep(mean, var, fractions, rounds, **kw):
+    """simulate_bankrolls at the bankroll of each Kelly fraction, each result tagged with "kelly"."""
+    fractions = list(fractions)
+    res = simulate_bankrolls(mean, var, [kelly_bankroll(mean, var, f) for f in fractions], rounds, **kw)
+    for f, r in zip(fractions, res):
+        r["kelly"] = f
+    return res
@@ -0,0 +1,187 @@
+"""Bet-spread optimizer: TC frequencies from shoe simulation, per-TC EV, best ramp.
+
+The TC histogram counts the betting TC (trunc of running count / decks left to the
+cut, as in `game`) at the start of every round of shuffled shoes dealt to the
+penetration, rounds being CARDS_PER_ROUND cards apart. Shoes go in fixed-size chunks
+seeded with spawn_seeds, NumPy-vectorized when available and spread over the process
+pool, so 10^8 dealt cards take seconds to minutes and a histogram depends on
+(seed, shoes, engine) only. That TC runs high late in the shoe (its divisor stops at
+the cut), so each bucket also records its mean true count (running count / unseen
+decks), which is what the per-TC EV models are evaluated at.
+
+For a given frequency p_t and per-round EV e_t / variance v_t per TC, the ramps that
+maximize SCORE, or win rate under a risk-of-ruin cap, are Kelly-shaped: bet
+c*e_t/(v_t + e_t^2) units clipped to [1, spread]. The optimizer searches c, then rounds
+the bets to the table's betting step and reports the ramp in `game`'s format.
+"""
+
+import math, random
+from itertools import accumulate
+
+from .cards import CARD_ORDER
+from .counting import SYSTEMS, MIN_DECKS_DEN, estimate_base_edge, shoe_counts, slope_for
+from .game import RAMP_TC_MIN, RAMP_TC_MAX
+from .parallel import run_tasks, spawn_seeds
+from .vectorized import numpy_available
+
+CARDS_PER_ROUND = 5.4   # one player and the dealer, splits and doubles included (measured with `game`)
+VAR_PER_ROUND = 1.3     # variance of a one-unit round (units^2), likewise
+HIST_CHUNK = 20_000     # shoes per histogram task
+NB = RAMP_TC_MAX - RAMP_TC_MIN + 1
+
+def _round_starts(decks, pen, cards_per_round):
+    cut = int(decks*52*(pen/100.0))
+    return cut, [int(k*cards_per_round) for k in range(int(math.ceil(cut/cards_per_round)))]
+
+def tc_histogram_sums(decks, pen, tags, shoes, seed, cards_per_round=CARDS_PER_ROUND, engine="python"):
+    """Round counts per TC trunc (RAMP_TC_MIN..RAMP_TC_MAX, tails clamped) over `shoes` shoes,
+    then the sums of the true count per bucket: a list of 2*NB numbers."""
+    cut, starts = _round_starts(decks, pen, cards_per_round)
+    comp = shoe_counts(decks)
+    seq = [tags.get(r, 0) for r in CARD_ORDER for _ in range(comp[r])]
+    dens = [max(MIN_DECKS_DEN, (cut - p)/52.0) for p in starts]
+    unseen = [(len(seq) - p)/52.0 for p in starts]
+    if engine == "numpy" and numpy_available():
+        import numpy as np
+        rng = np.random.default_rng(seed)
+        base = np.array(seq, dtype=np.int8)
+        pos = np.array(starts); den = np.array(dens); left = np.array(unseen)
+        out = np.zeros(NB, dtype=np.int64); tsum = np.zeros(NB)
+        batch = 2048
+        for i in range(0, shoes, batch):
+            b = min(batch, shoes - i)
+            deal = rng.permuted(np.broadcast_to(base, (b, len(base))), axis=1)[:, :cut]
+            rc = np.zeros((b, cut + 1), dtype=np.int16)
+            np.cumsum(deal, axis=1, dtype=np.int16, out=rc[:, 1:])
+            at = rc[:, pos]
+            idx = (np.clip(np.trunc(at/den).astype(np.int64), RAMP_TC_MIN, RAMP_TC_MAX) - RAMP_TC_MIN).ravel()
+            out += np.bincount(idx, minlength=NB)
+            tsum += np.bincount(idx, weights=(at/left).ravel(), minlength=NB)
+        return out.tolist() + tsum.tolist()
+    rnd = random.Random(seed)
+    out = [0]*NB; tsum = [0.0]*NB
+    for _ in range(shoes):
+        rnd.shuffle(seq)
+        rc = list(accumulate(seq[:cut], initial=0))
+        for p, d, u in zip(starts, dens, unseen):
+            t = int(rc[p]/d)
+            k = 0 if t < RAMP_TC_MIN else NB - 1 if t > RAMP_TC_MAX else t - RAMP_TC_MIN
+            out[k] += 1; tsum[k] += rc[p]/u
+    return out + tsum
+
+def tc_histogram(decks, pen, system="Hi-Lo", shoes=100_000, seed=2024, cards_per_round=CARDS_PER_ROUND,
+                 engine="auto", workers=1):
+    """({TC trunc: frequency}, {TC trunc: mean true count}) of round starts for `system`
+    (name or tag map)."""
+    tags = dict(SYSTEMS)[system] if isinstance(system, str) else system
+    engine = "numpy" if engine == "auto" and numpy_available() else engine
+    parts = [HIST_CHUNK]*(int(shoes)//HIST_CHUNK) + ([int(shoes) % HIST_CHUNK] if int(shoes) % HIST_CHUNK else [])
+    tasks = [(decks, pen, tags, n, s, cards_per_round, engine) for n, s in zip(parts, spawn_seeds(seed, len(parts)))]
+    sums = [sum(c) for c in zip(*run_tasks(tc_histogram_sums, tasks, workers))]
+    counts, tsum = sums[:NB], sums[NB:]
+    total = sum(counts)
+    tcs = [tc for tc, c in zip(range(RAMP_TC_MIN, RAMP_TC_MAX + 1), counts) if c]
+    return ({tc: counts[tc - RAMP_TC_MIN]/total for tc in tcs},
+            {tc: tsum[tc - RAMP_TC_MIN]/counts[tc - RAMP_TC_MIN] for tc in tcs})
+
+# --------- Per-TC EV ---------
+def _tc_mid(tc):
+    """Middle of a TC trunc bucket: [t, t+1) above zero, (t-1, t] below, (-1, 1) at zero."""
+    return tc + 0.5 if tc > 0 else tc - 0.5 if tc < 0 else 0.0
+
+def linear_tc_model(rules, decks, system="Hi-Lo", true_tc=None, var=VAR_PER_ROUND, side_ace_used=True):
+    """{tc: (EV per round, variance)} in units from the table's linear model (base edge + slope*TC),
+    at true_tc[tc] (tc_histogram's second dict) or else at the middle of each TC bucket."""
+    base = estimate_base_edge(decks, rules["H17"], rules["DAS"], rules["RSA"], rules["HSA"],
+                              rules["DOUBLE_ON_SPLIT_ACES"], rules["D10"], rules["LS"], rules["PEEK"])
+    slope = slope_for(system, decks, side_ace_used)
+    true_tc = true_tc or {tc: _tc_mid(tc) for tc in range(RAMP_TC_MIN, RAMP_TC_MAX + 1)}
+    return {tc: ((base + slope*t)/100.0, var) for tc, t in true_tc.items()}
+
+def simulated_tc_model(rules, decks, true_tc, system="Hi-Lo", hands=200_000, seed=2024, decks_left=None,
+                       apply_idx=True, workers=1):
+    """{tc: (EV per round, variance)} in units by simulate_ev on a shoe at each true count
+    (true_tc {tc: true count}, as from tc_histogram; see chart.shoe_at_tc)."""
+    from .chart import shoe_at_tc
+    from .counting import HI_LO
+    from .simulate import simulate_ev
+    tags = dict(SYSTEMS)[system] if isinstance(system, str) else system
+    left = decks/2.0 if decks_left is None else decks_left
+    full = shoe_counts(decks)
+    out = {}
+    for (tc, t), s in zip(sorted(true_tc.items()), spawn_seeds(seed, len(true_tc))):
+        rem = shoe_at_tc(decks, t, left, tags)
+        hilo = sum(HI_LO[r]*(full[r] - rem[r]) for r in CARD_ORDER)/left
+        mean, var = simulate_ev(rem, rules, hands=hands, seed=s, tc_floor=math.floor(hilo),
+                                apply_idx=apply_idx, workers=workers)
+        out[tc] = (mean/100.0, var)
+    return out
+
+# --------- Ramp optimization ---------
+def ramp_stats(bets, freq, model, bankroll=None):
+    """Per-round results of betting bets[tc] units: as game_stats (win_rate and sd per 100 rounds)."""
+    mu = m2 = avg = 0.0
+    for tc, p in freq.items():
+        e, v = model[tc]; b = bets[tc]
+        mu += p*b*e; m2 += p*b*b*(v + e*e); avg += p*b
+    var = max(1e-12, m2 - mu*mu)
+    return {
+        "win_rate": 100.0*mu, "sd": 10.0*math.sqrt(var), "avg_bet": avg,
+        "ev_pct": 100.0*mu/avg if avg else 0.0,
+        "score": 1e6*mu*mu/var if mu > 0 else 0.0,
+        "n0": var/(mu*mu) if mu > 0 else math.inf,
+        "ror": (math.exp(-2.0*mu*bankroll/var) if mu > 0 else 1.0) if bankroll else None,
+    }
+
+def ramp_pairs(bets):
+    """bets {tc: units} -> game ramp ((tc, units), ...): the bet of the highest step reached."""
+    tcs = sorted(bets)
+    steps = [(tc, bets[tc]) for i, tc in enumerate(tcs) if i and bets[tc] != bets[tcs[i-1]]]
+    if not steps: return ((0, bets[tcs[0]]),)
+    first = steps[0][0] - 1
+    return ((first, bets[max(t for t in tcs if t <= first)]),) + tuple(steps)
+
+def optimize_ramp(freq, model, spread=8.0, bankroll=None, max_ror=None, objective="score", step=1.0):
+    """Best bet ramp (min bet 1 unit, at most `spread` units) for TC frequencies and a per-TC model.
+
+    objective "score" maximizes SCORE; "win" maximizes the win rate subject to
+    ror <= max_ror for `bankroll` units (without a cap it bets the spread at every
+    positive EV). Bets are rounded to multiples of `step`. Returns ramp_stats(...) plus
+    "bets" {tc: units}, "ramp" (pairs for game/parse_ramp) and "feasible".
+    """
+    if objective not in ("score", "win"):
+        raise ValueError(f"unknown objective {objective!r}")
+    if objective == "win" and max_ror is not None and not bankroll:
+        raise ValueError("a risk-of-ruin cap needs a bankroll")
+    spread = float(spread)
+    tcs = sorted(tc for tc in freq if tc in model)
+    freq = {tc: freq[tc] for tc in tcs}
+    kelly = {tc: model[tc][0]/(model[tc][1] + model[tc][0]**2) for tc in tcs}
+    def bets_for(c, rounded=False):
+        out = {}; prev = 1.0
+        for tc in tcs:   # a ramp never lowers the bet as the count rises (sparse tails are noisy)
+            b = min(spread, max(prev, c*kelly[tc]))
+            if rounded: b = min(spread, max(prev, step*round(b/step)))
+            out[tc] = prev = b
+        return out
+    def value(bets):
+        st = ramp_stats(bets, freq, model, bankroll)
+        ok = max_ror is None or (st["ror"] is not None and st["ror"] <= max_ror)
+        return (ok, st["score"] if objective == "score" else st["win_rate"]), st
+    # the family is one-dimensional: a coarse log grid in c, then a finer one around the best
+    grid = [10**(k/20.0) for k in range(-20, 101)]
+    best = max(grid, key=lambda c: value(bets_for(c))[0])
+    i = grid.index(best)
+    lo, hi = grid[max(0, i - 1)], grid[min(len(grid) - 1, i + 1)]
+    fine = [lo + (hi - lo)*k/200.0 for k in range(201)]
+    best = max(fine, key=lambda c: value(bets_for(c))[0])
+    # rounding can break the RoR cap: step down until it holds again
+    bets = bets_for(best, rounded=True)
+    (ok, _), st = value(bets)
+    c = best
+    while not ok and c > 1e-3:
+        c *= 0.98
+        bets = bets_for(c, rounded=True)
+        (ok, _), st = value(bets)
+    st.update(bets=bets, ramp=ramp_pairs(bets), feasible=ok)
+    return st
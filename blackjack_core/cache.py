@@ -0,0 +1,173 @@
+"""Persistent on-disk result cache and in-memory memo of decision spots."""
+
+import os, hashlib, struct, threading, atexit
+from collections import OrderedDict
+
+from .cards import CARD_ORDER, TEN_RANKS
+from .dealer import comp10
+
+# --------- Persistent result cache ---------
+# Simulated EV / EOR results survive restarts: one small binary file of LRU-ordered
+# records keyed by a digest of everything that defines the estimate (kind, rules,
+# decks, composition, TC, index flag, hand budget). The cache is best effort: an
+# unreadable or unwritable file just means a miss.
+CACHE_MAGIC, CACHE_VERSION = b"BJRC", 3   # bump when the engine's results change (2, 3: stand/hit indices played, 3 in NumPy too)
+CACHE_MAX_ENTRIES = 512
+
+def default_cache_path():
+    base = os.environ.get("BJ_CACHE_DIR") or os.path.join(
+        os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache"), "blackjack_counter")
+    return os.path.join(base, "results.bin")
+
+def result_key(kind, rules, decks, counts, tc_floor, apply_idx, *extra):
+    """16-byte digest, identical across processes (no PYTHONHASHSEED dependence)."""
+    parts = [kind, ",".join(f"{k}={int(bool(v))}" for k, v in sorted(rules.items())), str(int(decks)),
+             ",".join(str(int(counts.get(r,0))) for r in CARD_ORDER), str(int(tc_floor)), str(int(bool(apply_idx)))]
+    parts += [str(x) for x in extra]
+    return hashlib.blake2b("|".join(parts).encode(), digest_size=16).digest()
+
+class ResultCache:
+    """Size-bounded LRU of float tuples persisted to `path`.
+
+    File layout: magic, u16 version, then records oldest first:
+    16-byte key, u16 n, n little-endian float64.
+    """
+    _REC = struct.Struct("<16sH")
+
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+        self._dirty = False
+        self._load()
+
+    def __len__(self):
+        return len(self._data)
+
+    def _load(self):
+        try:
+            with open(self.path, "rb") as f:
+                buf = f.read()
+        except OSError:
+            return
+        if len(buf) < 6 or buf[:4] != CACHE_MAGIC or struct.unpack_from("<H", buf, 4)[0] != CACHE_VERSION:
+            return
+        off = 6
+        try:
+            while off < len(buf):
+                key, n = self._REC.unpack_from(buf, off); off += self._REC.size
+                self._data[key] = struct.unpack_from(f"<{n}d", buf, off); off += 8*n
+        except struct.error:
+            pass  # truncated tail: keep the complete records
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            vals = self._data.get(key)
+            if vals is not None:
+                self._data.move_to_end(key); self._dirty = True
+            return vals
+
+    def put(self, key, values):
+        with self._lock:
+            self._data[key] = tuple(float(v) for v in values)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+            self._save()
+
+    def flush(self):
+        """Persist LRU order changed by get()."""
+        with self._lock:
+            if self._dirty: self._save()
+
+    def _save(self):
+        out = [CACHE_MAGIC, struct.pack("<H", CACHE_VERSION)]
+        for key, vals in self._data.items():
+            out.append(self._REC.pack(key, len(vals)))
+            out.append(struct.pack(f"<{len(vals)}d", *vals))
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(tmp, "wb") as f:
+                f.write(b"".join(out))
+            os.replace(tmp, self.path)
+            self._dirty = False
+        except OSError:
+            pass
+
+_RESULT_CACHE = None
+
+def result_cache():
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None:
+        _RESULT_CACHE = ResultCache(default_cache_path())
+        atexit.register(_RESULT_CACHE.flush)
+    return _RESULT_CACHE
+
+def cached_result(kind, key_args, compute, cache=None):
+    """(values, from_cache): the stored tuple for this key, else compute() stored as floats.
+    A compute() that returns None (a cancelled run) gives (None, False) and stores nothing."""
+    cache = result_cache() if cache is None else cache
+    key = result_key(kind, *key_args)
+    vals = cache.get(key)
+    if vals is not None:
+        return vals, True
+    vals = compute()
+    if vals is None:
+        return None, False
+    vals = tuple(vals)
+    cache.put(key, vals)
+    return vals, False
+
+# --------- In-memory memo of decision spots ---------
+# Advisor and Compare answers for a spot: the hand and upcard with tens collapsed, the
+# remaining composition as a 10-rank tuple (J/Q/K removals are the same shoe for play),
+# the rules and whatever else the answer depends on (TC, index flag, mode, budget).
+MEMO_MAX_ENTRIES = 256
+
+def spot_key(kind, cards, up, counts, rules, *extra):
+    ten = lambda r: 'T' if r in TEN_RANKS else r
+    return (kind, tuple(sorted(ten(r) for r in cards)), ten(up),
+            comp10(counts) if counts is not None else None,
+            tuple(sorted((k, bool(v)) for k, v in rules.items()))) + extra
+
+class MemoCache:
+    """Size-bounded in-memory LRU with hit/miss counters; safe to share between threads."""
+
+    def __init__(self, max_entries=MEMO_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            value = self._data.get(key)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1; self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear(); self.hits = self.misses = 0
+
+    def summary(self):
+        with self._lock:
+            total = self.hits + self.misses
+            rate = f" ({self.hits/total:.0%})" if total else ""
+            return f"{self.hits} hits / {self.misses} misses{rate}, {len(self._data)}/{self.max_entries} entries"
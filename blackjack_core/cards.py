@@ -0,0 +1,149 @@
+"""Cards, hands and the simulation shoe."""
+
+CARD_ORDER = ['2','3','4','5','6','7','8','9','T','J','Q','K','A']
+CARD_INDEX = {r:i for i,r in enumerate(CARD_ORDER)}
+DISPLAY = {'2':'2','3':'3','4':'4','5':'5','6':'6','7':'7','8':'8','9':'9','T':'10','J':'J','Q':'Q','K':'K','A':'A'}
+
+TEN_RANKS = ('T','J','Q','K')
+
+# --------- Utils ---------
+RANK_VALUE = {'2':2,'3':3,'4':4,'5':5,'6':6,'7':7,'8':8,'9':9,'T':10,'J':10,'Q':10,'K':10,'A':11}
+
+def up_to_val(up):
+    return 11 if up=='A' else 10 if up in TEN_RANKS else int(up)
+
+def hand_total(cards):
+    total = sum(11 if c=='A' else 10 if c in TEN_RANKS else int(c) for c in cards)
+    aces = sum(1 for c in cards if c=='A')
+    while total > 21 and aces > 0:
+        total -= 10
+        aces -= 1
+    soft = (aces > 0)  # at least one Ace still counts as 11
+    return total, soft
+
+class Hand:
+    """Incremental hand state: same (total, soft) as hand_total, updated in O(1) per card.
+
+    `soft` is 0/1 (at most one Ace can count as 11); `pair` is the ten-folded rank of a
+    two-card pair, else None.
+    """
+    __slots__ = ("total", "soft", "n", "first", "pair")
+
+    def __init__(self, cards=()):
+        self.total = 0; self.soft = 0; self.n = 0; self.first = None; self.pair = None
+        for c in cards:
+            self.add(c)
+
+    def add(self, c):
+        t = self.total + RANK_VALUE[c]
+        s = self.soft + 1 if c == 'A' else self.soft
+        while t > 21 and s:
+            t -= 10; s -= 1
+        self.total = t; self.soft = s
+        n = self.n
+        if n == 0:
+            self.first = c
+        elif n == 1:
+            r1 = 'T' if self.first in TEN_RANKS else self.first
+            self.pair = r1 if r1 == ('T' if c in TEN_RANKS else c) else None
+        else:
+            self.pair = None
+        self.n = n + 1
+        return self
+
+    def copy(self):
+        h = Hand.__new__(Hand)
+        h.total = self.total; h.soft = self.soft; h.n = self.n; h.first = self.first; h.pair = self.pair
+        return h
+
+    @property
+    def blackjack(self):
+        return self.n == 2 and self.total == 21
+
+def as_hand(cards):
+    return cards if isinstance(cards, Hand) else Hand(cards)
+
+def is_blackjack(cards):
+    return len(cards)==2 and ('A' in cards) and any(c in TEN_RANKS for c in cards)
+
+def copy_counts(rem):
+    return {r:int(rem.get(r,0)) for r in CARD_ORDER}
+
+def draw_one(counts, rnd):
+    tot = sum(counts[r] for r in CARD_ORDER)
+    if tot<=0: return 'T'
+    pick = rnd.randrange(tot)
+    s=0
+    for r in CARD_ORDER:
+        s += counts[r]
+        if pick < s:
+            counts[r]-=1
+            return r
+    return 'T'
+
+class Shoe:
+    """Unseen cards as a fixed 13-slot array (CARD_ORDER) with a running total.
+
+    A Fenwick (binary indexed) tree over the slots turns a weighted draw into an
+    O(log n) prefix search; for a given `rnd` it returns the same card as draw_one.
+    snapshot()/restore() copy three small lists, so a simulation resets the shoe per
+    hand instead of allocating a new dict.
+    """
+    __slots__ = ("counts", "total", "_tree")
+    _STEPS = (8, 4, 2, 1)   # binary lifting over 13 slots
+
+    def __init__(self, counts=None):
+        self.counts = [int(counts.get(r, 0)) if counts else 0 for r in CARD_ORDER]
+        self.total = sum(self.counts)
+        tree = [0]*14
+        for i, c in enumerate(self.counts, 1):
+            tree[i] += c
+            j = i + (i & -i)
+            if j <= 13: tree[j] += tree[i]
+        self._tree = tree
+
+    def get(self, r, default=0):
+        i = CARD_INDEX.get(r)
+        return default if i is None else self.counts[i]
+
+    __getitem__ = get
+
+    def as_dict(self):
+        return dict(zip(CARD_ORDER, self.counts))
+
+    def remove(self, r):
+        """Take one known card out of the shoe (ignored if none left)."""
+        i = CARD_INDEX[r]
+        if self.counts[i] <= 0: return False
+        self._dec(i)
+        return True
+
+    def _dec(self, i):
+        self.counts[i] -= 1
+        self.total -= 1
+        tree = self._tree
+        i += 1
+        while i <= 13:
+            tree[i] -= 1
+            i += i & -i
+
+    def draw(self, rnd):
+        if self.total <= 0: return 'T'
+        rem = rnd.randrange(self.total)
+        tree = self._tree
+        pos = 0
+        for step in self._STEPS:
+            nxt = pos + step
+            if nxt <= 13 and tree[nxt] <= rem:
+                pos = nxt
+                rem -= tree[nxt]
+        self._dec(pos)
+        return CARD_ORDER[pos]
+
+    def snapshot(self):
+        return (self.counts[:], self.total, self._tree[:])
+
+    def restore(self, snap):
+        self.counts[:] = snap[0]
+        self.total = snap[1]
+        self._tree[:] = snap[2]
@@ -0,0 +1,478 @@
+"""Command-line entry points: `python -m blackjack_core <command> ...`."""
+
+import argparse, sys
+
+from .counting import SYSTEMS
+
+# Same defaults as the GUI's rule checkboxes
+DEFAULT_RULES = {
+    "H17": True, "DAS": True, "RSA": True, "HSA": False, "DOUBLE_ON_SPLIT_ACES": True,
+    "D10": False, "PEEK": True, "OBO": False, "BJ_3_2": True, "LS": True,
+}
+RULE_ALIASES = {"DOS": "DOUBLE_ON_SPLIT_ACES", "BJ32": "BJ_3_2", "ENHC": "!PEEK", "S17": "!H17"}
+
+def parse_rules(text, base=DEFAULT_RULES):
+    """Rules dict from "H17=0,LS=1,ENHC" style overrides of `base` (bare name = on)."""
+    rules = dict(base)
+    for item in filter(None, (t.strip() for t in (text or "").split(","))):
+        key, _, val = item.partition("=")
+        key = RULE_ALIASES.get(key.strip().upper(), key.strip().upper())
+        on = val.strip().lower() not in ("0", "false", "no", "off") if val else True
+        if key.startswith("!"):
+            key, on = key[1:], not on
+        if key not in rules:
+            raise argparse.ArgumentTypeError(f"unknown rule {key!r} (known: {', '.join(sorted(rules))})")
+        rules[key] = on
+    return rules
+
+def add_shoe_args(p):
+    p.add_argument("--decks", type=int, default=6)
+    p.add_argument("--rules", type=parse_rules, default=dict(DEFAULT_RULES),
+                   help="overrides, e.g. 'S17,LS=0,ENHC,OBO' (defaults: GUI defaults)")
+
+def _open_in(path):
+    return sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+
+def _open_out(path):
+    return sys.stdout if path == "-" else open(path, "w", encoding="utf-8", newline="")
+
+def cmd_replay(args):
+    from .replay import replay, WRITERS
+    errors = []
+    src = _open_in(args.input); out = _open_out(args.output)
+    try:
+        rows = replay(src, args.rules, decks=args.decks, pen=args.pen, side_ace_used=args.ace_side_count, errors=errors)
+        WRITERS[args.format](rows, out)
+    finally:
+        if src is not sys.stdin: src.close()
+        if out is not sys.stdout: out.close()
+    for shoe, msg in errors[:20]:
+        print(f"shoe {shoe}: {msg}", file=sys.stderr)
+    if len(errors) > 20:
+        print(f"... {len(errors) - 20} more problems", file=sys.stderr)
+    return 1 if errors and args.strict else 0
+
+def cmd_game(args):
+    from .game import simulate_game, DEFAULT_RAMP
+    from .parallel import default_workers
+    if args.rounds < 1:
+        print("--rounds must be at least 1", file=sys.stderr); return 2
+    ramps = args.ramp or DEFAULT_RAMP
+    if args.ramp_for:
+        ramps = {name: ramps for name, _ in SYSTEMS}
+        for name, ramp in args.ramp_for:
+            if name not in ramps:
+                print(f"unknown system {name!r} (known: {', '.join(ramps)})", file=sys.stderr)
+                return 2
+            ramps[name] = ramp
+    workers = args.workers or default_workers()
+    def progress(done, total):
+        print(f"\r{done:,}/{total:,} rounds", end="", file=sys.stderr, flush=True)
+    indices = None
+    if args.indices:
+        from .strategy import load_index_table
+        indices = load_index_table(args.indices)
+    from .telemetry import Telemetry, instrument
+    tel = Telemetry(args.rounds) if args.telemetry else None
+    with instrument(tel):
+        stats, _ = simulate_game(args.rules, decks=args.decks, pen=args.pen, rounds=args.rounds, seed=args.seed,
+                                 ramps=ramps, apply_idx=not args.no_indices, bankroll=args.bankroll,
+                                 workers=workers, batch=args.batch, progress=None if args.quiet else progress,
+                                 indices=indices)
+    if not args.quiet: print(file=sys.stderr)
+    if tel is not None:
+        tel.save(args.telemetry)
+        if not args.quiet: print(tel.summary(), file=sys.stderr)
+    out = _open_out(args.output)
+    try:
+        if args.format == "json":
+            import json, math
+            clean = {k: {f: (v if math.isfinite(v) else None) for f, v in st.items()} for k, st in stats.items()}
+            json.dump(clean, out, indent=1); out.write("\n")
+        else:
+            flat = stats["flat"]
+            print(f"{flat['rounds']:,} rounds, {flat['shoes']:,} shoes; flat bet EV {flat['ev_pct']:+.3f}% "
+                  f"(± {flat['se']:.3f}), SD {flat['sd']/10:.3f}/round", file=out)
+            print(f"{'system':<10} {'avg bet':>8} {'WR/100':>8} {'± SE':>7} {'SD/100':>8} {'EV %':>7} "
+                  f"{'SCORE':>8} {'N0':>10} {'RoR':>7}", file=out)
+            for name, st in stats.items():
+                if name == "flat": continue
+                print(f"{name:<10} {st['avg_bet']:8.3f} {st['win_rate']:+8.3f} {st['se']:7.3f} {st['sd']:8.2f} "
+                      f"{st['ev_pct']:+7.3f} {st['score']:8.2f} {st['n0']:10.0f} {st['ror']:7.2%}", file=out)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+def cmd_indices(args):
+    from .indexgen import generate_indices
+    from .parallel import default_workers
+    from .strategy import INDEX_ALWAYS
+    def progress(done, total):
+        print(f"\r{done}/{total} tasks", end="", file=sys.stderr, flush=True)
+    table, report = generate_indices(args.rules, system=args.system, decks=args.decks, pen=args.pen,
+                                     per_tc=args.per_tc, seed=args.seed, workers=args.workers or default_workers(),
+                                     tc_den=args.tc_den, progress=None if args.quiet else progress)
+    if not args.quiet: print(file=sys.stderr)
+    if args.output != "-":
+        table.save(args.output)
+    out = sys.stdout
+    names = {'S': 'Stand', 'H': 'Hit', 'D': 'Double', 'SUR': 'Surrender'}
+    print(f"{args.system} indices, {args.decks} decks, TC per decks left {'to the cut' if args.tc_den == 'cut' else 'in the shoe'}", file=out)
+    for cell, res, n in report:
+        if res is None: continue
+        above, idx, x = res
+        if cell is None:
+            print(f"{'Insurance':<14} Take       TC >= {idx:+d}   ({x:+.2f}, {n} samples)", file=out)
+            continue
+        t, soft, up, action, base = cell
+        hand = f"{'A,' + str(t - 11) if soft else t} vs {up}"
+        when = "always" if idx == INDEX_ALWAYS else f"TC {'>=' if above else '<'} {idx:+d}"
+        exact = "" if x is None else f"({x:+.2f}, {n} samples)"
+        print(f"{hand:<14} {names[action]:<10} {when:<10} {exact}  [basic: {names[base]}]", file=out)
+    return 0
+
+def cmd_systems(args):
+    import json
+    from .sysmetrics import evaluate_systems, play_effects
+    from .parallel import default_workers
+    tag_sets = list(SYSTEMS) + (args.tags or [])
+    for path in args.file or ():
+        with _open_in(path) as f:
+            doc = json.load(f)
+        tag_sets += list(doc.items()) if isinstance(doc, dict) else [(d["name"], d["tags"]) for d in doc]
+    eor = None
+    if args.eor_hands:
+        from .simulate import calibrate_eor_crn
+        from .counting import shoe_counts
+        _, eor, _ = calibrate_eor_crn(shoe_counts(args.decks), args.rules, hands=args.eor_hands,
+                                      workers=args.workers or default_workers())
+    effects = None if args.no_pe else play_effects(args.rules, args.decks, workers=args.workers or default_workers())
+    try:
+        rows = evaluate_systems(tag_sets, eor=eor, effects=effects)
+    except ValueError as e:
+        print(e, file=sys.stderr); return 2
+    rows = rows[:args.top] if args.top else rows
+    out = _open_out(args.output)
+    try:
+        if args.format == "json":
+            json.dump(rows, out, indent=1); out.write("\n")
+        else:
+            print(f"{'system':<20} {'BC':>6} {'PE':>6} {'IC':>6}   tags (2..9, T, A)", file=out)
+            for d in rows:
+                pe = f"{d['pe']:6.3f}" if d["pe"] is not None else f"{'—':>6}"
+                print(f"{d['name']:<20} {d['bc']:6.3f} {pe} {d['ic']:6.3f}   {' '.join(f'{t:+d}' for t in d['tags'])}", file=out)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+def cmd_chart(args):
+    import json
+    from .chart import chart_rows, row_label, shoe_at_tc, strategy_chart
+    from .counting import shoe_counts
+    from .dealer import RANKS10
+    from .parallel import default_workers
+    rem = shoe_counts(args.decks) if args.tc is None else shoe_at_tc(args.decks, args.tc, args.decks_left)
+    chart = strategy_chart(rem, args.rules, workers=args.workers or default_workers())
+    out = _open_out(args.output)
+    try:
+        if args.format == "json":
+            json.dump([dict(cell, kind=kind, row=row, up=up) for (kind, row, up), cell in chart.items()], out, indent=1)
+            out.write("\n"); return 0
+        where = "full shoe" if args.tc is None else f"Hi-Lo TC {args.tc:+g}, {sum(rem.values())} cards left"
+        print(f"{args.decks} decks, {where}: best play and its EV margin (%) over the next best; "
+              f"* = not basic strategy", file=out)
+        print(f"{'':<6}" + "".join(f"{'10' if u == 'T' else u:>10}" for u in RANKS10), file=out)
+        kind0 = None
+        for kind, row in chart_rows():
+            if kind != kind0:
+                print(kind, file=out); kind0 = kind
+            cells = [chart.get((kind, row, up)) for up in RANKS10]
+            print(f"{row_label(kind, row):<6}" + "".join(
+                f"{'':>10}" if c is None else f"{c['best'] + ('*' if c['differs'] else ' '):>4}{c['margin']:6.2f}"
+                for c in cells), file=out)
+        devs = sorted(((cell["gain"], key, cell) for key, cell in chart.items() if cell["differs"]), reverse=True)
+        if devs:
+            print("\nnot basic strategy (gain over the basic play, %):", file=out)
+            for gain, (kind, row, up), cell in devs:
+                print(f"  {kind} {row_label(kind, row)} vs {up}: {cell['best']} instead of {cell['basic']}  {gain:+.2f}", file=out)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+def _tc_model(args, workers):
+    """TC frequencies, mean true counts and per-TC (EV, variance) for the spread/bankroll commands."""
+    from .betting import linear_tc_model, simulated_tc_model, tc_histogram
+    freq, true_tc = tc_histogram(args.decks, args.pen, args.system, shoes=args.shoes, seed=args.seed, workers=workers)
+    model = linear_tc_model(args.rules, args.decks, args.system, true_tc=true_tc, side_ace_used=args.ace_side_count)
+    if args.model == "sim":
+        thick = {tc: t for tc, t in true_tc.items() if freq[tc] >= args.min_freq}
+        model.update(simulated_tc_model(args.rules, args.decks, thick, args.system, hands=args.hands,
+                                        seed=args.seed, workers=workers))
+    return freq, true_tc, model
+
+def cmd_spread(args):
+    import json
+    from .betting import optimize_ramp
+    from .parallel import default_workers
+    workers = args.workers or default_workers()
+    if args.max_ror is not None and not args.bankroll:
+        print("--max-ror needs --bankroll", file=sys.stderr); return 2
+    if args.verify < 0:
+        print("--verify must be a number of rounds", file=sys.stderr); return 2
+    freq, true_tc, model = _tc_model(args, workers)
+    res = optimize_ramp(freq, model, spread=args.spread, bankroll=args.bankroll, max_ror=args.max_ror,
+                        objective=args.objective, step=args.step)
+    ramp = ",".join(f"{tc}:{u:g}" for tc, u in res["ramp"])
+    check = None
+    if args.verify:
+        from .game import simulate_game
+        stats, _ = simulate_game(args.rules, decks=args.decks, pen=args.pen, rounds=args.verify, seed=args.seed,
+                                 ramps=res["ramp"], systems=[(args.system, dict(SYSTEMS)[args.system])],
+                                 bankroll=args.bankroll or 1000.0, workers=workers)
+        check = stats[args.system]
+    out = _open_out(args.output)
+    try:
+        if args.format == "json":
+            import math
+            doc = {k: v for k, v in res.items() if k not in ("bets", "ramp")}
+            doc.update(ramp=ramp, freq=freq, true_tc=true_tc, ev={tc: model[tc][0] for tc in freq},
+                       bets=res["bets"], check=check)
+            json.dump(doc, out, indent=1, default=lambda v: None if isinstance(v, float) and not math.isfinite(v) else v)
+            out.write("\n"); return 0
+        print(f"{args.system}, {args.decks} decks, {args.pen:g}% pen, 1-{args.spread:g} spread: best ramp for "
+              f"{'SCORE' if args.objective == 'score' else 'win rate'}"
+              + (f" with RoR <= {args.max_ror:.1%} on {args.bankroll:g} units" if args.max_ror is not None else ""), file=out)
+        if not res["feasible"]:
+            print("  no ramp meets the risk-of-ruin cap: showing the flattest one", file=out)
+        print(f"  --ramp '{ramp}'", file=out)
+        print(f"{'TC':>4} {'freq %':>7} {'true TC':>8} {'EV %':>7} {'bet':>6}", file=out)
+        for tc in sorted(freq):
+            if freq[tc] < args.min_freq: continue
+            print(f"{tc:+4d} {100*freq[tc]:7.2f} {true_tc[tc]:+8.2f} {100*model[tc][0]:+7.3f} {res['bets'][tc]:6g}", file=out)
+        rows = [("model", res)] + ([("game", check)] if check else [])
+        print(f"{'':<6} {'avg bet':>8} {'WR/100':>8} {'SD/100':>8} {'EV %':>7} {'SCORE':>8} {'N0':>10} {'RoR':>7}", file=out)
+        for name, st in rows:
+            ror = f"{st['ror']:7.2%}" if st.get("ror") is not None and args.bankroll else f"{'—':>7}"
+            print(f"{name:<6} {st['avg_bet']:8.3f} {st['win_rate']:+8.3f} {st['sd']:8.2f} {st['ev_pct']:+7.3f} "
+                  f"{st['score']:8.2f} {st['n0']:10.0f} {ror}", file=out)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+def cmd_bankroll(args):
+    import json, math
+    from .bankroll import kelly_bankroll, round_moments, simulate_bankrolls
+    from .parallel import default_workers
+    if (args.win_rate is None) != (args.sd is None):
+        print("--win-rate and --sd go together", file=sys.stderr); return 2
+    if args.win_rate is not None:
+        mean, var = args.win_rate/100.0, (args.sd/10.0)**2
+        source = f"WR {args.win_rate:+g}/100, SD {args.sd:g}/100"
+    else:
+        from .game import DEFAULT_RAMP
+        freq, _, model = _tc_model(args, args.workers or default_workers())
+        ramp = args.ramp or DEFAULT_RAMP
+        if args.spread:
+            from .betting import optimize_ramp
+            ramp = optimize_ramp(freq, model, spread=args.spread)["ramp"]
+        mean, var = round_moments(freq, model, ramp)
+        source = f"{args.system} ramp '{','.join(f'{tc}:{u:g}' for tc, u in ramp)}'"
+    kelly = kelly_bankroll(mean, var)
+    banks = list(args.bankroll or []) + [kelly_bankroll(mean, var, f) for f in args.kelly or []]
+    if not banks:
+        banks = [kelly_bankroll(mean, var, f) for f in (1.0, 0.5, 0.25)]
+    if not all(math.isfinite(b) for b in banks):
+        print("the ramp loses money: no Kelly bankroll", file=sys.stderr); return 2
+    rows = simulate_bankrolls(mean, var, banks, args.rounds, trials=args.trials, step=args.step,
+                              goal=args.goal, seed=args.seed)
+    out = _open_out(args.output)
+    try:
+        if args.format == "json":
+            clean = lambda v: None if isinstance(v, float) and not math.isfinite(v) else v
+            json.dump({"mean": mean, "var": var, "kelly_bankroll": clean(kelly),
+                       "results": [{k: ({str(q): clean(x) for q, x in v.items()} if isinstance(v, dict) else clean(v))
+                                    for k, v in r.items()} for r in rows]}, out, indent=1)
+            out.write("\n"); return 0
+        print(f"{source}: {100*mean:+.3f} units/100 rounds, SD {10*math.sqrt(var):.2f}/100, "
+              f"full Kelly bankroll {kelly:,.0f} units; {args.trials:,} trials of {args.rounds:,} rounds", file=out)
+        fmt_t = lambda t: f"{t:>10,.0f}" if math.isfinite(t) else f"{'—':>10}"
+        print(f"{'bankroll':>9} {'Kelly×':>6} {'RoR':>7} {'RoR ∞':>7} {'DD p50':>8} {'DD p95':>8} "
+              f"{f'x{args.goal:g} %':>7} {'to x p50':>10} {'final p10':>10} {'final p50':>10}", file=out)
+        for r in rows:
+            print(f"{r['bankroll']:9,.0f} {kelly/r['bankroll']:6.2f} {r['ror']:7.2%} {r['ror_inf']:7.2%} "
+                  f"{r['drawdown'][0.5]:8,.0f} {r['drawdown'][0.95]:8,.0f} {r['doubled']:7.1%} "
+                  f"{fmt_t(r['to_double'][0.5])} {r['final'][0.9]:10,.0f} {r['final'][0.5]:10,.0f}", file=out)
+    finally:
+        if out is not sys.stdout: out.close()
+    return 0
+
+def _floats_arg(text):
+    try:
+        return [float(t) for t in text.split(",") if t.strip()]
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated numbers, got {text!r}")
+
+def _tags_arg(text):
+    from .sysmetrics import parse_tags
+    try:
+        return parse_tags(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+def _ramp_arg(text):
+    from .game import parse_ramp
+    try:
+        return parse_ramp(text)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(f"bad ramp {text!r}: {e}")
+
+def _ramp_for_arg(text):
+    name, _, ramp = text.partition("=")
+    return name.strip(), _ramp_arg(ramp)
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="python -m blackjack_core", description=__doc__)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("replay", help="stream logged shoes (one per line) and emit per-card counts/TC/EV",
+                       description="Replay logged shoes through every counting system. Input: one shoe per "
+                                   "line, card tokens as in the GUI (2-9, 0/T/10, J, Q, K, A), separators optional.")
+    p.add_argument("input", nargs="?", default="-", help="log file (default: stdin)")
+    p.add_argument("-o", "--output", default="-", help="output file (default: stdout)")
+    p.add_argument("-f", "--format", choices=("csv", "jsonl"), default="csv")
+    add_shoe_args(p)
+    p.add_argument("--pen", type=float, default=75, help="penetration %% (TC denominator stops at the cut)")
+    p.add_argument("--ace-side-count", action="store_true", help="Omega II / Hi-Opt II slopes without the no-side-count penalty")
+    p.add_argument("--strict", action="store_true", help="exit with status 1 if any card or shoe was skipped")
+    p.set_defaults(func=cmd_replay)
+
+    p = sub.add_parser("game", help="deal whole shoes with a bet ramp: win rate, SD, SCORE, N0, risk of ruin",
+                       description="Shuffle --decks decks, deal rounds to the --pen cut and bet every counting "
+                                   "system's TC ramp on the same cards. Index plays follow the Hi-Lo TC floor.")
+    add_shoe_args(p)
+    p.add_argument("--pen", type=float, default=75, help="penetration %%")
+    p.add_argument("-n", "--rounds", type=int, default=1_000_000)
+    p.add_argument("--seed", type=int, default=2024)
+    p.add_argument("--ramp", type=_ramp_arg, help="TC:units pairs on the TC trunc, e.g. '1:1,2:2,3:4,4:8,5:12' (the default)")
+    p.add_argument("--ramp-for", type=_ramp_for_arg, action="append", metavar="SYSTEM=RAMP",
+                   help="ramp for one system, e.g. 'Zen=2:1,4:2,6:4,8:8' (repeatable)")
+    p.add_argument("--bankroll", type=float, default=1000, help="bankroll in units for the risk of ruin")
+    p.add_argument("--no-indices", action="store_true", help="basic strategy only (no Illustrious 18 / Fab 4)")
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("--batch", type=int, default=200_000, help="rounds per task; results depend on it, not on --workers")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=("table", "json"), default="table")
+    p.add_argument("--indices", help="index table from 'indices -o' (played on its system's TC)")
+    p.add_argument("--telemetry", metavar="PATH", help="instrument the engine and save its counters/phase times as JSON")
+    p.add_argument("-q", "--quiet", action="store_true", help="no progress on stderr")
+    p.set_defaults(func=cmd_game)
+
+    p = sub.add_parser("indices", help="generate playing indices for a counting system",
+                       description="Find the TC crossover of every strategy deviation (hard/soft doubles, "
+                                   "stand/hit, surrender, insurance) by exact evaluation of sampled, "
+                                   "TC-stratified compositions.")
+    p.add_argument("--system", default="Hi-Lo", choices=[name for name, _ in SYSTEMS])
+    add_shoe_args(p)
+    p.add_argument("--pen", type=float, default=75, help="penetration %%")
+    p.add_argument("--per-tc", type=int, default=24, help="compositions per TC bucket (about 1 s each per core)")
+    p.add_argument("--tc-den", choices=("cut", "shoe"), default="cut",
+                   help="TC denominator: decks left to the cut (as the app) or in the whole shoe (published tables)")
+    p.add_argument("--seed", type=int, default=2024)
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("-o", "--output", default="-", help="save the table as JSON (for 'game --indices' and the GUI)")
+    p.add_argument("-q", "--quiet", action="store_true")
+    p.set_defaults(func=cmd_indices)
+
+    p = sub.add_parser("systems", help="rate counting systems: betting correlation, playing efficiency, insurance correlation",
+                       description="Correlate the tags of the built-in and any given counting systems with the "
+                                   "effects of removal of each rank: on the EV (BC, Griffin's single-deck EORs "
+                                   "unless --eor-hands), on the exact gain of the Illustrious 18 + Fab 4 "
+                                   "deviations (PE) and on insurance (IC).")
+    add_shoe_args(p)
+    p.add_argument("--tags", type=_tags_arg, action="append", metavar="NAME=TAGS",
+                   help="extra tag set: ten values for 2..9, T, A ('KO=1,1,1,1,1,1,0,0,-1,-1') "
+                        "or rank:tag pairs ('KO=2:1,3:1,4:1,5:1,6:1,7:1,T:-1,A:-1'); repeatable")
+    p.add_argument("--file", action="append", help="JSON tag sets: {name: [10 tags]} or [{name, tags}] (repeatable)")
+    p.add_argument("--eor-hands", type=int, default=0, help="calibrate the EORs on a full shoe with this many paired rounds")
+    p.add_argument("--no-pe", action="store_true", help="skip the exact playing-efficiency evaluation")
+    p.add_argument("--top", type=int, default=0, help="show only the best N by BC")
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=("table", "json"), default="table")
+    p.set_defaults(func=cmd_systems)
+
+    p = sub.add_parser("chart", help="composition-dependent strategy chart (hard, soft, pairs) with EV margins",
+                       description="Value every action of every hard, soft and pair cell against every upcard "
+                                   "exactly for one composition: a full shoe, or one at a given Hi-Lo true count. "
+                                   "Codes: S stand, H hit, D double, P split, R surrender.")
+    add_shoe_args(p)
+    p.add_argument("--tc", type=float, help="Hi-Lo true count of the composition (default: full shoe)")
+    p.add_argument("--decks-left", type=float, help="decks unseen at --tc (default: half the shoe)")
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=("table", "json"), default="table")
+    p.set_defaults(func=cmd_chart)
+
+    p = sub.add_parser("spread", help="optimal bet ramp from simulated TC frequencies and per-TC EV",
+                       description="Deal --shoes shuffled shoes to the cut to get the frequency and mean true "
+                                   "count of every betting TC, value each TC (the linear edge model, or "
+                                   "simulate_ev at that count), then find the ramp within the spread that "
+                                   "maximizes SCORE, or the win rate under a risk-of-ruin cap.")
+    p.add_argument("--system", default="Hi-Lo", choices=[name for name, _ in SYSTEMS])
+    add_shoe_args(p)
+    p.add_argument("--pen", type=float, default=75, help="penetration %%")
+    p.add_argument("--shoes", type=int, default=200_000, help="shoes dealt for the TC histogram")
+    p.add_argument("--spread", type=float, default=8, help="largest bet in units (the smallest is 1)")
+    p.add_argument("--step", type=float, default=1, help="bets are multiples of this many units")
+    p.add_argument("--objective", choices=("score", "win"), default="score")
+    p.add_argument("--bankroll", type=float, help="bankroll in units (for the risk of ruin)")
+    p.add_argument("--max-ror", type=float, help="risk-of-ruin cap, e.g. 0.05 (with --objective win)")
+    p.add_argument("--model", choices=("linear", "sim"), default="linear",
+                   help="per-TC EV: base edge + slope*TC, or simulated at the TC (slow)")
+    p.add_argument("--hands", type=int, default=200_000, help="hands per TC with --model sim")
+    p.add_argument("--min-freq", type=float, default=0.005, help="TCs rarer than this keep the linear model with --model sim")
+    p.add_argument("--ace-side-count", action="store_true", help="Omega II / Hi-Opt II slopes without the no-side-count penalty")
+    p.add_argument("--verify", type=int, default=0, metavar="ROUNDS", help="play the ramp in the game simulator for ROUNDS rounds")
+    p.add_argument("--seed", type=int, default=2024)
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=("table", "json"), default="table")
+    p.set_defaults(func=cmd_spread)
+
+    p = sub.add_parser("bankroll", help="bankroll trajectories: risk of ruin, drawdowns, time to double",
+                       description="Simulate --trials bankroll trajectories of a one-unit bet ramp over --rounds "
+                                   "rounds for several bankrolls or Kelly fractions at once. The per-round mean and "
+                                   "variance come from --win-rate/--sd (as printed by 'game') or from the ramp on "
+                                   "simulated TC frequencies with the per-TC model of 'spread'.")
+    p.add_argument("--win-rate", type=float, help="win per 100 rounds in units (with --sd)")
+    p.add_argument("--sd", type=float, help="SD per 100 rounds in units (with --win-rate)")
+    p.add_argument("--ramp", type=_ramp_arg, help="TC:units pairs (default: the game's default ramp)")
+    p.add_argument("--spread", type=float, help="use the best-SCORE ramp within this spread instead of --ramp")
+    p.add_argument("--system", default="Hi-Lo", choices=[name for name, _ in SYSTEMS])
+    add_shoe_args(p)
+    p.add_argument("--pen", type=float, default=75, help="penetration %%")
+    p.add_argument("--shoes", type=int, default=100_000, help="shoes dealt for the TC histogram")
+    p.add_argument("--model", choices=("linear", "sim"), default="linear", help="per-TC EV, as in 'spread'")
+    p.add_argument("--hands", type=int, default=200_000, help="hands per TC with --model sim")
+    p.add_argument("--min-freq", type=float, default=0.005, help="TCs rarer than this keep the linear model with --model sim")
+    p.add_argument("--ace-side-count", action="store_true", help="Omega II / Hi-Opt II slopes without the no-side-count penalty")
+    p.add_argument("--bankroll", type=_floats_arg, help="bankrolls in units, e.g. '500,1000,2000'")
+    p.add_argument("--kelly", type=_floats_arg, help="Kelly fractions, e.g. '1,0.5,0.25' (the default without --bankroll)")
+    p.add_argument("-n", "--rounds", type=int, default=100_000, help="horizon in rounds (a trip, a year)")
+    p.add_argument("--trials", type=int, default=20_000)
+    p.add_argument("--step", type=int, default=100, help="rounds per simulated step (crossings inside a step are still counted)")
+    p.add_argument("--goal", type=float, default=2.0, help="multiple of the bankroll for the time-to-goal columns")
+    p.add_argument("--seed", type=int, default=2024)
+    p.add_argument("-j", "--workers", type=int, default=0, help="worker processes (default: all cores)")
+    p.add_argument("-o", "--output", default="-")
+    p.add_argument("-f", "--format", choices=("table", "json"), default="table")
+    p.set_defaults(func=cmd_bankroll)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except BrokenPipeError:   # e.g. piped into `head`
+        sys.stderr.close()
+        return 0
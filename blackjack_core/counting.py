@@ -0,0 +1,198 @@
+"""Counting systems, the linear EV model and the live count state."""
+
+from .cards import CARD_ORDER, TEN_RANKS
+
+# --------- Counting systems ---------
+HI_LO   = {'2':+1,'3':+1,'4':+1,'5':+1,'6':+1,'7':0,'8':0,'9':0,'T':-1,'J':-1,'Q':-1,'K':-1,'A':-1}
+ZEN     = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+2,'7':+1,'8':0,'9':0,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}
+OMEGA2  = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+2,'7':+1,'8':0,'9':-1,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}  # ace-neutral
+HIOPT2  = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+1,'7':+1,'8':0,'9':0,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}   # ace-neutral
+
+SYSTEMS = [
+    ("Hi-Lo", HI_LO),
+    ("Zen", ZEN),
+    ("Omega II", OMEGA2),
+    ("Hi-Opt II", HIOPT2),
+]
+
+class TagMatrix:
+    """Tag sets as a system × rank matrix (CARD_ORDER columns).
+
+    running(counts) gives every system's running count as one matrix-vector product;
+    columns[r] is the tag of r in each system, the increment CountState applies per card.
+    """
+    def __init__(self, systems=SYSTEMS):
+        self.names = [name for name, _ in systems]
+        self.rows = [tuple(m.get(r, 0) for r in CARD_ORDER) for _, m in systems]
+        self.columns = {r: tuple(row[j] for row in self.rows) for j, r in enumerate(CARD_ORDER)}
+
+    def running(self, counts):
+        """Running counts of all systems for the cards in `counts` (rank -> n)."""
+        v = [counts.get(r, 0) for r in CARD_ORDER]
+        return [sum(t*n for t, n in zip(row, v)) for row in self.rows]
+
+# --------- Linear EV: base & slope (≈) ---------
+BASE_ANCHOR_6D_S17_DAS = -0.36  # %
+ADJ_H17    = -0.20
+ADJ_NO_DAS = -0.14
+ADJ_RSA    = +0.03
+ADJ_LS     = +0.08
+ADJ_NO_PEEK= -0.11
+
+DECK_ADJ = {1:+0.25, 2:+0.17, 4:+0.06, 6:0.0, 8:-0.03, 10:-0.05, 12:-0.06}
+SLOPE = {
+    "Hi-Lo":    {1:0.65, 2:0.60, 4:0.53, 6:0.50, 8:0.47, 10:0.45, 12:0.44},
+    "Zen":      {1:0.70, 2:0.65, 4:0.56, 6:0.53, 8:0.50, 10:0.48, 12:0.46},
+    "Omega II": {1:0.72, 2:0.67, 4:0.58, 6:0.55, 8:0.52, 10:0.50, 12:0.48},
+    "Hi-Opt II":{1:0.73, 2:0.68, 4:0.60, 6:0.56, 8:0.53, 10:0.51, 12:0.49},
+}
+ACE_PENALTY = 0.90  # penalty if no Ace side-count (ΩII / Hi-Opt II)
+
+INS_THRESH_HILO = +3  # TC floor threshold for insurance (simple fallback)
+MIN_DECKS_DEN = 0.25  # min 1/4 shoe to stabilize TC near the cut
+
+# --- Illustrious 18 + Fab 4 display (not used by logic, kept) ---
+I18_F4 = [
+    ("Insurance", +3, "Take", "Don't take"),
+    ("16 vs 10",  0,  "Stand",   "Hit"),
+    ("15 vs 10", +4,  "Stand",   "Hit"),
+    ("10 vs 10", +4,  "Double",  "Hit"),
+    ("12 vs 3",  +2,  "Stand",   "Hit"),
+    ("12 vs 2",  +3,  "Stand",   "Hit"),
+    ("11 vs A",  +1,  "Double",  "Hit"),
+    ("9  vs 2",  +1,  "Double",  "Hit"),
+    ("10 vs A",  +4,  "Double",  "Hit"),
+    ("9  vs 7",  +3,  "Double",  "Hit"),
+    ("16 vs 9",  +5,  "Stand",   "Hit"),
+    ("13 vs 2", -1,   "Stand",   "Hit"),
+    ("12 vs 4",  0,   "Stand",   "Hit"),
+    ("12 vs 5", -2,   "Stand",   "Hit"),
+    ("12 vs 6", -1,   "Stand",   "Hit"),
+    ("13 vs 3", -2,   "Stand",   "Hit"),
+    ("12 vs 7", +3,   "Hit",     "Stand"),
+    ("A,8 vs 6", +1,  "Double",  "Stand"),
+    # Fab 4 (LS)
+    ("15 vs 10 (Sur)", +0, "Surrender", "Hit"),
+    ("15 vs 9 (Sur)",  +2, "Surrender", "Hit"),
+    ("15 vs A (Sur)",  +1, "Surrender", "Hit"),
+    ("14 vs 10 (Sur)", +3, "Surrender", "Hit"),
+]
+
+def estimate_base_edge(decks, h17, das, rsa, hsa, dos, d10, ls, peek):
+    base = BASE_ANCHOR_6D_S17_DAS + DECK_ADJ.get(int(decks), 0.0)
+    if h17:  base += ADJ_H17
+    if not das: base += ADJ_NO_DAS
+    if rsa:  base += ADJ_RSA
+    if ls:   base += ADJ_LS
+    if not peek: base += ADJ_NO_PEEK
+    return round(base,2)
+
+def slope_for(system,decks,side_ace_used):
+    decks = max(1, min(12, int(decks)))
+    dkeys = sorted(SLOPE[system].keys())
+    nearest = min(dkeys, key=lambda k: abs(k - decks))
+    m = SLOPE[system][nearest]
+    if system in ("Omega II","Hi-Opt II") and not side_ace_used:
+        m *= ACE_PENALTY
+    return round(m,2)
+
+# --------- Live count state ---------
+def shoe_counts(decks):
+    """Full-shoe composition for `decks` decks."""
+    total = int(decks)*52
+    return {r: total//13 + (1 if i < total % 13 else 0) for i, r in enumerate(CARD_ORDER)}
+
+class CountState:
+    """Count engine for live entry: everything the table shows, updated in place per card.
+
+    add/undo touch one rank: seen/remaining counts, totals, ten/ace counts and the running
+    count of every tracked system (one precomputed tag tuple per rank), so no read needs
+    to re-sum the shoe. configure() re-derives the remaining cards when decks or
+    penetration change.
+    """
+    def __init__(self, decks=6, pen=75, systems=SYSTEMS):
+        self.matrix = TagMatrix(systems)
+        self.names = self.matrix.names
+        self._sys = {name: i for i, name in enumerate(self.names)}
+        self._sys.update({id(m): i for i, (_, m) in enumerate(systems)})
+        self._tags = self.matrix.columns
+        self.decks = None; self.pen = None
+        self.reset()
+        self.configure(decks, pen)
+
+    def configure(self, decks, pen):
+        decks = int(decks); pen = float(pen)
+        if decks == self.decks and pen == self.pen: return self
+        self.decks = decks; self.pen = pen
+        self.total_cards = decks*52
+        self.cut = int(self.total_cards*(pen/100.0))  # number of cards dealt before reshuffle
+        self.base = shoe_counts(decks)
+        self._rebuild()
+        return self
+
+    def reset(self):
+        self.seen = {r: 0 for r in CARD_ORDER}
+        self.history = []
+        self.seen_total = 0
+        self.rc = [0]*len(self.names)
+        if self.decks is not None: self._rebuild()
+        return self
+
+    def _rebuild(self):
+        self.remaining = {r: max(0, self.base[r] - self.seen[r]) for r in CARD_ORDER}
+        self.remaining_total = sum(self.remaining.values())
+        self.tens = sum(self.remaining[r] for r in TEN_RANKS)
+        self.aces = self.remaining['A']
+
+    def _set_remaining(self, r):
+        old = self.remaining[r]
+        new = self.base[r] - self.seen[r]
+        if new < 0: new = 0
+        self.remaining[r] = new
+        self.remaining_total += new - old
+        if r in TEN_RANKS: self.tens += new - old
+        elif r == 'A': self.aces = new
+
+    def add(self, r):
+        """Record a seen card; False (nothing changed) if none of that rank is left."""
+        if self.remaining.get(r, 0) <= 0: return False
+        self.seen[r] += 1; self.seen_total += 1
+        self.history.append(r)
+        self._set_remaining(r)
+        self.rc = [c + t for c, t in zip(self.rc, self._tags[r])]
+        return True
+
+    def undo(self):
+        """Take back the last card; returns its rank (None if there is nothing to undo)."""
+        if not self.history: return None
+        r = self.history.pop()
+        self.seen[r] -= 1; self.seen_total -= 1
+        self._set_remaining(r)
+        self.rc = [c - t for c, t in zip(self.rc, self._tags[r])]
+        return r
+
+    def running(self, system):
+        """Running count of a tracked system (name or tag map); other maps are summed."""
+        i = self._sys.get(system if isinstance(system, str) else id(system))
+        if i is not None: return self.rc[i]
+        return sum(system.get(r, 0)*self.seen[r] for r in CARD_ORDER)
+
+    def decks_remaining(self):
+        # TC denominator = cards remaining UP TO THE CUT (penetration), not the whole shoe.
+        remain_to_cut = max(0, self.cut - min(self.seen_total, self.cut))
+        return max(MIN_DECKS_DEN, remain_to_cut/52.0)
+
+    def shoe_progress(self):
+        seen_to_cut = min(self.seen_total, self.cut)
+        return seen_to_cut, self.cut, self.total_cards, max(0, self.cut - seen_to_cut)
+
+    def ten_density(self):
+        return self.tens/self.remaining_total if self.remaining_total > 0 else 0.0
+
+    def ace_density(self):
+        return self.aces/self.remaining_total if self.remaining_total > 0 else 0.0
+
+    def insurance_ev(self):
+        if self.remaining_total <= 0: return None
+        # Insurance ROI (2:1): EV = 2p - 1 → in %
+        return (2.0*self.ten_density() - 1.0)*100.0
@@ -0,0 +1,129 @@
+"""Dealer play: random playouts and exact outcome distributions."""
+
+import functools
+
+from .cards import TEN_RANKS, as_hand
+
+# --------- Dealer play ---------
+def dealer_play(cards, shoe, rules, rnd):
+    """Draw to the dealer's hand (Hand or card list) per S17/H17; returns the final total."""
+    h = as_hand(cards)
+    h17 = rules.get("H17", False)
+    while h.total < 17 or (h.total == 17 and h.soft and h17):
+        h.add(shoe.draw(rnd))
+    return h.total
+
+# --------- Exact dealer outcome probabilities ---------
+# Composition-dependent recursion over the dealer's draws. Compositions are collapsed
+# to 10 ranks (2..9, T, A); every (composition, total, soft) state is memoized, so
+# the 10 upcards of one shoe share most of their sub-compositions.
+RANKS10 = ('2','3','4','5','6','7','8','9','T','A')
+VAL10 = (2,3,4,5,6,7,8,9,10,11)
+DEALER_OUTCOMES = (17, 18, 19, 20, 21, 'bust', 'bj')
+
+def comp10(counts):
+    """rank->count dict (13 ranks) -> 10-tuple (2..9, T, A)."""
+    return (tuple(int(counts.get(r,0)) for r in RANKS10[:8])
+            + (sum(int(counts.get(r,0)) for r in TEN_RANKS), int(counts.get('A',0))))
+
+def rank10(r):
+    return 8 if r in TEN_RANKS else 9 if r == 'A' else int(r) - 2
+
+def _add10(total, soft, i):
+    total += VAL10[i]
+    if i == 9:
+        if total > 21: total -= 10
+        else: soft = True
+    if total > 21 and soft:
+        total -= 10; soft = False
+    return total, soft
+
+@functools.lru_cache(maxsize=1 << 17)
+def dealer_dist(comp, total, soft, h17):
+    """Final-total probabilities (17, 18, 19, 20, 21, bust) from a dealer state."""
+    if total > 21:
+        return (0.0, 0.0, 0.0, 0.0, 0.0, 1.0)
+    if total >= 18 or (total == 17 and not (soft and h17)):
+        out = [0.0]*6; out[total-17] = 1.0
+        return tuple(out)
+    n = sum(comp)
+    if n <= 0:  # exhausted shoe: same convention as draw_one
+        t, s = _add10(total, soft, 8)
+        return dealer_dist(comp, t, s, h17)
+    acc = [0.0]*6
+    for i, c in enumerate(comp):
+        if c:
+            t, s = _add10(total, soft, i)
+            w = c / n
+            # a draw that ends the hand is settled here: no sub-composition, no cache entry
+            if t > 21:
+                acc[5] += w
+            elif t >= 18 or (t == 17 and not (s and h17)):
+                acc[t-17] += w
+            else:
+                sub = dealer_dist(comp[:i] + (c-1,) + comp[i+1:], t, s, h17)
+                for k in range(6):
+                    acc[k] += w*sub[k]
+    return tuple(acc)
+
+def dealer_outcome_dist(comp, up, rules, hole=None):
+    """Tuple over DEALER_OUTCOMES for upcard index `up` (and optional hole index).
+
+    comp excludes the upcard (and hole). With PEEK and no hole given, the result is
+    conditioned on the dealer not having blackjack ('bj' = 0); under ENHC the
+    blackjack probability is reported in the 'bj' slot.
+    """
+    h17 = bool(rules.get("H17", False))
+    t0, s0 = _add10(0, False, up)
+    if hole is not None:
+        if {up, hole} == {8, 9}:
+            return (0.0,)*6 + (1.0,)
+        t, s = _add10(t0, s0, hole)
+        return dealer_dist(comp, t, s, h17) + (0.0,)
+    acc = [0.0]*7
+    weight = 0.0
+    n = sum(comp)
+    for i, c in enumerate(comp):
+        if not c: continue
+        w = c / n
+        if {up, i} == {8, 9}:
+            if not rules["PEEK"]:
+                acc[6] += w; weight += w
+            continue
+        t, s = _add10(t0, s0, i)
+        sub = dealer_dist(comp[:i] + (c-1,) + comp[i+1:], t, s, h17)
+        for k in range(6):
+            acc[k] += w*sub[k]
+        weight += w
+    if weight <= 0:
+        return (0.0,)*7
+    return tuple(a/weight for a in acc)
+
+def dealer_outcome_probs(counts, up, rules, hole=None):
+    """Exact dealer outcome distribution {17..21, 'bust', 'bj'} for the unseen cards `counts`.
+
+    `counts` must already exclude the upcard (and the hole card when given).
+    """
+    dist = dealer_outcome_dist(comp10(counts), rank10(up), rules, None if hole is None else rank10(hole))
+    return dict(zip(DEALER_OUTCOMES, dist))
+
+def dealer_probs_by_upcard(counts, rules):
+    """{up: dealer_outcome_probs} for all 10 upcards drawn from the same shoe `counts`."""
+    comp = comp10(counts)
+    out = {}
+    for i, r in enumerate(RANKS10):
+        if comp[i] <= 0: continue
+        sub = comp[:i] + (comp[i]-1,) + comp[i+1:]
+        out[r] = dict(zip(DEALER_OUTCOMES, dealer_outcome_dist(sub, i, rules)))
+    return out
+
+def stand_ev_vs(dist, total, mult=1.0):
+    """Expected result of a standing total against a dealer distribution (no 'bj' slot)."""
+    if total > 21:
+        return -mult
+    ev = dist[5]
+    for k in range(5):
+        d = 17 + k
+        if total > d: ev += dist[k]
+        elif total < d: ev -= dist[k]
+    return mult*ev
@@ -0,0 +1,188 @@
+"""Exact composition-dependent action EVs (Compare)."""
+
+from .cards import is_blackjack
+from .dealer import _add10, comp10, rank10, dealer_outcome_dist, stand_ev_vs
+
+# --------- Exact (combinatorial) action EVs ---------
+MAX_SPLIT_DEPTH = 3   # same limit as play_hand (split_depth < 3)
+
+class ExactEV:
+    """Composition-dependent EVs of player hands against one upcard.
+
+    Values are in initial-bet units and conditioned on the dealer not having blackjack;
+    `exact_action_evs` folds the blackjack case back in. Dealer distributions and hit
+    values are memoized per composition, so every action and hand evaluated on one
+    instance shares the same tables.
+
+    Dealer distributions are exact for compositions within `exact_depth` cards of the
+    root composition; deeper player draws use the root distribution plus the exact
+    per-rank removal deltas (first-order: at most 0.0011 percentage points of EV from exact_depth=None
+    over 24 hand/upcard spots, every action, on a full six-deck shoe). exact_depth=None
+    keeps every dealer distribution exact (slow for small totals).
+
+    Split EV approximation: each post-split hand is played from the composition left
+    after the pair and upcard are removed (the sibling hand's cards are ignored), and a
+    resplit is valued as two such fresh hands, up to MAX_SPLIT_DEPTH. Without HSA a
+    split ace takes one card and stands, settled as a double under DOUBLE_ON_SPLIT_ACES,
+    as in play_hand.
+    """
+    def __init__(self, rules, up, root=None, exact_depth=1):
+        self.rules = rules
+        self.up = up if isinstance(up, int) else rank10(up)
+        self.root = root
+        self.exact_depth = exact_depth
+        self._peek_rules = dict(rules, PEEK=True)
+        self._dist = {}
+        self._delta = None
+        self._hit = {}
+
+    def _exact_dist(self, c):
+        d = self._dist.get(c)
+        if d is None:
+            d = self._dist[c] = dealer_outcome_dist(c, self.up, self._peek_rules)
+        return d
+
+    def dist(self, c):
+        d = self._dist.get(c)   # exact or first-order, both are memoized here
+        if d is not None:
+            return d
+        root = self.root
+        if root is None or self.exact_depth is None:
+            return self._exact_dist(c)
+        removed = [a - b for a, b in zip(root, c)]
+        if sum(removed) <= self.exact_depth or min(removed) < 0:
+            return self._exact_dist(c)
+        if self._delta is None:
+            base = self._exact_dist(root)
+            self._delta = [None if not root[i] else
+                           tuple(x - y for x, y in zip(self._exact_dist(root[:i] + (root[i]-1,) + root[i+1:]), base))
+                           for i in range(10)]
+        acc = list(self._exact_dist(root))
+        for i, k in enumerate(removed):
+            if k and self._delta[i] is not None:
+                di = self._delta[i]
+                for j in range(6):
+                    acc[j] += k*di[j]
+        d = self._dist[c] = tuple(acc) + (0.0,)
+        return d
+
+    def p_bj(self, c):
+        n = sum(c)
+        if n <= 0: return 0.0
+        if self.up == 9: return c[8] / n
+        if self.up == 8: return c[9] / n
+        return 0.0
+
+    def stand(self, t, c, mult=1.0):
+        return stand_ev_vs(self.dist(c), t, mult)
+
+    def hit(self, t, soft, c):
+        """Take one card, then stand or hit optimally."""
+        key = (t, soft, c)
+        ev = self._hit.get(key)
+        if ev is not None:
+            return ev
+        n = sum(c); ev = 0.0
+        for i, ci in enumerate(c):
+            if not ci: continue
+            t2, s2 = _add10(t, soft, i)
+            if t2 > 21:
+                ev -= ci / n; continue
+            c2 = c[:i] + (ci-1,) + c[i+1:]
+            v = self.stand(t2, c2)
+            if t2 < 21:
+                v = max(v, self.hit(t2, s2, c2))
+            ev += ci / n * v
+        self._hit[key] = ev
+        return ev
+
+    def double(self, t, soft, c):
+        n = sum(c); ev = 0.0
+        for i, ci in enumerate(c):
+            if not ci: continue
+            t2, _ = _add10(t, soft, i)
+            ev += ci / n * self.stand(t2, c[:i] + (ci-1,) + c[i+1:], 2.0)
+        return ev
+
+    def can_double(self, t):
+        return not self.rules.get("D10", False) or t in (10, 11)
+
+    def split(self, r, c, depth=0):
+        """(ev, expected total wager) of splitting a pair of rank index r; c excludes the pair."""
+        ev, wager = self._split_hand(r, c, depth + 1)
+        return 2.0*ev, 2.0*wager
+
+    def _split_hand(self, r, c, depth):
+        rules = self.rules
+        aces = (r == 9)
+        may_hit = (not aces) or rules["HSA"]
+        may_dbl = rules["DOUBLE_ON_SPLIT_ACES"] if aces else rules["DAS"]
+        may_resplit = (depth < MAX_SPLIT_DEPTH) and (rules["RSA"] if aces else True)
+        n = sum(c); ev = 0.0; wager = 0.0
+        for i, ci in enumerate(c):
+            if not ci: continue
+            w = ci / n
+            c2 = c[:i] + (ci-1,) + c[i+1:]
+            t, s = _add10(*_add10(0, False, r), i)
+            if aces and not rules["HSA"]:
+                # one card each, as play_hand: settled as a double (2x wager) under DOS, else a stand
+                k = 2.0 if may_dbl else 1.0
+                ev += w*k*self.stand(t, c2); wager += w*k
+                continue
+            best = (self.stand(t, c2), 1.0)
+            if may_hit and t < 21:
+                best = max(best, (self.hit(t, s, c2), 1.0))
+            if may_dbl and self.can_double(t):
+                best = max(best, (self.double(t, s, c2), 2.0))
+            if may_resplit and i == r:
+                best = max(best, self.split(r, c2, depth))
+            ev += w*best[0]; wager += w*best[1]
+        return ev, wager
+
+def exact_action_evs(rem_counts, rules, player_cards, dealer_up, actions=None, calc=None):
+    """Exact EV % of STAND/HIT/DOUBLE/SPLIT/SURRENDER for a two-card hand vs dealer_up.
+
+    rem_counts is the unseen shoe (player cards and upcard are removed here, like
+    simulate_fixed_action). Zero variance; all actions share one ExactEV cache.
+    """
+    c = list(comp10(rem_counts))
+    for card in list(player_cards) + [dealer_up]:
+        i = rank10(card)
+        if c[i] > 0: c[i] -= 1
+    c = tuple(c)
+    up = rank10(dealer_up)
+    calc = calc or ExactEV(rules, up, root=c)
+    if actions is None:
+        actions = ['STAND','HIT','DOUBLE']
+        if rank10(player_cards[0]) == rank10(player_cards[1]): actions.append('SPLIT')
+        if rules["LS"] and not (player_cards[0]=='8' and player_cards[1]=='8'): actions.append('SURRENDER')
+    p_bj = calc.p_bj(c)
+    if is_blackjack(list(player_cards)):
+        pay = 1.5 if rules["BJ_3_2"] else 1.2
+        ev = (1.0 - p_bj)*pay if rules["PEEK"] else pay
+        return {a: ev*100.0 for a in actions}
+    t, s = 0, False
+    for card in player_cards:
+        t, s = _add10(t, s, rank10(card))
+    obo = rules["OBO"]
+    out = {}
+    for a in actions:
+        if a == 'STAND':
+            ev, bj_loss = calc.stand(t, c), -1.0
+        elif a == 'HIT':
+            ev, bj_loss = calc.hit(t, s, c), -1.0
+        elif a == 'DOUBLE':
+            ev, bj_loss = calc.double(t, s, c), (-1.0 if obo else -2.0)
+        elif a == 'SPLIT':
+            ev, wager = calc.split(rank10(player_cards[0]), c)
+            bj_loss = -1.0 if obo else -wager
+        elif a == 'SURRENDER':
+            # same convention as play_hand_forced_first: ENHC surrender always returns half
+            out[a] = (p_bj*-1.0 + (1.0 - p_bj)*-0.5 if rules["PEEK"] else -0.5)*100.0
+            continue
+        else:
+            continue
+        if rules["PEEK"]:
+            bj_loss = -1.0
+        out[a] = (p_bj*bj_loss + (1.0 - p_bj)*ev)*100.0
+    return out
@@ -0,0 +1,154 @@
+"""Full-shoe game simulator: shuffle, deal rounds to the cut, bet from a TC ramp.
+
+Unlike simulate_ev (one round from a frozen composition), this deals whole shoes the
+way a table does, so the count moves with the cards and the results are what a
+counting strategy actually earns: win rate, SD, SCORE, N0 and risk of ruin.
+"""
+
+import math, random
+from itertools import accumulate
+
+from .cards import CARD_ORDER, CARD_INDEX
+from .counting import SYSTEMS, HI_LO, MIN_DECKS_DEN, shoe_counts
+from .strategy import compile_strategy
+from .simulate import simulate_one_hand
+from .parallel import run_tasks, spawn_seeds
+
+# (TC trunc, units): bet the units of the highest TC reached; below the first entry, its units
+DEFAULT_RAMP = ((1, 1), (2, 2), (3, 4), (4, 8), (5, 12))
+RAMP_TC_MIN, RAMP_TC_MAX = -30, 30
+
+class DealtShoe:
+    """A physically shuffled shoe dealt front to back; Shoe-compatible for simulate_one_hand.
+
+    seq holds rank indices in deal order, pos is the next card; counts/total are the
+    cards not yet dealt, as in Shoe.
+    """
+    __slots__ = ("base", "seq", "pos", "counts", "total")
+
+    def __init__(self, decks):
+        comp = shoe_counts(decks)
+        self.base = [comp[r] for r in CARD_ORDER]
+        self.seq = [i for i, c in enumerate(self.base) for _ in range(c)]
+        self.pos = 0; self.counts = self.base[:]; self.total = len(self.seq)
+
+    def shuffle(self, rnd):
+        rnd.shuffle(self.seq)
+        self.pos = 0; self.counts = self.base[:]; self.total = len(self.seq)
+
+    def draw(self, rnd=None):
+        if self.total <= 0: return 'T'
+        i = self.seq[self.pos]; self.pos += 1
+        self.counts[i] -= 1; self.total -= 1
+        return CARD_ORDER[i]
+
+    def get(self, r, default=0):
+        i = CARD_INDEX.get(r)
+        return default if i is None else self.counts[i]
+
+def ramp_table(ramp):
+    """Bet units per TC trunc from RAMP_TC_MIN to RAMP_TC_MAX."""
+    ramp = sorted((int(tc), float(u)) for tc, u in ramp)
+    out = []
+    for tc in range(RAMP_TC_MIN, RAMP_TC_MAX + 1):
+        units = ramp[0][1]
+        for t, u in ramp:
+            if tc >= t: units = u
+        out.append(units)
+    return out
+
+def parse_ramp(text):
+    """"1:1,2:2,3:4" -> ((1, 1.0), (2, 2.0), (3, 4.0))."""
+    pairs = []
+    for item in filter(None, (t.strip() for t in text.split(","))):
+        tc, _, units = item.partition(":")
+        pairs.append((int(tc), float(units)))
+    if not pairs:
+        raise ValueError("empty bet ramp")
+    return tuple(sorted(pairs))
+
+def game_sums(rules, decks, pen, rounds, seed, ramps, systems=SYSTEMS, apply_idx=True, indices=None):
+    """Mergeable raw sums for whole shoes until at least `rounds` rounds are dealt:
+    [rounds, shoes, Σx, Σx², then Σw, Σw², Σbet per system], x = flat-bet result of a
+    round (units), w = x times that system's ramp bet. Index plays use the Hi-Lo TC floor,
+    or the TC floor of the IndexTable's system when `indices` is given."""
+    rnd = random.Random(seed)
+    strat = compile_strategy(rules, indices=indices)
+    shoe = DealtShoe(decks)
+    cut = int(len(shoe.seq)*(pen/100.0))
+    play_map = HI_LO if indices is None else dict(SYSTEMS)[indices.system]
+    hilo = [play_map.get(r, 0) for r in CARD_ORDER]
+    tags = [[m.get(r, 0) for r in CARD_ORDER] for _, m in systems]
+    tables = [ramp_table(ramps.get(name, DEFAULT_RAMP) if isinstance(ramps, dict) else ramps)
+              for name, _ in systems]
+    ns = len(systems)
+    out = [0.0]*(4 + 3*ns)
+    n = 0; shoes = 0; sx = sx2 = 0.0
+    while n < rounds:
+        shoe.shuffle(rnd); shoes += 1
+        seq = shoe.seq
+        play_rc = list(accumulate(map(hilo.__getitem__, seq), initial=0))
+        bet_rc = [list(accumulate(map(t.__getitem__, seq), initial=0)) for t in tags]
+        while shoe.pos < cut:
+            pos = shoe.pos
+            den = max(MIN_DECKS_DEN, (cut - pos)/52.0)
+            x = simulate_one_hand(shoe, rules, rnd, math.floor(play_rc[pos]/den), apply_idx, strat)
+            n += 1; sx += x; sx2 += x*x
+            for s in range(ns):
+                tc = int(bet_rc[s][pos]/den)
+                b = tables[s][0 if tc < RAMP_TC_MIN else -1 if tc > RAMP_TC_MAX else tc - RAMP_TC_MIN]
+                w = b*x
+                k = 4 + 3*s
+                out[k] += w; out[k+1] += w*w; out[k+2] += b
+    out[0] = n; out[1] = shoes; out[2] = sx; out[3] = sx2
+    return out
+
+def game_stats(sums, systems=SYSTEMS, bankroll=1000.0):
+    """Per-system results from merged game sums (units = one minimum bet).
+
+    win_rate and sd are per 100 rounds; ev_pct is win per unit wagered. SCORE is the win
+    per 100 rounds at the optimal bet for a 10,000-unit bankroll, 1e6*(mean/sd)^2 per
+    round; N0 = (sd/mean)^2 rounds; ror is the infinite-session risk of ruin for
+    `bankroll` units, exp(-2*mean*bankroll/var).
+    """
+    n = sums[0]
+    def stat(sw, sw2, sb):
+        mean = sw/n; var = max(1e-12, sw2/n - mean*mean); sd = math.sqrt(var)
+        return {
+            "rounds": int(n), "win_rate": 100.0*mean, "sd": 10.0*sd,
+            "se": 100.0*sd/math.sqrt(n), "avg_bet": sb/n,
+            "ev_pct": 100.0*sw/sb if sb else 0.0,
+            "score": 1e6*mean*mean/var if mean > 0 else 0.0,
+            "n0": var/(mean*mean) if mean > 0 else math.inf,
+            "ror": math.exp(-2.0*mean*bankroll/var) if mean > 0 else 1.0,
+        }
+    res = {"flat": stat(sums[2], sums[3], n)}
+    for s, (name, _) in enumerate(systems):
+        res[name] = stat(*sums[4+3*s:7+3*s])
+    res["flat"]["shoes"] = int(sums[1])
+    return res
+
+def simulate_game(rules, decks=6, pen=75, rounds=1_000_000, seed=2024, ramps=DEFAULT_RAMP, systems=SYSTEMS,
+                  apply_idx=True, bankroll=1000.0, workers=1, batch=200_000, progress=None, indices=None):
+    """Shoe-level simulation of every system's bet ramp on the same cards.
+
+    The budget is cut into batches of `batch` rounds with seeds from spawn_seeds, so a
+    run depends only on (seed, rounds, batch), not on the worker count; batches run on
+    the process pool one wave of `workers` at a time and progress(done, rounds) is called
+    after each wave. `ramps` is one ramp for every system or {name: ramp}; `indices` is an
+    IndexTable played instead of the built-in Hi-Lo indices. Returns
+    (game_stats(...), raw sums).
+    """
+    if int(rounds) < 1:
+        raise ValueError(f"rounds must be at least 1, got {rounds}")
+    parts = [batch]*(int(rounds)//batch) + ([int(rounds) % batch] if int(rounds) % batch else [])
+    seeds = spawn_seeds(seed, len(parts))
+    tasks = [(rules, decks, pen, r, s, ramps, systems, apply_idx, indices) for r, s in zip(parts, seeds)]
+    wave = max(1, int(workers))
+    sums = None
+    for i in range(0, len(tasks), wave):
+        for part in run_tasks(game_sums, tasks[i:i+wave], workers):
+            sums = part if sums is None else [a + b for a, b in zip(sums, part)]
+        if progress is not None:
+            progress(int(sums[0]), int(rounds))
+    return game_stats(sums, systems, bankroll), sums
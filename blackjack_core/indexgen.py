@@ -0,0 +1,189 @@
+"""Index generation: TC crossover points of strategy deviations for any counting system.
+
+Compositions are sampled from shuffled shoes at random depths, stratified by the
+system's true count (same denominator as the table: cards left to the cut). On each
+one every candidate deviation is valued exactly with ExactEV, one instance per upcard
+shared by all cells, so the dealer distributions of a composition are computed once
+per upcard. The gain of the deviation over the basic play is averaged per TC bucket;
+where it changes sign is the index.
+
+Pair splits are out of scope: there are no split cells, and IndexTable has no split
+override, so generated tables keep the basic split chart at every count (e.g. no
+T,T vs 5/6 or 9,9 vs 7 deviations).
+"""
+
+import math, random
+from itertools import accumulate
+
+from .counting import SYSTEMS, MIN_DECKS_DEN, shoe_counts
+from .dealer import RANKS10, comp10
+from .exact import ExactEV, exact_action_evs
+from .strategy import IndexTable, INDEX_ALWAYS, hard_action, soft_action
+from .parallel import run_tasks, spawn_seeds, split_hands
+
+INDEX_TC_MIN, INDEX_TC_MAX = -10, 12   # TC buckets; the end buckets absorb the tails
+NB = INDEX_TC_MAX - INDEX_TC_MIN + 1
+UPCARDS = ('2', '3', '4', '5', '6', '7', '8', '9', 'T', 'A')
+ACTION_NAMES = {'S': 'STAND', 'H': 'HIT', 'D': 'DOUBLE', 'SUR': 'SURRENDER'}
+QUOTA_PER_TASK = 4   # compositions per TC bucket in one pool task
+
+def index_cells(rules, upcards=UPCARDS):
+    """Candidate deviations (total, soft, up, action, base): `action` instead of the basic play `base`."""
+    cells = []
+    d10 = rules.get("D10", False)
+    for up in upcards:
+        for t in range(8, 18):
+            play = hard_action(t, up, rules, True)
+            if t <= 11 and (not d10 or t >= 10):
+                cells.append((t, False, up, 'H' if play == 'D' else 'D', play))
+            if 12 <= t <= 16:
+                cells.append((t, False, up, 'H' if play == 'S' else 'S', play))
+            if rules.get("LS", False) and t >= 14:
+                cells.append((t, False, up, 'SUR', play))
+        if not d10:
+            for t in range(13, 21):
+                play = soft_action(t, up, rules, True)
+                cells.append((t, True, up, soft_action(t, up, rules, False) if play == 'D' else 'D', play))
+        play = soft_action(18, up, rules, False)
+        cells.append((18, True, up, 'H' if play == 'S' else 'S', play))
+    return cells
+
+def _combos(total, soft):
+    """Two-card starting hands of a total as RANKS10 index pairs (pairs excluded: they split)."""
+    if soft: return [(9, total - 13)]
+    return [(a - 2, total - a - 2) for a in range(2, 11) if a < total - a <= 10]
+
+def _bucket(tc):
+    b = math.floor(tc)
+    return 0 if b < INDEX_TC_MIN else NB - 1 if b > INDEX_TC_MAX else b - INDEX_TC_MIN
+
+def _plan(cells):
+    """{up index: {(total, soft): (combos, actions, [(cell k, action, base)])}}"""
+    plan = {}
+    for k, (t, soft, up, action, base) in enumerate(cells):
+        hands = plan.setdefault(RANKS10.index(up), {})
+        combos, actions, owned = hands.setdefault((t, soft), (_combos(t, soft), set(), []))
+        actions.update((ACTION_NAMES[action], ACTION_NAMES[base]))
+        owned.append((k, action, base))
+    return plan
+
+def _evaluate(comp, rc, den, rules, plan, tags, out, ins_k):
+    for u, hands in plan.items():
+        if not comp[u]: continue
+        c = list(comp); c[u] -= 1
+        calc = ExactEV(rules, u, root=tuple(c))   # shared by every hand against this upcard
+        rem = dict(zip(RANKS10, comp))
+        rc_up = rc + tags[u]
+        for (t, soft), (combos, actions, owned) in hands.items():
+            weights = [c[a]*(c[b] - (a == b)) for a, b in combos]
+            wsum = sum(weights)
+            if wsum <= 0: continue
+            ev = dict.fromkeys(actions, 0.0); tag = 0.0
+            for (a, b), w in zip(combos, weights):
+                if not w: continue
+                w /= wsum
+                res = exact_action_evs(rem, rules, (RANKS10[a], RANKS10[b]), RANKS10[u], actions=list(actions), calc=calc)
+                for name in actions:
+                    ev[name] += w*res[name]
+                tag += w*(tags[a] + tags[b])
+            tc = (rc_up + tag)/den
+            b = _bucket(tc)
+            for k, action, base in owned:
+                j = (k*NB + b)*3
+                out[j] += 1; out[j+1] += tc; out[j+2] += ev[ACTION_NAMES[action]] - ev[ACTION_NAMES[base]]
+    if comp[9]:
+        # insurance vs an Ace: 2:1 on p(ten) -> gain 3p - 1 per unit insured (in %)
+        n = sum(comp) - 1
+        tc = (rc + tags[9])/den
+        j = (ins_k*NB + _bucket(tc))*3
+        out[j] += 1; out[j+1] += tc; out[j+2] += (3.0*comp[8]/n - 1.0)*100.0 if n > 0 else 0.0
+
+def index_sums(rules, decks, pen, system, cells, quota, seed, tc_den="cut", max_draws=50_000):
+    """Mergeable sums for generate_indices: [n, Σtc, Σgain] per (cell, TC bucket), then
+    insurance, for up to `quota` sampled compositions per bucket."""
+    tags = [dict(SYSTEMS)[system].get(r, 0) for r in RANKS10]
+    plan = _plan(cells)
+    rnd = random.Random(seed)
+    comp0 = comp10(shoe_counts(decks))
+    seq = [i for i, c in enumerate(comp0) for _ in range(c)]
+    cut = int(len(seq)*(pen/100.0))
+    end = cut if tc_den == "cut" else len(seq)
+    out = [0.0]*((len(cells) + 1)*NB*3)
+    filled = [0]*NB
+    for _ in range(max_draws):
+        if min(filled) >= quota: break
+        rnd.shuffle(seq)
+        prefix = list(accumulate(map(tags.__getitem__, seq), initial=0))
+        for _ in range(4):
+            d = rnd.randrange(max(1, cut - 3))   # cards dealt before this round
+            den = max(MIN_DECKS_DEN, (end - d - 3)/52.0)
+            b = _bucket(prefix[d]/den)
+            if filled[b] >= quota: continue
+            filled[b] += 1
+            comp = list(comp0)
+            for i in seq[:d]:
+                comp[i] -= 1
+            _evaluate(comp, prefix[d], den, rules, plan, tags, out, len(cells))
+    return out
+
+def crossover(buckets, min_n=2):
+    """(above, index, tc) from per-bucket [n, Σtc, Σgain]: the deviation wins at TC >= index
+    (above) or < index. INDEX_ALWAYS when it wins in every bucket; None when it never does."""
+    pts = [(stc/n, sg/n) for n, stc, sg in buckets if n >= min_n]
+    if len(pts) < 2: return None
+    if all(g > 0 for _, g in pts): return (True, INDEX_ALWAYS, None)
+    if all(g <= 0 for _, g in pts): return None
+    mx = sum(x for x, _ in pts)/len(pts); my = sum(g for _, g in pts)/len(pts)
+    sxy = sum((x - mx)*(g - my) for x, g in pts); sxx = sum((x - mx)**2 for x, _ in pts)
+    above = sxy > 0
+    root = mx - my*sxx/sxy if sxy else mx
+    best = None
+    for (x0, g0), (x1, g1) in zip(pts, pts[1:]):
+        if (g0 <= 0 < g1) if above else (g0 > 0 >= g1):
+            x = x0 - g0*(x1 - x0)/(g1 - g0)
+            if best is None or abs(x - root) < abs(best - root):
+                best = x
+    if best is None: return None
+    idx = min(INDEX_TC_MAX, max(INDEX_TC_MIN, int(math.floor(best + 0.5))))
+    return (above, idx, best)
+
+def generate_indices(rules, system="Hi-Lo", decks=6, pen=75, per_tc=24, seed=2024, workers=1,
+                     upcards=UPCARDS, tc_den="cut", progress=None):
+    """IndexTable for `system` under `rules`, plus a per-cell report.
+
+    tc_den="cut" measures the TC like the app (decks left to the cut, so indices read
+    straight off the table); "shoe" uses decks left in the whole shoe, the convention of
+    published index tables.
+
+    per_tc compositions are sampled per TC bucket (fewer in buckets the shoe rarely
+    reaches), in pool tasks of QUOTA_PER_TASK each with seeds from spawn_seeds, so the
+    result depends on (seed, per_tc) and not on `workers`. Report rows are (cell, result,
+    samples) with result as returned by crossover().
+    """
+    cells = index_cells(rules, upcards)
+    quotas = split_hands(per_tc, max(1, math.ceil(per_tc/QUOTA_PER_TASK)))
+    seeds = spawn_seeds(seed, len(quotas))
+    tasks = [(rules, decks, pen, system, cells, q, s, tc_den) for q, s in zip(quotas, seeds)]
+    wave = max(1, int(workers))
+    sums = None
+    for i in range(0, len(tasks), wave):
+        for part in run_tasks(index_sums, tasks[i:i+wave], workers):
+            sums = part if sums is None else [a + b for a, b in zip(sums, part)]
+        if progress is not None:
+            progress(min(i + wave, len(tasks)), len(tasks))
+    entries = []; report = []
+    for k, cell in enumerate(cells + [None]):
+        b = [sums[(k*NB + j)*3:(k*NB + j)*3 + 3] for j in range(NB)]
+        res = crossover(b)
+        report.append((cell, res, int(sum(x[0] for x in b))))
+        if cell is None: continue
+        t, soft, up, action, _ = cell
+        if res is not None:
+            entries.append((t, soft, up, action, res[0], res[1]))
+        elif action == 'SUR':
+            entries.append((t, soft, up, action, False, INDEX_ALWAYS))   # never surrender
+    ins = report[-1][1]
+    insurance = ins[1] if ins and ins[0] and ins[1] != INDEX_ALWAYS else None
+    meta = {"decks": decks, "pen": pen, "per_tc": per_tc, "seed": seed, "tc_den": tc_den,
+            "rules": {k: bool(v) for k, v in rules.items()}}
+    return IndexTable(system, entries, insurance, meta), report
@@ -0,0 +1,127 @@
+"""Background jobs for front ends: one worker thread, jobs coalesced and superseded by kind.
+
+Jobs run one at a time, so two CPU-bound simulations never fight over the GIL (their
+heavy lifting goes to the process pool). Results reach the UI through `post` (e.g. a
+Tk root.after) and are dropped there when the job was superseded or the state it
+was computed for is gone.
+"""
+
+import collections, sys, threading, traceback
+
+class Job:
+    """One submitted job. fn(job) runs on the scheduler thread; long jobs poll
+    job.cancelled() between chunks of work and return early when it is set."""
+    __slots__ = ("kind", "fn", "version", "current", "on_done", "on_error", "on_drop", "superseded", "_cancel")
+
+    def __init__(self, kind, fn, version, current, on_done, on_error, on_drop):
+        self.kind = kind; self.fn = fn; self.version = version; self.current = current
+        self.on_done = on_done; self.on_error = on_error; self.on_drop = on_drop
+        self.superseded = False
+        self._cancel = threading.Event()
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self):
+        return self._cancel.is_set()
+
+class JobScheduler:
+    """Queue of background jobs, at most one waiting per kind.
+
+    submit() replaces the waiting job of the same kind (coalesce) and, with
+    supersede=True, cancels the running one too; superseded jobs deliver nothing.
+    `post(fn)` must run fn on the UI thread. A job's results are delivered only if
+    job.current() (default: current_version) still equals the version it was
+    submitted with; otherwise the job is cancelled and job.on_drop() runs once.
+    """
+
+    def __init__(self, post, current_version=lambda: None):
+        self.post = post
+        self.current_version = current_version
+        self.stats = collections.Counter()   # submitted, coalesced, superseded, stale, done, failed
+        self._cond = threading.Condition()
+        self._waiting = collections.OrderedDict()   # kind -> Job, oldest first
+        self._running = None
+        self._thread = None
+        self._closed = False
+
+    def submit(self, kind, fn, version=None, current=None, on_done=None, on_error=None, on_drop=None, supersede=True):
+        job = Job(kind, fn, version, current or self.current_version, on_done, on_error, on_drop)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            self.stats["submitted"] += 1
+            old = self._waiting.pop(kind, None)
+            if old is not None:
+                old.superseded = True; old.cancel(); self.stats["coalesced"] += 1
+            run = self._running
+            if supersede and run is not None and run.kind == kind and not run.superseded:
+                run.superseded = True; run.cancel(); self.stats["superseded"] += 1
+            self._waiting[kind] = job
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="jobs", daemon=True)
+                self._thread.start()
+            self._cond.notify()
+        return job
+
+    def cancel(self, kind, supersede=False):
+        """Cancel the running and the waiting job of `kind`. They still deliver what they
+        return (as cancelled) unless supersede=True."""
+        with self._cond:
+            jobs = [self._waiting.pop(kind, None)]
+            if self._running is not None and self._running.kind == kind:
+                jobs.append(self._running)
+            for job in filter(None, jobs):
+                job.superseded = job.superseded or supersede
+                job.cancel()
+
+    def busy(self, kind=None):
+        with self._cond:
+            if kind is None:
+                return self._running is not None or bool(self._waiting)
+            return kind in self._waiting or (self._running is not None and self._running.kind == kind)
+
+    def deliver(self, job, callback, *args):
+        """callback(*args) on the UI thread, unless by then the job is superseded or stale."""
+        if callback is None: return
+        def check():
+            if job.superseded: return
+            if job.version is not None and job.current() != job.version:
+                self.stats["stale"] += 1
+                job.superseded = True; job.cancel()   # its remaining output is stale too
+                if job.on_drop is not None: job.on_drop()
+                return
+            callback(*args)
+        self.post(check)
+
+    def shutdown(self):
+        with self._cond:
+            self._closed = True
+            for job in self._waiting.values(): job.cancel()
+            self._waiting.clear()
+            if self._running is not None: self._running.cancel()
+            self._cond.notify()
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while not self._waiting and not self._closed:
+                    self._cond.wait()
+                if self._closed: return
+                _, job = self._waiting.popitem(last=False)
+                self._running = job
+            try:
+                result = job.fn(job)
+            except Exception as e:
+                self.stats["failed"] += 1
+                if job.on_error is not None:
+                    self.deliver(job, job.on_error, e)
+                else:
+                    print(f"job {job.kind!r} failed:", file=sys.stderr)
+                    traceback.print_exception(type(e), e, e.__traceback__)
+            else:
+                self.stats["done"] += 1
+                self.deliver(job, job.on_done, result)
+            finally:
+                with self._cond:
+                    self._running = None
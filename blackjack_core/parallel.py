@@ -0,0 +1,82 @@
+"""Process-pool backend for the simulators."""
+
+import os, threading, atexit
+
+# --------- Multi-core execution ---------
+# Worker tasks return raw (n, sum, sum^2) triples; the parent merges them in task order,
+# so a run is reproducible for a given seed and worker count.
+_POOLS = {}
+_POOLS_LOCK = threading.Lock()
+
+def default_workers():
+    return max(1, os.cpu_count() or 1)
+
+def spawn_seeds(seed, n):
+    """n independent child seeds derived deterministically from one user seed."""
+    import hashlib  # deferred: ~3 ms of OpenSSL startup most runs never need
+    return [int.from_bytes(hashlib.blake2b(f"{seed}:{i}".encode(), digest_size=8).digest(), "little")
+            for i in range(n)]
+
+def split_hands(hands, parts):
+    q, r = divmod(int(hands), max(1, int(parts)))
+    return [q + (1 if i < r else 0) for i in range(parts) if q or i < r]
+
+def merge_sums(parts):
+    n = sum(p[0] for p in parts)
+    return n, sum(p[1] for p in parts), sum(p[2] for p in parts)
+
+def get_pool(workers):
+    # "spawn" everywhere: forking a process that runs Tk threads is not safe
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    with _POOLS_LOCK:
+        pool = _POOLS.get(workers)
+        if pool is None:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _POOLS[workers] = pool
+        return pool
+
+def _warm():
+    import importlib
+    importlib.import_module(".simulate", __package__)   # the engine every task needs
+    return os.getpid()
+
+def warm_pool(workers):
+    """Start the pool for `workers` and its processes (engine imported) ahead of the first
+    run, so a click does not pay the process spawn. Blocks until they are up."""
+    if workers <= 1: return []
+    pool = get_pool(int(workers))
+    return sorted({f.result() for f in [pool.submit(_warm) for _ in range(int(workers))]})
+
+def shutdown_pools():
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.shutdown(wait=False, cancel_futures=True)
+        _POOLS.clear()
+
+atexit.register(shutdown_pools)
+
+def run_tasks(fn, arg_list, workers):
+    """Run fn(*args) for every args tuple, on a process pool when workers > 1; results in order."""
+    if workers <= 1 or len(arg_list) <= 1:
+        return [fn(*a) for a in arg_list]
+    pool = get_pool(int(workers))
+    futures = [pool.submit(fn, *a) for a in arg_list]
+    return [f.result() for f in futures]
+
+def iter_tasks(fn, arg_list, workers):
+    """Like run_tasks, but yields (index, result) as tasks finish (in order when run
+    in-process). Closing the generator cancels the tasks not started yet."""
+    if workers <= 1 or len(arg_list) <= 1:
+        for i, a in enumerate(arg_list):
+            yield i, fn(*a)
+        return
+    from concurrent.futures import as_completed
+    pool = get_pool(int(workers))
+    futures = {pool.submit(fn, *a): i for i, a in enumerate(arg_list)}
+    try:
+        for f in as_completed(futures):
+            yield futures[f], f.result()
+    finally:
+        for f in futures:
+            f.cancel()
@@ -0,0 +1,162 @@
+"""Player play and payout resolution for one simulated round."""
+
+from .cards import Hand, as_hand, is_blackjack
+from .dealer import dealer_play, comp10, rank10, dealer_outcome_dist, stand_ev_vs
+from .strategy import compile_strategy
+
+# --------- Resolution (ENHC/OBO exact) ---------
+def resolve_vs_dealer(p, up, dealer_hole, shoe, rules, rnd, doubled=False):
+    # ENHC: dealer BJ revealed at end -> doubles/splits lose all (except OBO original bet).
+    if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]):
+        if rules["OBO"]:
+            return -1.0
+        return -2.0 if doubled else -1.0
+
+    tot = as_hand(p).total
+    if tot > 21:
+        return -2.0 if doubled else -1.0
+
+    if rules.get("EXACT_DEALER"):
+        return exact_dealer_result(tot, up, dealer_hole, shoe, rules, 2.0 if doubled else 1.0)
+
+    # PEEK: USE the already-drawn hole card
+    dealer_total = dealer_play(dealer_start(up, dealer_hole, shoe, rules, rnd), shoe, rules, rnd)
+
+    if dealer_total > 21: return +2.0 if doubled else +1.0
+    if tot > dealer_total: return +2.0 if doubled else +1.0
+    if tot < dealer_total: return -2.0 if doubled else -1.0
+    return 0.0
+
+def resolve_vs_dealer_stand(p, up, dealer_hole, shoe, rules, rnd):
+    if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]):
+        return -1.0
+    tot = as_hand(p).total
+    if tot > 21: return -1.0
+    if rules.get("EXACT_DEALER"):
+        return exact_dealer_result(tot, up, dealer_hole, shoe, rules)
+    dealer_total = dealer_play(dealer_start(up, dealer_hole, shoe, rules, rnd), shoe, rules, rnd)
+    if dealer_total > 21: return +1.0
+    if tot > dealer_total: return +1.0
+    if tot < dealer_total: return -1.0
+    return 0.0
+
+def dealer_start(up, dealer_hole, shoe, rules, rnd):
+    """Dealer Hand before drawing: up + hole (a fresh hole card under PEEK when none is given)."""
+    h = Hand(); h.add(up)
+    if dealer_hole is not None: h.add(dealer_hole)
+    elif rules["PEEK"]: h.add(shoe.draw(rnd))
+    return h
+
+def exact_dealer_result(tot, up, dealer_hole, shoe, rules, mult=1.0):
+    """Expectation over the dealer's remaining draws instead of one random playout."""
+    dist = dealer_outcome_dist(comp10(shoe), rank10(up), rules, None if dealer_hole is None else rank10(dealer_hole))
+    return stand_ev_vs(dist, tot, mult) - mult*dist[6]
+
+# --------- Player ---------
+def play_hand(p, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True, strat=None):
+    if strat is None: strat = compile_strategy(rules)
+    p = as_hand(p)
+    first_two = (p.n == 2)
+    tot, soft = p.total, p.soft
+    # Index first (may recommend Stand/Double or Surrender)
+    override = strat.override(tot, soft, up, first_two, can_double, tc_floor) if apply_idx else None
+    if rules["LS"] and first_two and override == 'SUR' and p.pair != '8':
+        return -0.5
+    if can_split and first_two:
+    # ENHC + OBO: if the dealer has BJ, only the original bet is lost (split bet refunded)
+        if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]) and rules["OBO"]:
+            return -1.0
+        r1 = p.pair
+        if r1 is not None and strat.split(r1, up) and split_depth<3:
+            if r1=='A':
+                ev=0.0
+                for _ in range(2):
+                    hand=Hand(('A', shoe.draw(rnd)))
+                    if not rules["HSA"]:
+                        # If doubling allowed on split Aces but no hit: 1 card then stand, counted as a 'double'.
+                        if rules["DOUBLE_ON_SPLIT_ACES"]:
+                            ev += resolve_vs_dealer(hand, up, dealer_hole, shoe, rules, rnd, doubled=True)
+                        else:
+                            ev += resolve_vs_dealer_stand(hand, up, dealer_hole, shoe, rules, rnd)
+                    else:
+                        ev+=play_hand(hand, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx,
+                                      split_depth=split_depth+1,
+                                      can_double=(rules["DOUBLE_ON_SPLIT_ACES"]),
+                                      can_split=(rules["RSA"] and split_depth<3), strat=strat)
+                return ev
+            else:
+                ev=0.0
+                for _ in range(2):
+                    hand=Hand((r1, shoe.draw(rnd)))
+                    ev+=play_hand(hand, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx,
+                                  split_depth=split_depth+1,
+                                  can_double=rules["DAS"],
+                                  can_split=True, strat=strat)
+                return ev
+    # Base surrender – only if no index forced Stand/Double, and not 8,8
+    if override is None and rules["LS"] and first_two and not soft and p.pair != '8':
+        if (tot == 16 and up in ('9', 'T', 'J', 'Q', 'K', 'A')) or (tot == 15 and up == 'T'):
+            return -0.5
+    if override=='D' and can_double:
+        p.add(shoe.draw(rnd))
+        return resolve_vs_dealer(p, up, dealer_hole, shoe, rules, rnd, doubled=True)
+    act = override if override in ('H','S') else strat.action(tot, soft, up, can_double)
+    if act=='D' and can_double:
+        p.add(shoe.draw(rnd))
+        return resolve_vs_dealer(p, up, dealer_hole, shoe, rules, rnd, doubled=True)
+    # A stand/hit index decides the first move; basic strategy plays the rest
+    if act=='S':
+        return resolve_vs_dealer(p, up, dealer_hole, shoe, rules, rnd, doubled=False)
+    if act=='H' and p.total < 21:
+        p.add(shoe.draw(rnd))
+    while p.total < 21 and strat.action(p.total, p.soft, up, False) == 'H':
+        p.add(shoe.draw(rnd))
+    return resolve_vs_dealer(p, up, dealer_hole, shoe, rules, rnd, doubled=False)
+
+# --- Forced-first-action variant for advice ---
+def play_hand_forced_first(p, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx, force, split_depth=0, strat=None):
+    if strat is None: strat = compile_strategy(rules)
+    p = as_hand(p)
+    first_two = (p.n==2)
+    if force == 'SURRENDER' and rules["LS"] and first_two and p.pair != '8':
+        return -0.5
+    if force == 'SPLIT' and first_two:
+    # ENHC + OBO: same logic in "Compare" mode
+        if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]) and rules["OBO"]:
+            return -1.0
+        r1 = p.pair
+        if r1 is not None and split_depth<3:
+            if r1=='A':
+                ev=0.0
+                for _ in range(2):
+                    hand=Hand(('A', shoe.draw(rnd)))
+                    if not rules["HSA"]:
+                        # If doubling allowed on split Aces but no hit: 1 card then stand, counted as a 'double'.
+                        if rules["DOUBLE_ON_SPLIT_ACES"]:
+                            ev += resolve_vs_dealer(hand, up, dealer_hole, shoe, rules, rnd, doubled=True)
+                        else:
+                            ev += resolve_vs_dealer_stand(hand, up, dealer_hole, shoe, rules, rnd)
+                    else:
+                        ev+=play_hand(hand, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx,
+                                      split_depth=split_depth+1,
+                                      can_double=(rules["DOUBLE_ON_SPLIT_ACES"]),
+                                      can_split=(rules["RSA"] and split_depth<3), strat=strat)
+                return ev
+            else:
+                ev=0.0
+                for _ in range(2):
+                    hand=Hand((r1, shoe.draw(rnd)))
+                    ev+=play_hand(hand, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx,
+                                  split_depth=split_depth+1,
+                                  can_double=rules["DAS"],
+                                  can_split=True, strat=strat)
+                return ev
+    if force == 'DOUBLE':
+        p2=p.copy(); p2.add(shoe.draw(rnd))
+        return resolve_vs_dealer(p2, up, dealer_hole, shoe, rules, rnd, doubled=True)
+    if force == 'STAND':
+        return resolve_vs_dealer_stand(p, up, dealer_hole, shoe, rules, rnd)
+    if force == 'HIT':
+        p2=p.copy(); p2.add(shoe.draw(rnd))
+        return play_hand(p2, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx, split_depth=split_depth, strat=strat)
+    return play_hand(p, up, dealer_hole, shoe, rules, rnd, tc_floor, apply_idx, split_depth=split_depth, strat=strat)
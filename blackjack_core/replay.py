@@ -0,0 +1,93 @@
+"""Replay recorded shoes through the count engine, one output row per card.
+
+Everything is a generator: lines are read, counted and written one at a time, so
+memory stays flat whatever the size of the log.
+"""
+
+import math, re
+
+from .counting import SYSTEMS, CountState, estimate_base_edge, slope_for
+
+# Same tokens as the GUI key bindings (0/t = ten), plus "10"
+TOKEN_RANK = {str(n): str(n) for n in range(2, 10)}
+TOKEN_RANK.update({'10': 'T', '0': 'T', 't': 'T', 'T': 'T', 'j': 'J', 'J': 'J', 'q': 'Q', 'Q': 'Q',
+                   'k': 'K', 'K': 'K', 'a': 'A', 'A': 'A'})
+_TOKEN_RE = re.compile(r"10|[^\s,;]")   # separators optional: "T 5 A" == "T,5,A" == "T5A"
+
+SYSTEM_KEYS = {"Hi-Lo": "hilo", "Zen": "zen", "Omega II": "omega2", "Hi-Opt II": "hiopt2"}
+
+def fields(systems=SYSTEMS):
+    """Column names of the rows produced by replay()."""
+    out = ["shoe", "n", "card"]
+    for name, _ in systems:
+        k = SYSTEM_KEYS.get(name, name.lower().replace(' ', '').replace('-', ''))
+        out += [f"{k}_rc", f"{k}_tc", f"{k}_tc_floor", f"{k}_tc_trunc", f"{k}_ev"]
+    return out + ["ins_roi"]
+
+def parse_shoe(line):
+    """Ranks of one logged shoe; ValueError on an unknown token."""
+    ranks = []
+    for tok in _TOKEN_RE.findall(line):
+        r = TOKEN_RANK.get(tok)
+        if r is None:
+            raise ValueError(f"unknown card token {tok!r}")
+        ranks.append(r)
+    return ranks
+
+def replay(lines, rules, decks=6, pen=75, side_ace_used=False, systems=SYSTEMS, errors=None):
+    """Rows (shoe, n, card, per system rc/tc/tc_floor/tc_trunc/ev, ins_roi) for every card.
+
+    One shoe per non-blank line of `lines`; lines starting with '#' are skipped. EV is
+    the GUI's linear model (base edge + slope x TC floor). Cards the shoe cannot hold
+    (more of a rank than `decks` decks contain) and bad tokens are skipped; each problem
+    is appended to `errors` as (shoe, message) when a list is given.
+    """
+    base = estimate_base_edge(decks, rules.get("H17", False), rules.get("DAS", True), rules.get("RSA", False),
+                              rules.get("HSA", False), rules.get("DOUBLE_ON_SPLIT_ACES", False),
+                              rules.get("D10", False), rules.get("LS", False), rules.get("PEEK", True))
+    slopes = [slope_for(name, decks, side_ace_used=(side_ace_used if name in ("Omega II", "Hi-Opt II") else True))
+              for name, _ in systems]
+    st = CountState(decks, pen, systems)
+    shoe = 0
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#'):
+            continue
+        shoe += 1
+        try:
+            ranks = parse_shoe(line)
+        except ValueError as e:
+            if errors is not None: errors.append((shoe, str(e)))
+            continue
+        st.reset()
+        n = 0
+        for r in ranks:
+            if not st.add(r):
+                if errors is not None: errors.append((shoe, f"card {n+1}: no {r} left in a {decks}-deck shoe"))
+                continue
+            n += 1
+            den = st.decks_remaining()
+            row = [shoe, n, r]
+            for rc, slope in zip(st.rc, slopes):
+                tc = rc/den
+                fl = math.floor(tc)
+                row += (rc, round(tc, 4), fl, math.trunc(tc), round(base + slope*fl, 3))
+            ins = st.insurance_ev()
+            row.append(None if ins is None else round(ins, 3))
+            yield row
+
+def write_csv(rows, out, systems=SYSTEMS):
+    import csv
+    w = csv.writer(out, lineterminator="\n")
+    w.writerow(fields(systems))
+    w.writerows(rows)
+
+def write_jsonl(rows, out, systems=SYSTEMS):
+    import json
+    keys = fields(systems)
+    dumps = json.JSONEncoder(separators=(",", ":")).encode
+    for row in rows:
+        out.write(dumps(dict(zip(keys, row))))
+        out.write("\n")
+
+WRITERS = {"csv": write_csv, "jsonl": write_jsonl}
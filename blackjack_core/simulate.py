@@ -0,0 +1,302 @@
+"""Monte-Carlo EV, EOR calibration and fixed-action simulation."""
+
+import math, random
+
+from .cards import CARD_ORDER, CARD_INDEX, TEN_RANKS, Hand, Shoe, copy_counts, is_blackjack
+from .counting import INS_THRESH_HILO
+from .strategy import compile_strategy
+from .play import play_hand, play_hand_forced_first
+from .parallel import run_tasks, iter_tasks, split_hands, spawn_seeds, merge_sums
+
+# --------- Monte Carlo / EOR ---------
+def simulate_ev(rem_counts, rules, hands=20000, seed=12345, tc_floor=0, apply_idx=True, engine="python", workers=1, exact_dealer=False):
+    # engine: "python" (reference, one hand at a time), "numpy" (vectorized) or "auto"
+    # workers > 1: the hand budget is split across a process pool (see run_tasks)
+    # exact_dealer: replace each random dealer playout by its exact expectation (python engine)
+    if workers > 1:
+        parts = split_hands(hands, workers)
+        seeds = spawn_seeds(seed, len(parts))
+        sums = run_tasks(simulate_ev_sums, [(rem_counts, rules, h, s, tc_floor, apply_idx, engine, exact_dealer) for h, s in zip(parts, seeds)], workers)
+        return mean_var(*merge_sums(sums))
+    return mean_var(*simulate_ev_sums(rem_counts, rules, hands, seed, tc_floor, apply_idx, engine, exact_dealer))
+
+def simulate_ev_sums(rem_counts, rules, hands, seed, tc_floor=0, apply_idx=True, engine="python", exact_dealer=False):
+    """Raw (n, sum ev, sum ev^2) for one seed: the mergeable unit behind simulate_ev."""
+    if exact_dealer:
+        rules = dict(rules, EXACT_DEALER=True); engine = "python"
+    if engine != "python":
+        from .vectorized import numpy_available, simulate_ev_np_sums  # keeps startup free of NumPy
+        if engine == "auto":
+            engine = "numpy" if numpy_available() else "python"
+    if engine == "numpy":
+        return simulate_ev_np_sums(rem_counts, rules, hands, seed, tc_floor, apply_idx)
+    rnd = random.Random(seed)
+    strat = compile_strategy(rules)
+    shoe = Shoe(rem_counts); snap = shoe.snapshot()
+    total=0.0; total2=0.0
+    for _ in range(hands):
+        shoe.restore(snap)
+        ev = simulate_one_hand(shoe, rules, rnd, tc_floor, apply_idx, strat)
+        total += ev; total2 += ev*ev
+    return hands, total, total2
+
+PROGRESS_CHUNK = 10_000   # hands per seeded chunk of simulate_ev_progressive
+
+def simulate_ev_progressive(rem_counts, rules, hands=20000, seed=12345, tc_floor=0, apply_idx=True, engine="python",
+                            workers=1, exact_dealer=False, target_se=None, chunk=PROGRESS_CHUNK):
+    """simulate_ev that reports as it goes: yields (n, mean %, var, se %) after every wave.
+
+    The budget is cut into chunks of `chunk` hands with seeds from spawn_seeds, run
+    `workers` at a time, so the running estimate depends on (seed, hands, chunk) and not
+    on the worker count. Stops early once se <= target_se (percentage points, after at
+    least two chunks). Closing the generator cancels the run after the wave in flight.
+    """
+    hands = int(hands)
+    parts = [chunk]*(hands//chunk) + ([hands % chunk] if hands % chunk else [])
+    seeds = spawn_seeds(seed, len(parts))
+    wave = max(1, int(workers))
+    n = 0; total = total2 = 0.0
+    for i in range(0, len(parts), wave):
+        tasks = [(rem_counts, rules, h, s, tc_floor, apply_idx, engine, exact_dealer)
+                 for h, s in zip(parts[i:i+wave], seeds[i:i+wave])]
+        for part in run_tasks(simulate_ev_sums, tasks, workers):
+            n += part[0]; total += part[1]; total2 += part[2]
+        mean, var = mean_var(n, total, total2)
+        se = 100.0*math.sqrt(var/n)
+        yield n, mean, var, se
+        if target_se and se <= target_se and i + wave >= 2:
+            return
+
+def mean_var(n, total, total2):
+    """(mean EV %, per-hand variance) from raw sums."""
+    mean = (total/n)*100.0
+    var  = max(1e-9, ((total2/n) - (total/n)**2))
+    return mean, var
+
+def simulate_one_hand(shoe, rules, rnd, tc_floor, apply_idx, strat=None):
+    """One round dealt from `shoe` (consumed; callers restore a snapshot between hands)."""
+    p=Hand(); p.add(shoe.draw(rnd)); up=shoe.draw(rnd); p.add(shoe.draw(rnd))
+    hole = shoe.draw(rnd)  # always drawn (even in ENHC)
+    player_bj = p.blackjack
+    ins_ev=0.0
+    if up=='A':
+        tens = shoe.counts[8]+shoe.counts[9]+shoe.counts[10]+shoe.counts[11]
+        denom = shoe.total; p_bj=(tens/denom) if denom>0 else 0.0
+        take = (tc_floor>=(INS_THRESH_HILO if strat is None else strat.ins)) or (p_bj>1/3.0)
+        if rules["PEEK"]:
+            if is_blackjack([up,hole]): 
+                ins_ev += +1.0 if take else 0.0
+                return (0.0 if player_bj else -1.0)+ins_ev
+            else:
+                ins_ev += -0.5 if take else 0.0
+        # ENHC: many casinos do not offer insurance -> leave ins_ev=0 if PEEK=False
+
+    if rules["PEEK"]:
+        if up in TEN_RANKS and hole=='A': return (0.0 if player_bj else -1.0)+ins_ev
+        if player_bj: return (1.5 if rules["BJ_3_2"] else 1.2)+ins_ev
+        ev = play_hand(p, up, hole, shoe, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True, strat=strat)
+        return ev + ins_ev
+    else:
+        if player_bj: return (1.5 if rules["BJ_3_2"] else 1.2)+ins_ev
+        ev_player = play_hand(p, up, hole, shoe, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True, strat=strat)
+        return ev_player + ins_ev
+
+def calibrate_eor(rem_counts, rules, hands=10000, seed=789, tc_floor=0, apply_idx=True, engine="python", workers=1,
+                  cancelled=None):
+    """(base EV %, eor) from independent runs: the shoe, then the shoe minus one card of
+    each rank. cancelled() is checked between runs (pool waves with workers > 1); once it
+    is true the calibration stops and returns None."""
+    jobs = [(None, rem_counts, hands, seed)]
+    rank_seeds = spawn_seeds(seed, len(CARD_ORDER))  # stable across runs (no str hash)
+    for i, r in enumerate(CARD_ORDER):
+        if rem_counts.get(r,0)<=0: continue
+        c2 = copy_counts(rem_counts); c2[r]-=1
+        jobs.append((r, c2, max(2000,hands//2), rank_seeds[i]))
+    if workers > 1:
+        # every (base / removed-rank) run is split across the pool in one batch
+        tasks = []; owner = []
+        for key, comp, n, sd in jobs:
+            parts = split_hands(n, workers)
+            for h, s in zip(parts, spawn_seeds(sd, len(parts))):
+                tasks.append((comp, rules, h, s, tc_floor, apply_idx, engine)); owner.append(key)
+        sums = {}
+        wave = int(workers)
+        for i in range(0, len(tasks), wave):
+            if cancelled is not None and cancelled(): return None
+            for key, part in zip(owner[i:i+wave], run_tasks(simulate_ev_sums, tasks[i:i+wave], workers)):
+                sums.setdefault(key, []).append(part)
+        ev = {key: mean_var(*merge_sums(parts))[0] for key, parts in sums.items()}
+    else:
+        ev = {}
+        for key, comp, n, sd in jobs:
+            if cancelled is not None and cancelled(): return None
+            ev[key] = simulate_ev(comp, rules, hands=n, seed=sd, tc_floor=tc_floor, apply_idx=apply_idx, engine=engine)[0]
+    base = ev[None]
+    eor = {r: (ev[r] - base if r in ev else 0.0) for r in CARD_ORDER}
+    return base, eor
+
+CRN_CHUNK = 500   # rounds per seeded chunk of calibrate_eor_crn (each round is ~14 replays)
+
+def calibrate_eor_crn(rem_counts, rules, hands=4000, seed=789, tc_floor=0, apply_idx=True, workers=1, exact_dealer=False,
+                      cancelled=None, chunk=CRN_CHUNK):
+    """EOR by paired removal (common random numbers).
+
+    Each round is dealt once from the base shoe; for every rank r the same round is
+    replayed with one r card deleted from its card sequence (see ReplayShoe), averaged
+    exactly over which of the r cards is the deleted one. Deletions past the cards the
+    round used only change composition-dependent decisions, so the per-round deltas are
+    far less noisy than two independent runs. Returns (base EV %, eor, se) with se[r]
+    the standard error of eor[r], in percentage points.
+
+    Rounds go in chunks of `chunk` with seeds from spawn_seeds, `workers` chunks at a
+    time, so the result depends on (seed, hands, chunk) and not on the worker count.
+    cancelled() is checked between waves; once it is true the run returns None.
+    """
+    hands = int(hands)
+    parts = [chunk]*(hands//chunk) + ([hands % chunk] if hands % chunk else [])
+    tasks = [(rem_counts, rules, h, s, tc_floor, apply_idx, exact_dealer)
+             for h, s in zip(parts, spawn_seeds(seed, len(parts)))]
+    wave = max(1, int(workers))
+    sums = [0.0]*(3 + 2*len(CARD_ORDER))
+    for i in range(0, len(tasks), wave):
+        if cancelled is not None and cancelled(): return None
+        for part in run_tasks(eor_crn_sums, tasks[i:i+wave], workers):
+            sums = [a + b for a, b in zip(sums, part)]
+    n = sums[0]
+    base = mean_var(n, sums[1], sums[2])[0]
+    eor = {}; se = {}
+    for i, r in enumerate(CARD_ORDER):
+        if rem_counts.get(r,0) > 0:
+            eor[r], var = mean_var(n, sums[3+2*i], sums[4+2*i])
+            se[r] = 100.0*math.sqrt(var/n)
+        else:
+            eor[r] = se[r] = 0.0
+    return base, eor, se
+
+def eor_crn_sums(rem_counts, rules, hands, seed, tc_floor=0, apply_idx=True, exact_dealer=False):
+    """Mergeable raw sums for calibrate_eor_crn: [n, Σev, Σev², then Σd, Σd² per rank in
+    CARD_ORDER], d = EV(one r removed) - EV(base) for the same round."""
+    if exact_dealer:
+        rules = dict(rules, EXACT_DEALER=True)
+    strat = compile_strategy(rules)
+    rnd = random.Random(seed)
+    source = Shoe(rem_counts); snap = source.snapshot()
+    deck = ReplayShoe(source, rnd)
+    ranks = [(i, c) for i, c in enumerate(source.counts) if c > 0]
+    out = [0.0]*(3 + 2*len(CARD_ORDER)); out[0] = hands
+    for _ in range(hands):
+        source.restore(snap); deck.deal()
+        ev0 = simulate_one_hand(deck, rules, rnd, tc_floor, apply_idx, strat)
+        out[1] += ev0; out[2] += ev0*ev0
+        used = deck.seq[:deck.pos]
+        for i, c in ranks:
+            # the k-th r card is the deleted one with probability 1/c; every k >= m (not
+            # reached by this round) replays the same cards, so one replay covers them
+            m = used.count(i)
+            acc = 0.0
+            for k in range(m):
+                deck.replay(i, k)
+                acc += simulate_one_hand(deck, rules, rnd, tc_floor, apply_idx, strat) - ev0
+            deck.replay(i, m)
+            acc += (c - m)*(simulate_one_hand(deck, rules, rnd, tc_floor, apply_idx, strat) - ev0)
+            d = acc / c
+            out[3+2*i] += d; out[4+2*i] += d*d
+    return out
+
+class ReplayShoe:
+    """Shoe stand-in that deals one shared card sequence, drawn lazily from `source`.
+
+    deal() starts a round on the full sequence; replay(i, k) restarts it with the k-th
+    card of rank index i deleted, which is a uniform shuffle of the shoe minus that card.
+    counts/total track the cards still unseen, as in Shoe.
+    """
+    __slots__ = ("source", "rnd", "seq", "pos", "counts", "total", "base", "skip", "skip_k", "seen")
+
+    def __init__(self, source, rnd):
+        self.source = source; self.rnd = rnd
+        self.base = source.counts[:]
+        self.seq = []; self.skip = -1; self.skip_k = self.seen = self.pos = 0
+        self.counts = self.base[:]; self.total = sum(self.base)
+
+    def deal(self):
+        self.seq = []
+        self.replay(-1, 0)
+
+    def replay(self, i, k):
+        self.pos = 0; self.skip = i; self.skip_k = k; self.seen = 0
+        self.counts = self.base[:]; self.total = self.source.total + len(self.seq)
+        if i >= 0:
+            self.counts[i] -= 1; self.total -= 1
+
+    def get(self, r, default=0):
+        i = CARD_INDEX.get(r)
+        return default if i is None else self.counts[i]
+
+    def draw(self, rnd=None):
+        if self.total <= 0: return 'T'
+        seq = self.seq
+        while True:
+            if self.pos == len(seq):
+                seq.append(CARD_INDEX[self.source.draw(self.rnd)])
+            i = seq[self.pos]; self.pos += 1
+            if i == self.skip:
+                self.seen += 1
+                if self.seen == self.skip_k + 1: continue
+            break
+        self.counts[i] -= 1; self.total -= 1
+        return CARD_ORDER[i]
+
+def simulate_fixed_action(rem_counts, rules, player_cards, dealer_up, hands=8000, seed=42, tc_floor=0, apply_idx=True, force='AUTO', workers=1, exact_dealer=False):
+    if exact_dealer:
+        rules = dict(rules, EXACT_DEALER=True)
+    if workers > 1:
+        parts = split_hands(hands, workers)
+        seeds = spawn_seeds(seed, len(parts))
+        sums = run_tasks(fixed_action_sums, [(rem_counts, rules, player_cards, dealer_up, h, s, tc_floor, apply_idx, force)
+                                            for h, s in zip(parts, seeds)], workers)
+        n, total_ev, _ = merge_sums(sums)
+        return (total_ev/n)*100.0
+    n, total_ev, _ = fixed_action_sums(rem_counts, rules, player_cards, dealer_up, hands, seed, tc_floor, apply_idx, force)
+    return (total_ev/n)*100.0
+
+def simulate_actions(rem_counts, rules, player_cards, dealer_up, actions, hands=8000, seed=42, tc_floor=0, apply_idx=True, workers=1, exact_dealer=False):
+    """simulate_fixed_action for several forced actions at once: yields (action, EV %) as
+    each action finishes. With workers > 1 every action's hands are split into
+    max(1, workers // len(actions)) tasks and all of them go to the pool together, so
+    the actions run side by side."""
+    if exact_dealer:
+        rules = dict(rules, EXACT_DEALER=True)
+    per = max(1, int(workers)//len(actions)) if workers > 1 else 1
+    tasks = []; owner = []
+    for a, sd in zip(actions, spawn_seeds(seed, len(actions))):
+        parts = split_hands(hands, per)
+        for h, s in zip(parts, spawn_seeds(sd, len(parts))):
+            tasks.append((rem_counts, rules, player_cards, dealer_up, h, s, tc_floor, apply_idx, a)); owner.append(a)
+    left = {a: owner.count(a) for a in actions}
+    done = {a: [] for a in actions}
+    for i, part in iter_tasks(fixed_action_sums, tasks, workers):
+        a = owner[i]
+        done[a].append((i, part)); left[a] -= 1
+        if not left[a]:
+            n, total_ev, _ = merge_sums([p for _, p in sorted(done[a])])   # task order: same sums every run
+            yield a, (total_ev/n)*100.0
+
+def fixed_action_sums(rem_counts, rules, player_cards, dealer_up, hands, seed, tc_floor=0, apply_idx=True, force='AUTO'):
+    rnd = random.Random(seed); total_ev=0.0; total2=0.0
+    strat = compile_strategy(rules)
+    shoe = Shoe(rem_counts)
+    for c in list(player_cards) + [dealer_up]:
+        shoe.remove(c)
+    snap = shoe.snapshot()
+    start = Hand(player_cards); player_bj = start.blackjack
+    for _ in range(hands):
+        shoe.restore(snap)
+        hole = shoe.draw(rnd)  # always drawn
+        if rules["PEEK"] and is_blackjack([dealer_up,hole]): 
+            ev = (0.0 if player_bj else -1.0)
+        elif player_bj: 
+            ev = (1.5 if rules["BJ_3_2"] else 1.2)
+        else:
+            ev = play_hand_forced_first(start.copy(), dealer_up, hole, shoe, rules, rnd, tc_floor, apply_idx, force, strat=strat)
+        total_ev += ev; total2 += ev*ev
+    return hands, total_ev, total2
@@ -0,0 +1,286 @@
+"""Basic strategy, Illustrious 18 / Fab 4 indices and their compiled tables."""
+
+from .cards import CARD_ORDER, CARD_INDEX, TEN_RANKS, up_to_val
+from .counting import INS_THRESH_HILO
+
+UP_3456   = ('3','4','5','6')
+UP_456    = ('4','5','6')
+UP_56     = ('5','6')
+UP_23456  = ('2','3','4','5','6')
+UP_79TJQKA = ('7','9','T','J','Q','K','A')
+
+# --- Illustrious 18 + Fab 4 override (Hi-Lo, multi-decks approx) ---
+def apply_indices_override(total, soft, up, first_two, can_double, tc_floor, rules):
+    """Return 'D','S','H','SUR' or None based on indices."""
+    # Fab 4 (Late Surrender)
+    if rules.get("LS", False) and first_two and not soft:
+        if total == 15 and up == 'T' and tc_floor >= 0: return 'SUR'
+        if total == 15 and up == '9' and tc_floor >= 2: return 'SUR'
+        if total == 15 and up == 'A' and tc_floor >= 1: return 'SUR'
+        if total == 14 and up == 'T' and tc_floor >= 3: return 'SUR'
+        # 16 vs 9/T/A and 15 vs T surrender at every count: no stand/hit index fires there
+        if base_surrender(total, soft, up): return None
+
+    # Doubling guard for D10
+    def dbl_ok(t):
+        return can_double and (not rules.get("D10", False) or t in (10,11))
+
+    # Soft exceptions (I18)
+    if soft:
+        # A,8 vs 6: Double at +1 else Stand (respects D10)
+        if total == 19 and up == '6' and first_two and dbl_ok(19) and tc_floor >= 1:
+            if not rules.get("D10", False):
+                return 'D'
+            else:
+                return None
+        return None
+
+    # Illustrious 18 (hard)
+    if total == 16 and up == 'T':                    return 'S' if tc_floor >= 0 else None
+    if total == 15 and up == 'T':                    return 'S' if tc_floor >= 4 else None
+    if total == 10 and up in TEN_RANKS and first_two and dbl_ok(10):
+                                                    return 'D' if tc_floor >= 4 else None
+    if total == 12 and up == '3':                    return 'S' if tc_floor >= 2 else None
+    if total == 12 and up == '2':                    return 'S' if tc_floor >= 3 else None
+    if total == 11 and up == 'A' and first_two and dbl_ok(11):
+                                                    return 'D' if tc_floor >= 1 else None
+    if total == 9  and up == '2' and first_two and dbl_ok(9):
+                                                    return 'D' if tc_floor >= 1 else None
+    if total == 10 and up == 'A' and first_two and dbl_ok(10):
+                                                    return 'D' if tc_floor >= 4 else None
+    if total == 9  and up == '7' and first_two and dbl_ok(9):
+                                                    return 'D' if tc_floor >= 3 else None
+    if total == 16 and up == '9':                    return 'S' if tc_floor >= 5 else None
+
+    # Negative indices (default Stand -> Hit if TC too low)
+    if total == 13 and up == '2':                    return 'H' if tc_floor < -1 else None
+    if total == 13 and up == '3':                    return 'H' if tc_floor < -2 else None
+    if total == 12 and up == '4':                    return 'H' if tc_floor < 0  else None
+    if total == 12 and up == '5':                    return 'H' if tc_floor < -2 else None
+    if total == 12 and up == '6':                    return 'H' if tc_floor < -1 else None
+
+    # 12 vs 7: Stand at +3 (else base = Hit)
+    if total == 12 and up == '7':                    return 'S' if tc_floor >= 3 else None
+
+    return None
+
+def base_surrender(total, soft, up):
+    """Basic-strategy late surrender (as in play_hand): 16 vs 9/T/A, 15 vs T."""
+    if soft: return False
+    return (total == 16 and up in ('9', 'T', 'J', 'Q', 'K', 'A')) or (total == 15 and up == 'T')
+
+# --- Generated index tables (see indexgen) ---
+INDEX_ALWAYS = -99   # index of a deviation that wins at every sampled count
+
+class IndexTable:
+    """Playing indices for one counting system, consumed like apply_indices_override.
+
+    entries are (total, soft, up, action, above, index): play `action` when the TC floor
+    is >= index (above=True) or < index (above=False), otherwise basic strategy. Ten
+    upcards share the 'T' entries. `insurance` is the TC floor at which to insure (None:
+    keep the Hi-Lo threshold).
+    """
+    def __init__(self, system, entries, insurance=None, meta=None):
+        self.system = system
+        self.entries = tuple(sorted((int(t), bool(s), u, a, bool(ab), int(i)) for t, s, u, a, ab, i in entries))
+        for t, s, u, a, ab, i in self.entries:
+            if u not in CARD_ORDER or a not in ('H', 'S', 'D', 'SUR') or not 4 <= t <= 21:
+                raise ValueError(f"bad index entry: {t}{' soft' if s else ''} vs {u} -> {a}")
+        self.insurance = None if insurance is None else int(insurance)
+        self.meta = dict(meta or {})
+        order = {'SUR': 0, 'D': 1}
+        by_hand = {}
+        for t, s, u, a, ab, i in sorted(self.entries, key=lambda e: order.get(e[3], 2)):
+            by_hand.setdefault((t, s, u), []).append((a, ab, i))
+        self._by_hand = by_hand
+        finite = [e[5] for e in self.entries if e[5] != INDEX_ALWAYS]
+        self.tc_range = (min(finite + [0]) - 1, max(finite + [0]))
+        self.key = (system, self.entries, self.insurance)
+
+    def override(self, total, soft, up, first_two, can_double, tc_floor, rules):
+        """Return 'D','S','H','SUR' or None, same contract as apply_indices_override."""
+        up = 'T' if up in TEN_RANKS else up
+        ls = rules.get("LS", False) and first_two and not soft
+        surrender_base = ls and base_surrender(total, soft, up)
+        sur_entry = False; play = None
+        for action, above, idx in self._by_hand.get((total, bool(soft), up), ()):
+            if action == 'SUR':
+                sur_entry = True
+                if ls and (tc_floor >= idx) == above: return 'SUR'
+                continue
+            if (tc_floor >= idx) != above:
+                continue
+            if action == 'D':
+                if first_two and can_double and (not rules.get("D10", False) or total in (10, 11)): return 'D'
+                continue
+            if surrender_base:
+                play = play or action   # a stand/hit index does not outrank basic surrender
+                continue
+            return action
+        if surrender_base and sur_entry:
+            # the index said "don't surrender here": name the play so play_hand's basic surrender stays off
+            return play or hard_action(total, up, rules, can_double)
+        return None
+
+    def to_json(self):
+        return {"system": self.system, "insurance": self.insurance, "meta": self.meta,
+                "entries": [{"total": t, "soft": s, "up": u, "action": a, "when": ">=" if ab else "<", "index": i}
+                            for t, s, u, a, ab, i in self.entries]}
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(data["system"], [(e["total"], e["soft"], e["up"], e["action"], e["when"] == ">=", e["index"])
+                                    for e in data["entries"]], data.get("insurance"), data.get("meta"))
+
+    def save(self, path):
+        import json  # deferred: json pulls in re, most of the import time of the play path
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_json(), f, indent=1)
+
+def load_index_table(path):
+    import json
+    with open(path, "r", encoding="utf-8") as f:
+        return IndexTable.from_json(json.load(f))
+
+# --------- Basic strategy ---------
+def should_split(rank, up, rules):
+    """Basic strategy pairs (multi-deck). Correctly handles DAS / non-DAS."""
+    das = rules.get("DAS", True)
+    if rank == 'A' or rank == '8':
+        return True
+    if rank in TEN_RANKS:
+        return False
+    if rank == '9':
+        # Split 9s vs 2–6,8,9 (not vs 7,T,A)
+        return up not in ('7',) + TEN_RANKS + ('A',)
+    if rank == '7':
+        # With DAS: 2–7 ; without DAS: 2–6
+        return (up in UP_23456) or (das and up == '7')
+    if rank == '6':
+        # With DAS: 2–6 ; without DAS: 3–6
+        return (up in UP_23456) if das else (up in ('3','4','5','6'))
+    if rank in ('2','3'):
+        # With DAS: 2–7 ; without DAS: 4–7
+        return (up in UP_23456 + ('7',)) if das else (up in ('4','5','6','7'))
+    if rank == '4':
+        # Only with DAS vs 5–6
+        return das and (up in UP_56)
+    return False
+
+def hard_action(t, up, rules, can_double):
+    def can_dbl(total):
+        return can_double and (not rules.get("D10", False) or total in (10, 11))
+    if t >= 17:
+        return 'S'
+    if t >= 13 and up_to_val(up) <= 6:
+        return 'S'
+    if t == 12 and up in ('4', '5', '6'):
+        return 'S'
+    # 11: double vs 2–10 only (vs As -> Hit except index +1)
+    if t == 11 and can_dbl(11) and up != 'A':
+        return 'D'
+    # 10: double vs 2–9 only (vs 10/As -> Hit except index)
+    if t == 10 and can_dbl(10) and up_to_val(up) <= 9:
+        return 'D'
+    if t == 9 and can_dbl(9) and up in UP_3456:
+        return 'D'
+    return 'H'
+
+def soft_action(t, up, rules, can_double):
+    def can_dbl(total):
+        return can_double and (not rules.get("D10", False) or total in (10, 11))
+    if t >= 19:
+        return 'S'
+    if t == 18:
+        # A,7 : Double vs 3–6 ; Stand vs 2/7/8 ; Hit vs 9/T/A
+        if up in UP_3456 and can_dbl(18):
+            return 'D'
+        if up in ('2', '7', '8'):
+            return 'S'
+        return 'H'
+    if t == 17 and can_dbl(17) and up in UP_3456:
+        return 'D'
+    if t == 16 and can_dbl(16) and up in ('4', '5', '6'):
+        return 'D'
+    if t == 15 and can_dbl(15) and up in ('4', '5', '6'):
+        return 'D'
+    if t == 14 and can_dbl(14) and up in UP_56:
+        return 'D'
+    if t == 13 and can_dbl(13) and up in UP_56:
+        return 'D'
+    return 'H'
+
+# --------- Compiled strategy tables ---------
+# hard_action / soft_action / should_split / apply_indices_override evaluated once per
+# rule set into flat lists; during play each decision is one computed list index.
+STRAT_TC_MIN, STRAT_TC_MAX = -6, 8   # TC buckets; every built-in index threshold lies inside
+
+class StrategyTables:
+    """Dense decision tables for one rule set (totals 0..31, 13 upcard ranks).
+
+    With an IndexTable, its overrides replace the built-in Hi-Lo indices and the TC
+    range widens to cover them; `ins` is the insurance TC floor.
+    """
+    __slots__ = ("key", "base", "ov", "pair", "tc_min", "tc_max", "ins")
+
+    def __init__(self, rules, indices=None):
+        self.key = rules_key(rules) + ((indices.key,) if indices is not None else ())
+        self.tc_min, self.tc_max = STRAT_TC_MIN, STRAT_TC_MAX
+        self.ins = INS_THRESH_HILO
+        override = apply_indices_override
+        if indices is not None:
+            self.tc_min = min(STRAT_TC_MIN, indices.tc_range[0]); self.tc_max = max(STRAT_TC_MAX, indices.tc_range[1])
+            if indices.insurance is not None: self.ins = indices.insurance
+            override = indices.override
+        self.base = [None]*(2*13*2*32)
+        self.ov = [None]*((self.tc_max - self.tc_min + 1)*2*2*13*2*32)
+        self.pair = [False]*(13*13)
+        for ui, up in enumerate(CARD_ORDER):
+            for cd in (0, 1):
+                for soft in (0, 1):
+                    act = soft_action if soft else hard_action
+                    for t in range(32):
+                        self.base[self.base_index(t, soft, ui, cd)] = act(t, up, rules, bool(cd))
+                        for tc in range(self.tc_min, self.tc_max + 1):
+                            for ft in (0, 1):
+                                self.ov[self.ov_index(t, soft, ui, ft, cd, tc)] = \
+                                    override(t, bool(soft), up, bool(ft), bool(cd), tc, rules)
+            for ri, r in enumerate(CARD_ORDER):
+                self.pair[ri*13 + ui] = should_split(r, up, rules)
+
+    @staticmethod
+    def base_index(total, soft, up_i, can_double):
+        return ((can_double*13 + up_i)*2 + soft)*32 + total
+
+    def ov_index(self, total, soft, up_i, first_two, can_double, tc_floor):
+        lo, hi = self.tc_min, self.tc_max
+        tc = lo if tc_floor < lo else hi if tc_floor > hi else tc_floor
+        return (((((tc - lo)*2 + first_two)*2 + can_double)*13 + up_i)*2 + soft)*32 + total
+
+    def action(self, total, soft, up, can_double):
+        """hard_action / soft_action."""
+        return self.base[((can_double*13 + CARD_INDEX[up])*2 + soft)*32 + total]
+
+    def override(self, total, soft, up, first_two, can_double, tc_floor):
+        """apply_indices_override."""
+        lo = self.tc_min
+        tc = 0 if tc_floor < lo else self.tc_max - lo if tc_floor > self.tc_max else tc_floor - lo
+        return self.ov[((((tc*2 + first_two)*2 + can_double)*13 + CARD_INDEX[up])*2 + soft)*32 + total]
+
+    def split(self, rank, up):
+        """should_split."""
+        return self.pair[CARD_INDEX[rank]*13 + CARD_INDEX[up]]
+
+def rules_key(rules):
+    """Hashable, order-independent form of a rules dict."""
+    return tuple(sorted((k, bool(v)) for k, v in rules.items()))
+
+_STRATEGY_CACHE = {}
+
+def compile_strategy(rules, indices=None):
+    """StrategyTables for `rules` (and an optional IndexTable), built once and cached."""
+    key = rules_key(rules) + ((indices.key,) if indices is not None else ())
+    st = _STRATEGY_CACHE.get(key)
+    if st is None:
+        st = _STRATEGY_CACHE[key] = StrategyTables(rules, indices)
+    return st
@@ -0,0 +1,151 @@
+"""Counting-system quality: betting correlation, playing efficiency, insurance correlation.
+
+A system is judged by how well its tags line up with the effects of removal (EOR) of
+each rank: on the game's EV (betting correlation, BC), on the gain of each strategy
+deviation (playing efficiency, PE) and on the value of insurance (insurance
+correlation, IC). Each metric is a correlation over the 13 card ranks (tens weighted
+4×), so any number of tag sets are scored as one matrix product against the unit
+effect vectors.
+
+PE here is the mean |correlation| with the exact EORs of the Illustrious 18 + Fab 4
+plays (equal weights), a close proxy of Griffin's frequency- and gain-weighted PE:
+compare systems with it, do not read it as the published figure.
+"""
+
+import math
+
+from .cards import CARD_ORDER, TEN_RANKS
+from .counting import SYSTEMS, shoe_counts
+from .dealer import RANKS10, comp10
+from .exact import ExactEV, exact_action_evs
+from .indexgen import ACTION_NAMES, _combos
+from .parallel import run_tasks
+
+WEIGHTS10 = (1, 1, 1, 1, 1, 1, 1, 1, 4, 1)   # cards per rank in a deck (2..9, T, A)
+
+# EV change (%) per card removed from a single deck: Griffin, Theory of Blackjack.
+# Used when no calibrated EOR is given.
+REFERENCE_EOR = {'2': 0.38, '3': 0.44, '4': 0.55, '5': 0.69, '6': 0.46, '7': 0.28, '8': 0.00,
+                 '9': -0.18, 'T': -0.51, 'J': -0.51, 'Q': -0.51, 'K': -0.51, 'A': -0.61}
+
+# Insurance gains when a non-ten leaves the shoe and loses when a ten does (balanced)
+INSURANCE_EOR = (1.0,)*8 + (-9/4, 1.0)
+
+# Illustrious 18 + Fab 4 playing decisions as (total, soft, up, deviation, basic)
+PLAYS = [
+    (16, False, 'T', 'S', 'H'), (15, False, 'T', 'S', 'H'), (10, False, 'T', 'D', 'H'),
+    (12, False, '3', 'S', 'H'), (12, False, '2', 'S', 'H'), (11, False, 'A', 'D', 'H'),
+    (9, False, '2', 'D', 'H'), (10, False, 'A', 'D', 'H'), (9, False, '7', 'D', 'H'),
+    (16, False, '9', 'S', 'H'), (13, False, '2', 'H', 'S'), (12, False, '4', 'H', 'S'),
+    (12, False, '5', 'H', 'S'), (12, False, '6', 'H', 'S'), (13, False, '3', 'H', 'S'),
+    (19, True, '6', 'D', 'S'),
+]
+SURRENDER_PLAYS = [
+    (15, False, 'T', 'SUR', 'H'), (15, False, '9', 'SUR', 'H'),
+    (15, False, 'A', 'SUR', 'H'), (14, False, 'T', 'SUR', 'H'),
+]
+
+def plays_for(rules):
+    return PLAYS + (SURRENDER_PLAYS if rules.get("LS", False) else [])
+
+def tags10(tags):
+    """Tag set (rank -> tag dict, or 10 values for 2..9, T, A) as a 10-tuple."""
+    if isinstance(tags, dict):
+        vals = tuple(tags.get(r, 0) for r in RANKS10)
+        if any(tags.get(r, vals[8]) != vals[8] for r in TEN_RANKS):
+            raise ValueError("10, J, Q and K must share one tag")
+        return vals
+    vals = tuple(tags)
+    if len(vals) != 10:
+        raise ValueError(f"expected 10 tags (2..9, T, A), got {len(vals)}")
+    return vals
+
+def eor10(eor):
+    """13-rank EOR dict (e.g. from calibrate_eor) -> 10-tuple, tens averaged."""
+    return tuple(eor.get(r, 0.0) for r in RANKS10[:8]) + (
+        sum(eor.get(r, 0.0) for r in TEN_RANKS)/len(TEN_RANKS), eor.get('A', 0.0))
+
+def _unit(vec):
+    """Deck-weighted, centred and normalised 10-vector (None when constant)."""
+    mean = sum(w*x for w, x in zip(WEIGHTS10, vec))/13.0
+    c = [x - mean for x in vec]
+    norm = math.sqrt(sum(w*x*x for w, x in zip(WEIGHTS10, c)))
+    return None if norm == 0 else [w*x/norm for w, x in zip(WEIGHTS10, c)]
+
+def correlation(tags, effects):
+    """Correlation of a tag set with an effect vector over the 13 ranks."""
+    a = _unit(tags10(tags)); b = _unit(tuple(effects))
+    if a is None or b is None: return 0.0
+    return sum(x*y/w for x, y, w in zip(a, b, WEIGHTS10))
+
+# --------- Playing effects ---------
+def _play_gains(comp, rules, plays):
+    """Exact gain (%) of each play's deviation over its basic play at composition comp."""
+    rem = dict(zip(RANKS10, comp))
+    calcs = {}
+    out = []
+    for t, soft, up, action, base in plays:
+        u = RANKS10.index(up)
+        calc = calcs.get(u)
+        if calc is None:
+            c = list(comp); c[u] -= 1
+            calc = calcs[u] = ExactEV(rules, u, root=tuple(c))
+        names = [ACTION_NAMES[action], ACTION_NAMES[base]]
+        gain = wsum = 0.0
+        for a, b in _combos(t, soft):
+            w = (comp[a] - (a == u))*(comp[b] - (b == u) - (a == b))
+            if w <= 0: continue
+            res = exact_action_evs(rem, rules, (RANKS10[a], RANKS10[b]), up, actions=names, calc=calc)
+            gain += w*(res[names[0]] - res[names[1]]); wsum += w
+        out.append(gain/wsum if wsum else 0.0)
+    return out
+
+def play_effects(rules, decks=6, plays=None, workers=1):
+    """[(play, 10-tuple EOR of its gain)]: exact, by removing one card of each rank from a
+    full shoe. The 11 compositions are independent tasks (process pool when workers > 1)."""
+    plays = plays_for(rules) if plays is None else list(plays)
+    full = comp10(shoe_counts(decks))
+    comps = [full] + [full[:i] + (full[i] - 1,) + full[i+1:] for i in range(10)]
+    gains = run_tasks(_play_gains, [(c, rules, plays) for c in comps], workers)
+    return [(p, tuple(g[k] - gains[0][k] for g in gains[1:])) for k, p in enumerate(plays)]
+
+# --------- Batch scoring ---------
+def evaluate_systems(tag_sets=SYSTEMS, eor=None, effects=None):
+    """[{name, tags, bc, pe, ic}] for (name, tags) pairs, best betting correlation first.
+
+    eor: 13-rank EOR dict (calibrate_eor), default REFERENCE_EOR. effects: play_effects()
+    output; without it pe is None. All tag sets are scored as one matrix product.
+    """
+    cols = [_unit(eor10(REFERENCE_EOR if eor is None else eor)), _unit(INSURANCE_EOR)]
+    cols += [_unit(e) for _, e in effects or ()]
+    cols = [c if c is not None else [0.0]*10 for c in cols]
+    # dot products over 13 ranks of unit vectors that already carry one deck weight each
+    cols = [[x/w for x, w in zip(c, WEIGHTS10)] for c in cols]
+    out = []
+    for name, tags in tag_sets:
+        t = tags10(tags)
+        row = _unit(t) or [0.0]*10
+        r = [sum(a*b for a, b in zip(row, c)) for c in cols]
+        out.append({"name": name, "tags": t, "bc": r[0], "ic": r[1],
+                    "pe": sum(map(abs, r[2:]))/len(r[2:]) if effects else None})
+    out.sort(key=lambda d: -d["bc"])
+    return out
+
+def parse_tags(text):
+    """'NAME=1,1,2,2,2,1,0,0,-2,0' (2..9, T, A) or 'NAME=2:1,3:1,...' -> (name, 10-tuple)."""
+    name, sep, spec = text.partition("=")
+    if not sep: name, spec = text, text
+    items = [s.strip() for s in spec.split(",") if s.strip()]
+    try:
+        if any(":" in s for s in items):
+            tags = {}
+            for s in items:
+                r, _, v = s.partition(":")
+                r = r.strip().upper(); r = 'T' if r in ('10', '0') else r
+                if r not in CARD_ORDER: raise ValueError(f"unknown rank {r!r}")
+                for rr in (TEN_RANKS if r == 'T' else (r,)):
+                    tags[rr] = int(v)
+            return name.strip(), tags10(tags)
+        return name.strip(), tags10(int(v) for v in items)
+    except ValueError as e:
+        raise ValueError(f"bad tag set {text!r}: {e}")
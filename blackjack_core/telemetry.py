@@ -0,0 +1,293 @@
+"""Optional engine instrumentation: counters and per-phase times of simulation runs.
+
+Disabled, it costs nothing: no engine function tests a flag. instrument(tel) swaps
+counting twins in for the module globals the hot loops call (simulate_one_hand,
+play_hand, dealer_play, Shoe.restore, ...) and puts the originals back on exit, so
+only code running inside the `with` block pays for the bookkeeping. Pool tasks
+started from it (run_tasks of simulate/game) run under the same twins in their
+worker and report their counters back while they run.
+
+The twins replace process-wide globals, so one run is instrumented at a time, and they
+count only on the thread that entered instrument(): other threads (e.g. the GUI's
+second job lane) pass straight through to the originals.
+"""
+
+import atexit, contextlib, importlib, itertools, json, threading, time
+
+COUNTERS = ("rounds", "hands", "cards", "dealer", "dealer_draws", "splits", "doubles")
+PHASES = ("other", "deal", "player", "dealer", "numpy")
+ROUNDS, HANDS, CARDS, DEALER, DEALER_DRAWS, SPLITS, DOUBLES, _RESOLVES = range(8)
+_OTHER, _DEAL, _PLAYER, _DEALER, _NUMPY = range(5)
+FLUSH_EVERY = 0.25   # s between counter reports of a pool task
+
+_clock = time.perf_counter
+_LOCK = threading.Lock()
+_active = None
+_queue = None
+_task_ids = itertools.count()
+
+class Telemetry:
+    """Counters (COUNTERS) and exclusive seconds per phase (PHASES) of an instrumented run.
+
+    rounds are rounds dealt from a fresh shoe state (the unit of a run's budget and of
+    `total`, for the ETA); hands are rounds played out, CRN replays included. "dealer"
+    counts dealer playouts (or exact dealer evaluations), "other" is time inside the run
+    outside every instrumented call. snapshot() may be called from another thread.
+    """
+
+    def __init__(self, total=None):
+        self.total = total
+        self.counts = [0]*(len(COUNTERS) + 1)
+        self.times = [0.0]*len(PHASES)
+        self.remote = {}   # pool task -> its last (counts, times)
+        self.start = self.end = None
+        self.attached = False
+        self.phase = _OTHER; self.mark = 0.0
+        self.sink = None; self.next_flush = 0.0
+
+    def tick(self):
+        now = _clock()
+        if now >= self.next_flush:
+            self.next_flush = now + FLUSH_EVERY
+            self.sink()
+
+    def snapshot(self):
+        counts = self.counts[:]; times = self.times[:]
+        for c, t in list(self.remote.values()):
+            counts = [a + b for a, b in zip(counts, c)]; times = [a + b for a, b in zip(times, t)]
+        elapsed = ((self.end or _clock()) - self.start) if self.start is not None else 0.0
+        snap = dict(zip(COUNTERS, counts))
+        snap["phase_s"] = dict(zip(PHASES, times))
+        snap["elapsed_s"] = elapsed
+        snap["hands_per_s"] = counts[HANDS]/elapsed if elapsed > 0 else 0.0
+        snap["rounds_per_s"] = counts[ROUNDS]/elapsed if elapsed > 0 else 0.0
+        snap["total"] = self.total
+        left = max(0, self.total - counts[ROUNDS]) if self.total else None
+        snap["eta_s"] = left/snap["rounds_per_s"] if left is not None and snap["rounds_per_s"] > 0 else None
+        return snap
+
+    def summary(self):
+        """One line for status bars: progress, rate, ETA, per-hand counters and time split."""
+        s = self.snapshot()
+        hands = max(1, s["hands"])
+        parts = [f"{s['hands']:,} hands" + (f" ({min(1.0, s['rounds']/s['total']):.0%})" if s["total"] else ""),
+                 f"{s['hands_per_s']:,.0f} hands/s"]
+        if self.end is None and s["eta_s"] is not None:
+            parts.append(f"ETA {s['eta_s']:.0f} s")
+        elif self.end is not None:
+            parts.append(f"{s['elapsed_s']:.1f} s")
+        if s["cards"]:
+            parts.append(f"{s['cards']/hands:.2f} cards, {s['dealer_draws']/hands:.2f} dealer draws/hand, "
+                         f"splits {s['splits']/hands:.1%}, doubles {s['doubles']/hands:.1%}")
+        busy = sum(s["phase_s"].values())
+        if busy > 0:
+            parts.append(" ".join(f"{p} {t/busy:.0%}" for p, t in s["phase_s"].items() if t > 0))
+        return " · ".join(parts)
+
+    def save(self, path):
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, indent=1); f.write("\n")
+
+def active():
+    """The Telemetry of the run instrumented right now, or None."""
+    return _active
+
+@contextlib.contextmanager
+def instrument(tel):
+    """Count everything the engine does inside the block into `tel`.
+
+    instrument(None) is a no-op; a block started while another run is instrumented
+    runs uninstrumented (tel.attached stays False). tel.end is set on exit either way.
+    """
+    global _active
+    if tel is None:
+        yield None; return
+    with _LOCK:
+        tel.attached = _active is None
+        if tel.attached: _active = tel
+    saved = []
+    try:
+        if tel.attached:
+            for owner, name, twin in _twins(tel):
+                saved.append((owner, name, getattr(owner, name)))
+                setattr(owner, name, twin)
+        tel.start = tel.mark = _clock(); tel.phase = _OTHER
+        yield tel
+    finally:
+        now = _clock()
+        tel.times[tel.phase] += now - tel.mark
+        tel.end = now
+        for owner, name, orig in reversed(saved):
+            setattr(owner, name, orig)
+        if tel.attached:
+            with _LOCK:
+                _active = None
+
+def _twins(tel):
+    """(owner, attribute, replacement) for every instrumented hook."""
+    cards = importlib.import_module(".cards", __package__)
+    play = importlib.import_module(".play", __package__)
+    simulate = importlib.import_module(".simulate", __package__)
+    game = importlib.import_module(".game", __package__)
+    vectorized = importlib.import_module(".vectorized", __package__)
+    c = tel.counts; t = tel.times
+
+    def enter(ph):
+        now = _clock(); t[tel.phase] += now - tel.mark
+        prev = tel.phase; tel.phase = ph; tel.mark = now
+        return prev
+
+    def leave(prev):
+        now = _clock(); t[tel.phase] += now - tel.mark
+        tel.phase = prev; tel.mark = now
+
+    def hand_twin(orig, rounds):
+        def simulate_one_hand(shoe, *args):
+            prev = enter(_DEAL); n0 = shoe.total; r0 = c[_RESOLVES]
+            try:
+                return orig(shoe, *args)
+            finally:
+                leave(prev)
+                c[HANDS] += 1; c[ROUNDS] += rounds; c[CARDS] += n0 - shoe.total
+                if c[_RESOLVES] - r0 > 1: c[SPLITS] += c[_RESOLVES] - r0 - 1
+                if tel.sink is not None and not c[HANDS] & 255: tel.tick()
+        return simulate_one_hand
+
+    def player_twin(orig):
+        def play_hand(*args, **kw):
+            prev = enter(_PLAYER)
+            try:
+                return orig(*args, **kw)
+            finally:
+                leave(prev)
+        return play_hand
+
+    def forced_twin(orig):
+        # fixed-action rounds: the hole card was drawn just before the call
+        def play_hand_forced_first(p, up, hole, shoe, *args, **kw):
+            prev = enter(_PLAYER); n0 = shoe.total; r0 = c[_RESOLVES]
+            try:
+                return orig(p, up, hole, shoe, *args, **kw)
+            finally:
+                leave(prev)
+                c[HANDS] += 1; c[CARDS] += n0 - shoe.total + 1
+                if c[_RESOLVES] - r0 > 1: c[SPLITS] += c[_RESOLVES] - r0 - 1
+                if tel.sink is not None and not c[HANDS] & 255: tel.tick()
+        return play_hand_forced_first
+
+    def dealer_twin(orig):
+        def dealer_play(cards, shoe, rules, rnd):
+            prev = enter(_DEALER); h = play.as_hand(cards); n0 = h.n
+            try:
+                return orig(h, shoe, rules, rnd)
+            finally:
+                leave(prev)
+                c[DEALER] += 1; c[DEALER_DRAWS] += h.n - n0
+        return dealer_play
+
+    def exact_twin(orig):
+        def exact_dealer_result(*args, **kw):
+            prev = enter(_DEALER)
+            try:
+                return orig(*args, **kw)
+            finally:
+                leave(prev); c[DEALER] += 1
+        return exact_dealer_result
+
+    def resolve_twin(orig):
+        def resolve_vs_dealer(*args, doubled=False):
+            c[_RESOLVES] += 1
+            if doubled: c[DOUBLES] += 1
+            return orig(*args, doubled=doubled)
+        return resolve_vs_dealer
+
+    def stand_twin(orig):
+        def resolve_vs_dealer_stand(*args):
+            c[_RESOLVES] += 1
+            return orig(*args)
+        return resolve_vs_dealer_stand
+
+    def restore_twin(orig):
+        def restore(self, snap):
+            c[ROUNDS] += 1
+            orig(self, snap)
+        return restore
+
+    def batch_twin(orig):
+        def _np_play_batch(rem_counts, rules, n, *args):
+            prev = enter(_NUMPY)
+            try:
+                return orig(rem_counts, rules, n, *args)
+            finally:
+                leave(prev)
+                c[ROUNDS] += n; c[HANDS] += n
+                if tel.sink is not None: tel.tick()
+        return _np_play_batch
+
+    def tasks_twin(orig):
+        def run_tasks(fn, arg_list, workers):
+            if workers <= 1 or len(arg_list) <= 1:
+                return orig(fn, arg_list, workers)
+            return _run_metered(tel, fn, arg_list, workers)
+        return run_tasks
+
+    owner = threading.get_ident()
+    def mine(orig, twin):
+        def call(*args, **kw):
+            return twin(*args, **kw) if threading.get_ident() == owner else orig(*args, **kw)
+        return call
+
+    return [(obj, name, mine(getattr(obj, name), twin)) for obj, name, twin in (
+        (simulate, "simulate_one_hand", hand_twin(simulate.simulate_one_hand, 0)),
+        (game, "simulate_one_hand", hand_twin(game.simulate_one_hand, 1)),
+        (simulate, "play_hand", player_twin(simulate.play_hand)),
+        (simulate, "play_hand_forced_first", forced_twin(simulate.play_hand_forced_first)),
+        (play, "dealer_play", dealer_twin(play.dealer_play)),
+        (play, "exact_dealer_result", exact_twin(play.exact_dealer_result)),
+        (play, "resolve_vs_dealer", resolve_twin(play.resolve_vs_dealer)),
+        (play, "resolve_vs_dealer_stand", stand_twin(play.resolve_vs_dealer_stand)),
+        (cards.Shoe, "restore", restore_twin(cards.Shoe.restore)),
+        (vectorized, "_np_play_batch", batch_twin(vectorized._np_play_batch)),
+        (simulate, "run_tasks", tasks_twin(simulate.run_tasks)),
+        (game, "run_tasks", tasks_twin(game.run_tasks)),
+    )]
+
+# --------- Pool tasks ---------
+# Workers put (task id, counts, times) on a manager queue every FLUSH_EVERY seconds and
+# once at the end; the parent keeps the latest report of each task in tel.remote.
+def _report_queue():
+    global _queue
+    with _LOCK:
+        if _queue is None:
+            import multiprocessing
+            manager = multiprocessing.get_context("spawn").Manager()
+            atexit.register(manager.shutdown)
+            _queue = manager.Queue()
+        return _queue
+
+def _metered_task(queue, key, fn, args):
+    tel = Telemetry()
+    tel.sink = lambda: queue.put((key, tel.counts[:], tel.times[:]))
+    with instrument(tel):
+        result = fn(*args)
+    tel.sink()
+    return result
+
+def _run_metered(tel, fn, arg_list, workers):
+    from concurrent.futures import wait
+    from .parallel import get_pool
+    queue = _report_queue()
+    pool = get_pool(int(workers))
+    keys = [next(_task_ids) for _ in arg_list]
+    futures = [pool.submit(_metered_task, queue, k, fn, a) for k, a in zip(keys, arg_list)]
+    tel.times[tel.phase] += _clock() - tel.mark   # the wait itself is the workers' time
+    pending = set(futures)
+    while True:
+        if pending:
+            _, pending = wait(pending, timeout=FLUSH_EVERY)
+        while not queue.empty():
+            key, counts, times = queue.get()
+            if key in keys: tel.remote[key] = (counts, times)
+        if not pending: break
+    tel.mark = _clock()
+    return [f.result() for f in futures]
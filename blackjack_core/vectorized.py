@@ -0,0 +1,259 @@
+"""Vectorized NumPy Monte-Carlo engine (optional dependency)."""
+
+from .cards import CARD_ORDER, CARD_INDEX, TEN_RANKS
+from .counting import INS_THRESH_HILO
+from .strategy import STRAT_TC_MIN, STRAT_TC_MAX, compile_strategy
+from .simulate import mean_var
+
+# --------- Vectorized Monte Carlo (NumPy, optional) ---------
+# Same game as simulate_one_hand/play_hand, but thousands of rounds advance together
+# through a small state machine. Decisions are looked up in tables filled from the
+# scalar strategy functions, so both engines follow the exact same rules/indices.
+_np = None
+
+def numpy_available():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = False
+    return _np is not False
+
+NP_RANK_VAL = (2,3,4,5,6,7,8,9,10,10,10,10,11)   # indexed like CARD_ORDER
+NP_TEN, NP_ACE, NP_EIGHT = 8, 12, 6
+OV_CODES = {None:0, 'H':1, 'S':2, 'D':3, 'SUR':4}
+ACTION_CODES = {'H':1, 'S':2, 'D':3}
+
+# round phases
+_PH_DONE, _PH_START, _PH_DECIDE, _PH_HIT, _PH_RESOLVE, _PH_DEALER, _PH_NEXT = range(7)
+_MAX_STACK = 8
+
+def _np_tables(rules, tc_floor, apply_idx):
+    """Decision tables for the vectorized engine (totals 0..31 x soft x upcard rank),
+    sliced from the compiled StrategyTables for this TC."""
+    np = _np
+    st = compile_strategy(rules)
+    base = np.array([ACTION_CODES[a] for a in st.base], dtype=np.int8).reshape(2, 13, 2, 32)  # cd, up, soft, total
+    ov = np.zeros((32, 2, 13, 2), dtype=np.int8)
+    if apply_idx:
+        tc = min(max(tc_floor, STRAT_TC_MIN), STRAT_TC_MAX) - STRAT_TC_MIN
+        ovc = np.array([OV_CODES[a] for a in st.ov], dtype=np.int8).reshape(-1, 2, 2, 13, 2, 32)  # tc, ft, cd, up, soft, total
+        ov = ovc[tc, 1].transpose(3, 2, 1, 0).copy()
+    base_dbl = (base[1] == ACTION_CODES['D']).transpose(2, 1, 0).copy()
+    hit = (base[0] == ACTION_CODES['H']).transpose(2, 1, 0).copy()
+    ov[:4] = 0; ov[22:] = 0; base_dbl[:4] = False; base_dbl[22:] = False
+    hit[:4] = False; hit[21:] = False
+    base_sur = np.zeros((32, 13), dtype=bool)
+    for ui, up in enumerate(CARD_ORDER):
+        base_sur[16, ui] = up in ('9','T','J','Q','K','A')
+        base_sur[15, ui] = up == 'T'
+    split = np.array(st.pair, dtype=bool).reshape(13, 13)
+    for ri, r in enumerate(CARD_ORDER):
+        if r in TEN_RANKS: split[ri] = split[CARD_INDEX['T']]
+    return ov, base_dbl, hit, base_sur, split
+
+def _np_play_batch(rem_counts, rules, n, rng, tc_floor, tables):
+    """Play n independent rounds from rem_counts; return per-round EV (units)."""
+    np = _np
+    ov_t, dbl_t, hit_t, bsur_t, split_t = tables
+    val = np.array(NP_RANK_VAL, dtype=np.int16)
+    c0 = np.array([int(rem_counts.get(r, 0)) for r in CARD_ORDER], dtype=np.int32)
+    pos_rank = np.repeat(np.arange(13), c0); tot0 = pos_rank.size
+    counts = np.tile(c0, (n, 1))
+    ctot = counts.sum(1)
+    h17, peek, obo, ls = bool(rules.get("H17", False)), bool(rules["PEEK"]), bool(rules["OBO"]), bool(rules["LS"])
+    bj_pay = 1.5 if rules["BJ_3_2"] else 1.2
+
+    def draw(rows):
+        # Propose from the starting shoe, accept with prob counts/c0: exact draw without
+        # replacement from each round's current counts, no per-row cumulative sums.
+        out = np.full(rows.size, NP_TEN, dtype=np.int64)
+        pend = np.flatnonzero(ctot[rows] > 0)
+        while pend.size:
+            rr = rows[pend]
+            r = pos_rank[(rng.random(pend.size) * tot0).astype(np.int64)]
+            ok = rng.random(pend.size) * c0[r] < counts[rr, r]
+            acc = pend[ok]; ra = r[ok]
+            out[acc] = ra
+            counts[rows[acc], ra] -= 1
+            ctot[rows[acc]] -= 1
+            pend = pend[~ok]
+        return out
+
+    def add(tot_a, soft_a, rows, r):
+        t = tot_a[rows] + val[r]; s = soft_a[rows] + (r == NP_ACE)
+        for _ in range(2):
+            adj = (t > 21) & (s > 0)
+            t[adj] -= 10; s[adj] -= 1
+        tot_a[rows] = t; soft_a[rows] = s
+
+    def is_bj(a, b):
+        return ((a == NP_ACE) & (b >= NP_TEN) & (b < NP_ACE)) | ((b == NP_ACE) & (a >= NP_TEN) & (a < NP_ACE))
+
+    allr = np.arange(n)
+    c1 = draw(allr); up = draw(allr); c2 = draw(allr); hole = draw(allr)
+    ev = np.zeros(n)
+    phase = np.full(n, _PH_DECIDE, dtype=np.int8)
+    player_bj = is_bj(c1, c2)
+    ins = np.zeros(n)
+    up_ace = up == NP_ACE
+    if up_ace.any():
+        tens = counts[:, NP_TEN:NP_ACE].sum(1)
+        p_bj = np.where(ctot > 0, tens / np.maximum(ctot, 1), 0.0)
+        take = (tc_floor >= INS_THRESH_HILO) | (p_bj > 1/3.0)
+        if peek:
+            dbj = up_ace & is_bj(up, hole)
+            ev[dbj] = np.where(player_bj[dbj], 0.0, -1.0) + np.where(take[dbj], 1.0, 0.0)
+            phase[dbj] = _PH_DONE
+            ins[up_ace & ~dbj & take] = -0.5
+    live = phase != _PH_DONE
+    if peek:
+        dbj = live & (up >= NP_TEN) & (up < NP_ACE) & (hole == NP_ACE)
+        ev[dbj] = np.where(player_bj[dbj], 0.0, -1.0) + ins[dbj]
+        phase[dbj] = _PH_DONE
+        live &= ~dbj
+    pbj = live & player_bj
+    ev[pbj] = bj_pay + ins[pbj]
+    phase[pbj] = _PH_DONE
+    live &= ~pbj
+    ev[live] = ins[live]
+    enhc_bj = np.zeros(n, dtype=bool) if peek else is_bj(up, hole)
+
+    # current hand + split stack
+    htot = np.zeros(n, dtype=np.int16); hsoft = np.zeros(n, dtype=np.int16)
+    add(htot, hsoft, allr, c1); add(htot, hsoft, allr, c2)
+    depth = np.zeros(n, dtype=np.int8)
+    cd = np.ones(n, dtype=bool); cs = np.ones(n, dtype=bool)
+    mult = np.ones(n)
+    srank = np.zeros(n, dtype=np.int64)
+    stack = np.zeros((n, _MAX_STACK), dtype=np.int8); sp = np.zeros(n, dtype=np.int64)
+    dtot = np.zeros(n, dtype=np.int16); dsoft = np.zeros(n, dtype=np.int16)
+
+    def rows_in(ph):
+        return np.flatnonzero(phase == ph)
+
+    while True:
+        rows = rows_in(_PH_NEXT)
+        if rows.size:
+            more = sp[rows] > 0
+            pr = rows[more]
+            sp[pr] -= 1
+            depth[pr] = stack[pr, sp[pr]]
+            phase[pr] = _PH_START
+            phase[rows[~more]] = _PH_DONE
+        rows = rows_in(_PH_START)
+        if rows.size:
+            r1 = srank[rows]
+            c1[rows] = r1
+            htot[rows] = 0; hsoft[rows] = 0
+            add(htot, hsoft, rows, r1)
+            x = draw(rows); c2[rows] = x
+            add(htot, hsoft, rows, x)
+            aces = r1 == NP_ACE
+            mult[rows] = 1.0
+            if rules["HSA"]:
+                cd[rows] = np.where(aces, bool(rules["DOUBLE_ON_SPLIT_ACES"]), bool(rules["DAS"]))
+                cs[rows] = np.where(aces, bool(rules["RSA"]), True)
+                phase[rows] = _PH_DECIDE
+            else:
+                ar = rows[aces]
+                mult[ar] = 2.0 if rules["DOUBLE_ON_SPLIT_ACES"] else 1.0
+                phase[ar] = _PH_RESOLVE
+                nr = rows[~aces]
+                cd[nr] = bool(rules["DAS"]); cs[nr] = True
+                phase[nr] = _PH_DECIDE
+        rows = rows_in(_PH_DECIDE)
+        if rows.size:
+            t = htot[rows]; s = (hsoft[rows] > 0).astype(np.int64); u = up[rows]
+            a = c1[rows]; b = c2[rows]
+            is88 = (a == NP_EIGHT) & (b == NP_EIGHT)
+            o = ov_t[t, s, u, cd[rows].astype(np.int64)]
+            go = np.ones(rows.size, dtype=bool)
+            if ls:
+                sur = (o == 4) & ~is88
+                ev[rows[sur]] -= 0.5; phase[rows[sur]] = _PH_NEXT; go &= ~sur
+            if obo:
+                stop = go & cs[rows] & enhc_bj[rows]
+                ev[rows[stop]] -= 1.0; phase[rows[stop]] = _PH_NEXT; go &= ~stop
+            ra = np.minimum(a, NP_TEN); ra[a == NP_ACE] = NP_ACE
+            rb = np.minimum(b, NP_TEN); rb[b == NP_ACE] = NP_ACE
+            spl = go & cs[rows] & (ra == rb) & split_t[ra, u] & (depth[rows] < 3)
+            if spl.any():
+                sr = rows[spl]; nd = depth[sr] + 1
+                srank[sr] = ra[spl]
+                stack[sr, sp[sr]] = nd; stack[sr, sp[sr] + 1] = nd
+                sp[sr] += 2
+                phase[sr] = _PH_NEXT
+                go &= ~spl
+            if ls:
+                bs = go & (o == 0) & (s == 0) & ~is88 & bsur_t[t, u]
+                ev[rows[bs]] -= 0.5; phase[rows[bs]] = _PH_NEXT; go &= ~bs
+            dbl = go & cd[rows] & ((o == 3) | ((o != 1) & (o != 2) & dbl_t[t, s, u]))
+            if dbl.any():
+                dr = rows[dbl]
+                add(htot, hsoft, dr, draw(dr))
+                mult[dr] = 2.0; phase[dr] = _PH_RESOLVE
+                go &= ~dbl
+            # a stand/hit index decides the first move, basic strategy the rest (as play_hand)
+            st = go & (o == 2)
+            sr = rows[st]
+            mult[sr] = 1.0; phase[sr] = _PH_RESOLVE
+            go &= ~st
+            hi = rows[go & (o == 1) & (t < 21)]
+            if hi.size:
+                add(htot, hsoft, hi, draw(hi))
+            hr = rows[go]
+            mult[hr] = 1.0; phase[hr] = _PH_HIT
+        rows = rows_in(_PH_HIT)
+        if rows.size:
+            need = hit_t[htot[rows], (hsoft[rows] > 0).astype(np.int64), up[rows]]
+            hr = rows[need]
+            if hr.size:
+                add(htot, hsoft, hr, draw(hr))
+            phase[rows[~need]] = _PH_RESOLVE
+        rows = rows_in(_PH_RESOLVE)
+        if rows.size:
+            bjr = enhc_bj[rows]
+            ev[rows[bjr]] -= 1.0 if obo else mult[rows[bjr]]
+            bust = ~bjr & (htot[rows] > 21)
+            ev[rows[bust]] -= mult[rows[bust]]
+            phase[rows[bjr | bust]] = _PH_NEXT
+            dr = rows[~bjr & ~bust]
+            dtot[dr] = 0; dsoft[dr] = 0
+            add(dtot, dsoft, dr, up[dr]); add(dtot, dsoft, dr, hole[dr])
+            phase[dr] = _PH_DEALER
+        rows = rows_in(_PH_DEALER)
+        if rows.size:
+            dt = dtot[rows]
+            must = (dt < 17) | ((dt == 17) & (dsoft[rows] > 0) & h17)
+            mr = rows[must]
+            if mr.size:
+                add(dtot, dsoft, mr, draw(mr))
+            fr = rows[~must]
+            if fr.size:
+                d = dtot[fr]; p = htot[fr]; m = mult[fr]
+                ev[fr] += np.where((d > 21) | (p > d), m, np.where(p < d, -m, 0.0))
+                phase[fr] = _PH_NEXT
+        if not (phase != _PH_DONE).any():
+            break
+    return ev
+
+def simulate_ev_np(rem_counts, rules, hands=20000, seed=12345, tc_floor=0, apply_idx=True, batch=65536):
+    """Vectorized simulate_ev: same (mean %, var) contract, NumPy required."""
+    return mean_var(*simulate_ev_np_sums(rem_counts, rules, hands, seed, tc_floor, apply_idx, batch))
+
+def simulate_ev_np_sums(rem_counts, rules, hands, seed, tc_floor=0, apply_idx=True, batch=65536):
+    if not numpy_available():
+        raise RuntimeError("NumPy is required for the vectorized engine")
+    np = _np
+    rng = np.random.default_rng(seed)
+    tables = _np_tables(rules, tc_floor, apply_idx)
+    total = 0.0; total2 = 0.0; done = 0
+    while done < hands:
+        k = min(batch, hands - done)
+        ev = _np_play_batch(rem_counts, rules, k, rng, tc_floor, tables)
+        total += float(ev.sum()); total2 += float((ev*ev).sum())
+        done += k
+    return hands, total, total2
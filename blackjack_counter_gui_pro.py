@@ -2,476 +2,73 @@
 # -*- coding: utf-8 -*-
 
 import tkinter as tk
-from tkinter import ttk, messagebox
-import math, random, threading
+from tkinter import ttk, messagebox, filedialog
+import math, random
+
+# Engine: headless package next to this file (no Tk dependency)
+from blackjack_core.cards import CARD_ORDER, DISPLAY, TEN_RANKS, hand_total
+from blackjack_core.counting import HI_LO, SYSTEMS, CountState, estimate_base_edge, slope_for
+from blackjack_core.strategy import compile_strategy, load_index_table
+from blackjack_core.exact import exact_action_evs
+from blackjack_core.simulate import simulate_ev_progressive, calibrate_eor, calibrate_eor_crn, simulate_actions
+from blackjack_core.parallel import default_workers, warm_pool
+from blackjack_core.jobs import JobScheduler
+from blackjack_core.cache import MemoCache, spot_key
+from blackjack_core.sysmetrics import evaluate_systems, play_effects
+from blackjack_core.chart import chart_rows, row_label, strategy_chart
+from blackjack_core.betting import linear_tc_model, optimize_ramp, tc_histogram
+from blackjack_core.bankroll import kelly_sweep, round_moments
+from blackjack_core.game import DEFAULT_RAMP
+from blackjack_core.dealer import RANKS10
+from blackjack_core.cache import cached_result, result_cache, result_key
+from blackjack_core.vectorized import numpy_available
+from blackjack_core.telemetry import Telemetry, instrument
 
 APP_TITLE = "Blackjack Counter — PRO"
 
-# --------- Counting systems ---------
-HI_LO   = {'2':+1,'3':+1,'4':+1,'5':+1,'6':+1,'7':0,'8':0,'9':0,'T':-1,'J':-1,'Q':-1,'K':-1,'A':-1}
-ZEN     = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+2,'7':+1,'8':0,'9':0,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}
-OMEGA2  = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+2,'7':+1,'8':0,'9':-1,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}  # ace-neutral
-HIOPT2  = {'2':+1,'3':+1,'4':+2,'5':+2,'6':+1,'7':+1,'8':0,'9':0,'T':-2,'J':-2,'Q':-2,'K':-2,'A':0}   # ace-neutral
-
-SYSTEMS = [
-    ("Hi-Lo", HI_LO),
-    ("Zen", ZEN),
-    ("Omega II", OMEGA2),
-    ("Hi-Opt II", HIOPT2),
-]
-
-# --- Utility sets (micro-optimization for readability) ---
-TEN_RANKS = ('T','J','Q','K')
-UP_3456   = ('3','4','5','6')
-UP_456    = ('4','5','6')
-UP_56     = ('5','6')
-UP_23456  = ('2','3','4','5','6')
-UP_79TJQKA = ('7','9','T','J','Q','K','A')
-
-# --- Illustrious 18 + Fab 4 override (Hi-Lo, multi-decks approx) ---
-def apply_indices_override(total, soft, up, first_two, can_double, tc_floor, rules):
-    """Return 'D','S','H','SUR' or None based on indices."""
-    # Fab 4 (Late Surrender)
-    if rules.get("LS", False) and first_two and not soft:
-        if total == 15 and up == 'T' and tc_floor >= 0: return 'SUR'
-        if total == 15 and up == '9' and tc_floor >= 2: return 'SUR'
-        if total == 15 and up == 'A' and tc_floor >= 1: return 'SUR'
-        if total == 14 and up == 'T' and tc_floor >= 3: return 'SUR'
-
-    # Doubling guard for D10
-    def dbl_ok(t):
-        return can_double and (not rules.get("D10", False) or t in (10,11))
-
-    # Soft exceptions (I18)
-    if soft:
-        # A,8 vs 6: Double at +1 else Stand (respects D10)
-        if total == 19 and up == '6' and first_two and dbl_ok(19) and tc_floor >= 1:
-            if not rules.get("D10", False):
-                return 'D'
-            else:
-                return None
+# ---------------- Count view (no Tk) ----------------
+def count_view(st, decks, rules, side_ace, eor=None):
+    """What update_all draws for CountState `st`: ({system: main table row}, Seen row,
+    Remaining row, shoe-progress text). eor is (eor_vec, eor_ref_counts) once calibrated.
+    No Tk here, so benchmarks time a keypress headless."""
+    base_edge = estimate_base_edge(decks, rules["H17"], rules["DAS"], rules["RSA"], rules["HSA"],
+                                   rules["DOUBLE_ON_SPLIT_ACES"], rules["D10"], rules["LS"], rules["PEEK"])
+    rem_decks = st.decks_remaining()
+    ins_ev = st.insurance_ev()
+    ins_text = f"{ins_ev:+.2f}%" if ins_ev is not None else "—"
+
+    # --- EOR adjustment (composition-sensitive EV correction) ---
+    eor_delta = 0.0
+    if eor is not None:
+        eor_vec, ref = eor
+        cur = st.remaining
+        # eor_vec[r]: ΔEV (percentage points) when REMOVING 1 card r from the reference shoe
+        eor_delta = sum(eor_vec.get(r, 0.0) * (ref.get(r, 0) - cur.get(r, 0)) for r in CARD_ORDER)
+
+    main = {}
+    for name, sys_map in SYSTEMS:
+        rc = st.running(sys_map)
+        tc_float = rc / rem_decks if rem_decks>0 else 0.0
+        tc_floor = math.floor(tc_float)
+        tc_trunc = math.trunc(tc_float)  # truncated (betting)
+        slope = slope_for(name, decks, side_ace_used=(side_ace if name in ("Omega II","Hi-Opt II") else True))
+        # Count-based EV + composition-based correction (EOR)
+        ev = base_edge + slope * tc_floor + eor_delta
+        main[name] = (name, f"{rc:+d}", f"{tc_trunc:+d}", f"{tc_floor:+d}", f"{tc_float:+.2f}", f"{ev:+.2f}", ins_text)
+
+    rem = st.remaining
+    seen = ("Seen",) + tuple(str(st.seen[r]) for r in CARD_ORDER)
+    remaining = ("Remaining",) + tuple(str(rem[r]) for r in CARD_ORDER)
+    seen_to_cut, cut_cards, total_cards, remain_to_cut = st.shoe_progress()
+    progress = (f"Shoe progress: seen {st.seen_total}/{total_cards}  |  seen up to cut {seen_to_cut}/{cut_cards}"
+                f"  (remaining up to cut: {remain_to_cut})")
+    return main, seen, remaining, progress
+
+def changed_cells(old, values):
+    """[(column index, value)] that differ between two rows, None when the whole row must be set."""
+    if old is None or len(old) != len(values):
         return None
-
-    # Illustrious 18 (hard)
-    if total == 16 and up == 'T':                    return 'S' if tc_floor >= 0 else None
-    if total == 15 and up == 'T':                    return 'S' if tc_floor >= 4 else None
-    if total == 10 and up in TEN_RANKS and first_two and dbl_ok(10):
-                                                    return 'D' if tc_floor >= 4 else None
-    if total == 12 and up == '3':                    return 'S' if tc_floor >= 2 else None
-    if total == 12 and up == '2':                    return 'S' if tc_floor >= 3 else None
-    if total == 11 and up == 'A' and first_two and dbl_ok(11):
-                                                    return 'D' if tc_floor >= 1 else None
-    if total == 9  and up == '2' and first_two and dbl_ok(9):
-                                                    return 'D' if tc_floor >= 1 else None
-    if total == 10 and up == 'A' and first_two and dbl_ok(10):
-                                                    return 'D' if tc_floor >= 4 else None
-    if total == 9  and up == '7' and first_two and dbl_ok(9):
-                                                    return 'D' if tc_floor >= 3 else None
-    if total == 16 and up == '9':                    return 'S' if tc_floor >= 5 else None
-
-    # Negative indices (default Stand -> Hit if TC too low)
-    if total == 13 and up == '2':                    return 'H' if tc_floor < -1 else None
-    if total == 13 and up == '3':                    return 'H' if tc_floor < -2 else None
-    if total == 12 and up == '4':                    return 'H' if tc_floor < 0  else None
-    if total == 12 and up == '5':                    return 'H' if tc_floor < -2 else None
-    if total == 12 and up == '6':                    return 'H' if tc_floor < -1 else None
-
-    # 12 vs 7: Stand at +3 (else base = Hit)
-    if total == 12 and up == '7':                    return 'S' if tc_floor >= 3 else None
-
-    return None
-
-CARD_ORDER = ['2','3','4','5','6','7','8','9','T','J','Q','K','A']
-DISPLAY = {'2':'2','3':'3','4':'4','5':'5','6':'6','7':'7','8':'8','9':'9','T':'10','J':'J','Q':'Q','K':'K','A':'A'}
-
-# --------- Linear EV: base & slope (≈) ---------
-BASE_ANCHOR_6D_S17_DAS = -0.36  # %
-ADJ_H17    = -0.20
-ADJ_NO_DAS = -0.14
-ADJ_RSA    = +0.03
-ADJ_LS     = +0.08
-ADJ_NO_PEEK= -0.11
-
-DECK_ADJ = {1:+0.25, 2:+0.17, 4:+0.06, 6:0.0, 8:-0.03, 10:-0.05, 12:-0.06}
-SLOPE = {
-    "Hi-Lo":    {1:0.65, 2:0.60, 4:0.53, 6:0.50, 8:0.47, 10:0.45, 12:0.44},
-    "Zen":      {1:0.70, 2:0.65, 4:0.56, 6:0.53, 8:0.50, 10:0.48, 12:0.46},
-    "Omega II": {1:0.72, 2:0.67, 4:0.58, 6:0.55, 8:0.52, 10:0.50, 12:0.48},
-    "Hi-Opt II":{1:0.73, 2:0.68, 4:0.60, 6:0.56, 8:0.53, 10:0.51, 12:0.49},
-}
-ACE_PENALTY = 0.90  # penalty if no Ace side-count (ΩII / Hi-Opt II)
-
-INS_THRESH_HILO = +3  # TC floor threshold for insurance (simple fallback)
-MIN_DECKS_DEN = 0.25  # min 1/4 shoe to stabilize TC near the cut
-
-# --- Illustrious 18 + Fab 4 display (not used by logic, kept) ---
-I18_F4 = [
-    ("Insurance", +3, "Take", "Don't take"),
-    ("16 vs 10",  0,  "Stand",   "Hit"),
-    ("15 vs 10", +4,  "Stand",   "Hit"),
-    ("10 vs 10", +4,  "Double",  "Hit"),
-    ("12 vs 3",  +2,  "Stand",   "Hit"),
-    ("12 vs 2",  +3,  "Stand",   "Hit"),
-    ("11 vs A",  +1,  "Double",  "Hit"),
-    ("9  vs 2",  +1,  "Double",  "Hit"),
-    ("10 vs A",  +4,  "Double",  "Hit"),
-    ("9  vs 7",  +3,  "Double",  "Hit"),
-    ("16 vs 9",  +5,  "Stand",   "Hit"),
-    ("13 vs 2", -1,   "Stand",   "Hit"),
-    ("12 vs 4",  0,   "Stand",   "Hit"),
-    ("12 vs 5", -2,   "Stand",   "Hit"),
-    ("12 vs 6", -1,   "Stand",   "Hit"),
-    ("13 vs 3", -2,   "Stand",   "Hit"),
-    ("12 vs 7", +3,   "Hit",     "Stand"),
-    ("A,8 vs 6", +1,  "Double",  "Stand"),
-    # Fab 4 (LS)
-    ("15 vs 10 (Sur)", +0, "Surrender", "Hit"),
-    ("15 vs 9 (Sur)",  +2, "Surrender", "Hit"),
-    ("15 vs A (Sur)",  +1, "Surrender", "Hit"),
-    ("14 vs 10 (Sur)", +3, "Surrender", "Hit"),
-]
-
-# --------- Utils ---------
-RANK_VALUE = {'2':2,'3':3,'4':4,'5':5,'6':6,'7':7,'8':8,'9':9,'T':10,'J':10,'Q':10,'K':10,'A':11}
-
-def up_to_val(up):
-    return 11 if up=='A' else 10 if up in TEN_RANKS else int(up)
-
-def hand_total(cards):
-    total = sum(11 if c=='A' else 10 if c in TEN_RANKS else int(c) for c in cards)
-    aces = sum(1 for c in cards if c=='A')
-    while total > 21 and aces > 0:
-        total -= 10
-        aces -= 1
-    soft = (aces > 0)  # at least one Ace still counts as 11
-    return total, soft
-
-def is_blackjack(cards):
-    return len(cards)==2 and ('A' in cards) and any(c in TEN_RANKS for c in cards)
-
-def copy_counts(rem):
-    return {r:int(rem.get(r,0)) for r in CARD_ORDER}
-
-def draw_one(counts, rnd):
-    tot = sum(counts[r] for r in CARD_ORDER)
-    if tot<=0: return 'T'
-    pick = rnd.randrange(tot)
-    s=0
-    for r in CARD_ORDER:
-        s += counts[r]
-        if pick < s:
-            counts[r]-=1
-            return r
-    return 'T'
-
-def should_split(rank, up, rules):
-    """Basic strategy pairs (multi-deck). Correctly handles DAS / non-DAS."""
-    das = rules.get("DAS", True)
-    if rank == 'A' or rank == '8':
-        return True
-    if rank in TEN_RANKS:
-        return False
-    if rank == '9':
-        # Split 9s vs 2–6,8,9 (not vs 7,T,A)
-        return up not in ('7',) + TEN_RANKS + ('A',)
-    if rank == '7':
-        # With DAS: 2–7 ; without DAS: 2–6
-        return (up in UP_23456) or (das and up == '7')
-    if rank == '6':
-        # With DAS: 2–6 ; without DAS: 3–6
-        return (up in UP_23456) if das else (up in ('3','4','5','6'))
-    if rank in ('2','3'):
-        # With DAS: 2–7 ; without DAS: 4–7
-        return (up in UP_23456 + ('7',)) if das else (up in ('4','5','6','7'))
-    if rank == '4':
-        # Only with DAS vs 5–6
-        return das and (up in UP_56)
-    return False
-
-def hard_action(t, up, rules, can_double):
-    def can_dbl(total):
-        return can_double and (not rules.get("D10", False) or total in (10, 11))
-    if t >= 17:
-        return 'S'
-    if t >= 13 and up_to_val(up) <= 6:
-        return 'S'
-    if t == 12 and up in ('4', '5', '6'):
-        return 'S'
-    # 11: double vs 2–10 only (vs As -> Hit except index +1)
-    if t == 11 and can_dbl(11) and up != 'A':
-        return 'D'
-    # 10: double vs 2–9 only (vs 10/As -> Hit except index)
-    if t == 10 and can_dbl(10) and up_to_val(up) <= 9:
-        return 'D'
-    if t == 9 and can_dbl(9) and up in UP_3456:
-        return 'D'
-    return 'H'
-
-def soft_action(t, up, rules, can_double):
-    def can_dbl(total):
-        return can_double and (not rules.get("D10", False) or total in (10, 11))
-    if t >= 19:
-        return 'S'
-    if t == 18:
-        # A,7 : Double vs 3–6 ; Stand vs 2/7/8 ; Hit vs 9/T/A
-        if up in UP_3456 and can_dbl(18):
-            return 'D'
-        if up in ('2', '7', '8'):
-            return 'S'
-        return 'H'
-    if t == 17 and can_dbl(17) and up in UP_3456:
-        return 'D'
-    if t == 16 and can_dbl(16) and up in ('4', '5', '6'):
-        return 'D'
-    if t == 15 and can_dbl(15) and up in ('4', '5', '6'):
-        return 'D'
-    if t == 14 and can_dbl(14) and up in UP_56:
-        return 'D'
-    if t == 13 and can_dbl(13) and up in UP_56:
-        return 'D'
-    return 'H'
-
-def estimate_base_edge(decks, h17, das, rsa, hsa, dos, d10, ls, peek):
-    base = BASE_ANCHOR_6D_S17_DAS + DECK_ADJ.get(int(decks), 0.0)
-    if h17:  base += ADJ_H17
-    if not das: base += ADJ_NO_DAS
-    if rsa:  base += ADJ_RSA
-    if ls:   base += ADJ_LS
-    if not peek: base += ADJ_NO_PEEK
-    return round(base,2)
-
-def slope_for(system,decks,side_ace_used):
-    decks = max(1, min(12, int(decks)))
-    dkeys = sorted(SLOPE[system].keys())
-    nearest = min(dkeys, key=lambda k: abs(k - decks))
-    m = SLOPE[system][nearest]
-    if system in ("Omega II","Hi-Opt II") and not side_ace_used:
-        m *= ACE_PENALTY
-    return round(m,2)
-
-# --------- Dealer play ---------
-def dealer_play(cards, counts, rules, rnd):
-    while True:
-        tot, soft = hand_total(cards)
-        must_hit = (tot < 17) or (tot == 17 and soft and rules.get("H17", False))
-        if not must_hit: break
-        cards.append(draw_one(counts, rnd))
-    return hand_total(cards)[0]
-
-# --------- Resolution (ENHC/OBO exact) ---------
-def resolve_vs_dealer(p, up, dealer_hole, counts, rules, rnd, doubled=False):
-    # ENHC: dealer BJ revealed at end -> doubles/splits lose all (except OBO original bet).
-    if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]):
-        if rules["OBO"]:
-            return -1.0
-        return -2.0 if doubled else -1.0
-
-    tot, _ = hand_total(p)
-    if tot > 21:
-        return -2.0 if doubled else -1.0
-
-    # PEEK: USE the already-drawn hole card
-    if rules["PEEK"]:
-        dealer_cards = [up, dealer_hole] if dealer_hole is not None else [up, draw_one(counts, rnd)]
-    else:
-        dealer_cards = [up, dealer_hole] if dealer_hole is not None else [up]
-
-    dealer_total = dealer_play(dealer_cards, counts, rules, rnd)
-
-    if dealer_total > 21: return +2.0 if doubled else +1.0
-    if tot > dealer_total: return +2.0 if doubled else +1.0
-    if tot < dealer_total: return -2.0 if doubled else -1.0
-    return 0.0
-
-def resolve_vs_dealer_stand(p, up, dealer_hole, counts, rules, rnd):
-    if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]):
-        return -1.0
-    tot, _ = hand_total(p)
-    if tot > 21: return -1.0
-    if rules["PEEK"]:
-        dealer_cards = [up, dealer_hole] if dealer_hole is not None else [up, draw_one(counts, rnd)]
-    else:
-        dealer_cards = [up, dealer_hole] if dealer_hole is not None else [up]
-    dealer_total = dealer_play(dealer_cards, counts, rules, rnd)
-    if dealer_total > 21: return +1.0
-    if tot > dealer_total: return +1.0
-    if tot < dealer_total: return -1.0
-    return 0.0
-
-# --------- Player ---------
-def play_hand(p, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True):
-    first_two = (len(p) == 2)
-    tot, soft = hand_total(p)
-    # Index first (may recommend Stand/Double or Surrender)
-    override = apply_indices_override(tot, soft, up, first_two, can_double, tc_floor, rules) if apply_idx else None
-    if rules["LS"] and first_two and override == 'SUR' and not (p[0] == '8' and p[1] == '8'):
-        return -0.5
-    if can_split and first_two:
-    # ENHC + OBO: if the dealer has BJ, only the original bet is lost (split bet refunded)
-        if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]) and rules["OBO"]:
-            return -1.0
-        r1 = 'T' if p[0] in TEN_RANKS else p[0]
-        r2 = 'T' if p[1] in TEN_RANKS else p[1]
-        if r1==r2 and should_split(r1, up, rules) and split_depth<3:
-            if r1=='A':
-                ev=0.0
-                for _ in range(2):
-                    hand=['A', draw_one(counts,rnd)]
-                    if not rules["HSA"]:
-                        # If doubling allowed on split Aces but no hit: 1 card then stand, counted as a 'double'.
-                        if rules["DOUBLE_ON_SPLIT_ACES"]:
-                            ev += resolve_vs_dealer(hand, up, dealer_hole, counts, rules, rnd, doubled=True)
-                        else:
-                            ev += resolve_vs_dealer_stand(hand, up, dealer_hole, counts, rules, rnd)
-                    else:
-                        ev+=play_hand(hand, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx,
-                                      split_depth=split_depth+1,
-                                      can_double=(rules["DOUBLE_ON_SPLIT_ACES"]),
-                                      can_split=(rules["RSA"] and split_depth<3))
-                return ev
-            else:
-                ev=0.0
-                for _ in range(2):
-                    hand=[r1, draw_one(counts,rnd)]
-                    ev+=play_hand(hand, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx,
-                                  split_depth=split_depth+1,
-                                  can_double=rules["DAS"],
-                                  can_split=True)
-                return ev
-    # (light recompute if the hand changed)
-    tot, soft = hand_total(p)
-    # Base surrender – only if no index forced Stand/Double, and not 8,8
-    if override is None and rules["LS"] and first_two and not soft and not (p[0] == '8' and p[1] == '8'):
-        if (tot == 16 and up in ('9', 'T', 'J', 'Q', 'K', 'A')) or (tot == 15 and up == 'T'):
-            return -0.5
-    if override=='D' and can_double:
-        p.append(draw_one(counts,rnd))
-        return resolve_vs_dealer(p, up, dealer_hole, counts, rules, rnd, doubled=True)
-    act = override if override in ('H','S') else (soft_action(tot, up, rules, can_double) if soft else hard_action(tot, up, rules, can_double))
-    if act=='D' and can_double:
-        p.append(draw_one(counts,rnd))
-        return resolve_vs_dealer(p, up, dealer_hole, counts, rules, rnd, doubled=True)
-    while True:
-        tot,soft = hand_total(p)
-        if tot>=21: break
-        a = soft_action(tot, up, rules, False) if soft else hard_action(tot, up, rules, False)
-        if a=='H':
-            p.append(draw_one(counts,rnd)); continue
-        else: break
-    return resolve_vs_dealer(p, up, dealer_hole, counts, rules, rnd, doubled=False)
-
-# --- Forced-first-action variant for advice ---
-def play_hand_forced_first(p, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx, force, split_depth=0):
-    first_two = (len(p)==2)
-    if force == 'SURRENDER' and rules["LS"] and first_two and not (p[0]=='8' and p[1]=='8'):
-        return -0.5
-    if force == 'SPLIT' and first_two:
-    # ENHC + OBO: same logic in "Compare" mode
-        if (not rules["PEEK"]) and (dealer_hole is not None) and is_blackjack([up, dealer_hole]) and rules["OBO"]:
-            return -1.0
-        r1 = 'T' if p[0] in TEN_RANKS else p[0]
-        r2 = 'T' if p[1] in TEN_RANKS else p[1]
-        if r1==r2 and split_depth<3:
-            if r1=='A':
-                ev=0.0
-                for _ in range(2):
-                    hand=['A', draw_one(counts,rnd)]
-                    if not rules["HSA"]:
-                        # If doubling allowed on split Aces but no hit: 1 card then stand, counted as a 'double'.
-                        if rules["DOUBLE_ON_SPLIT_ACES"]:
-                            ev += resolve_vs_dealer(hand, up, dealer_hole, counts, rules, rnd, doubled=True)
-                        else:
-                            ev += resolve_vs_dealer_stand(hand, up, dealer_hole, counts, rules, rnd)
-                    else:
-                        ev+=play_hand(hand, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx,
-                                      split_depth=split_depth+1,
-                                      can_double=(rules["DOUBLE_ON_SPLIT_ACES"]),
-                                      can_split=(rules["RSA"] and split_depth<3))
-                return ev
-            else:
-                ev=0.0
-                for _ in range(2):
-                    hand=[r1, draw_one(counts,rnd)]
-                    ev+=play_hand(hand, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx,
-                                  split_depth=split_depth+1,
-                                  can_double=rules["DAS"],
-                                  can_split=True)
-                return ev
-    if force == 'DOUBLE':
-        p2=p[:]; p2.append(draw_one(counts,rnd))
-        return resolve_vs_dealer(p2, up, dealer_hole, counts, rules, rnd, doubled=True)
-    if force == 'STAND':
-        return resolve_vs_dealer_stand(p, up, dealer_hole, counts, rules, rnd)
-    if force == 'HIT':
-        p2=p[:]; p2.append(draw_one(counts,rnd))
-        return play_hand(p2, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx, split_depth=split_depth)
-    return play_hand(p, up, dealer_hole, counts, rules, rnd, tc_floor, apply_idx, split_depth=split_depth)
-
-# --------- Monte Carlo / EOR ---------
-def simulate_ev(rem_counts, rules, hands=20000, seed=12345, tc_floor=0, apply_idx=True):
-    rnd = random.Random(seed)
-    total=0.0; total2=0.0
-    for _ in range(hands):
-        ev = simulate_one_hand(rem_counts, rules, rnd, tc_floor, apply_idx)
-        total += ev; total2 += ev*ev
-    mean = (total/hands)*100.0
-    var  = max(1e-9, ((total2/hands) - (total/hands)**2))
-    return mean, var
-
-def simulate_one_hand(rem_counts, rules, rnd, tc_floor, apply_idx):
-    counts = copy_counts(rem_counts)
-    p=[draw_one(counts,rnd)]; up=draw_one(counts,rnd); p.append(draw_one(counts,rnd))
-    hole = draw_one(counts, rnd)  # always drawn (even in ENHC)
-    player_bj = is_blackjack(p)
-    ins_ev=0.0
-    if up=='A':
-        tens = counts['T']+counts['J']+counts['Q']+counts['K']
-        denom = sum(counts[r] for r in CARD_ORDER); p_bj=(tens/denom) if denom>0 else 0.0
-        take = (tc_floor>=INS_THRESH_HILO) or (p_bj>1/3.0)
-        if rules["PEEK"]:
-            if is_blackjack([up,hole]): 
-                ins_ev += +1.0 if take else 0.0
-                return (0.0 if player_bj else -1.0)+ins_ev
-            else:
-                ins_ev += -0.5 if take else 0.0
-        # ENHC: many casinos do not offer insurance -> leave ins_ev=0 if PEEK=False
-
-    if rules["PEEK"]:
-        if up in TEN_RANKS and hole=='A': return (0.0 if player_bj else -1.0)+ins_ev
-        if player_bj: return (1.5 if rules["BJ_3_2"] else 1.2)+ins_ev
-        ev = play_hand(p, up, hole, counts, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True)
-        return ev + ins_ev
-    else:
-        if player_bj: return (1.5 if rules["BJ_3_2"] else 1.2)+ins_ev
-        ev_player = play_hand(p, up, hole, counts, rules, rnd, tc_floor, apply_idx, split_depth=0, can_double=True, can_split=True)
-        return ev_player + ins_ev
-
-def calibrate_eor(rem_counts, rules, hands=10000, seed=789, tc_floor=0, apply_idx=True):
-    base,_ = simulate_ev(rem_counts, rules, hands=hands, seed=seed, tc_floor=tc_floor, apply_idx=apply_idx)
-    eor = {}
-    for r in CARD_ORDER:
-        if rem_counts.get(r,0)<=0: eor[r]=0.0; continue
-        c2 = copy_counts(rem_counts); c2[r]-=1
-        ev2,_ = simulate_ev(c2, rules, hands=max(2000,hands//2), seed=seed+hash(r)%99991, tc_floor=tc_floor, apply_idx=apply_idx)
-        eor[r] = ev2 - base
-    return base, eor
-
-def simulate_fixed_action(rem_counts, rules, player_cards, dealer_up, hands=8000, seed=42, tc_floor=0, apply_idx=True, force='AUTO'):
-    rnd = random.Random(seed); total_ev=0.0
-    for _ in range(hands):
-        counts = copy_counts(rem_counts)
-        for c in player_cards:
-            if counts.get(c,0)>0: counts[c]-=1
-        if counts.get(dealer_up,0)>0: counts[dealer_up]-=1
-        hole = draw_one(counts, rnd)  # always drawn
-        if rules["PEEK"] and is_blackjack([dealer_up,hole]): 
-            total_ev += (0.0 if is_blackjack(player_cards) else -1.0)
-            continue
-        if is_blackjack(player_cards): 
-            total_ev += (1.5 if rules["BJ_3_2"] else 1.2)
-            continue
-        total_ev += play_hand_forced_first(player_cards[:], dealer_up, hole, counts, rules, rnd, tc_floor, apply_idx, force)
-    return (total_ev/hands)*100.0
+    return [(i, b) for i, (a, b) in enumerate(zip(old, values)) if a != b]
 
 # ---------------- Scrollable Frame ----------------
 class VerticalScrolledFrame(ttk.Frame):
@@ -532,13 +129,32 @@ class ProApp:
         self.apply_idx_var = tk.BooleanVar(value=True)
         self.hands_var = tk.IntVar(value=20000)
         self.hands_eor_var = tk.IntVar(value=12000)
-
-        self.cards_seen = {r:0 for r in CARD_ORDER}
-        self.history = []
+        self.workers_var = tk.IntVar(value=default_workers())
+        self.compare_mc_var = tk.BooleanVar(value=False)  # Compare: simulate instead of exact
+        self.eor_crn_var = tk.BooleanVar(value=True)      # EOR: paired removal (calibrate_eor_crn)
+        self.index_table = None                           # generated IndexTable for the Advisor (None: Hi-Lo I18/Fab4)
+        self.telemetry_var = tk.BooleanVar(value=False)   # live hands/s, ETA and phase split of EV/EOR runs (slows them)
+        self.target_se_var = tk.DoubleVar(value=0.0)      # EV sim: stop once the SE (%) is this small (0 = off)
+        self.spread_var = tk.DoubleVar(value=8.0)         # largest bet (units) for "Best spread"
+        self.horizon_var = tk.IntVar(value=100_000)       # rounds per bankroll trajectory
+        self.spread_result = None                         # (freq, model, ramp, version) of the last "Best spread"
+        # background runs: one at a time, newest per kind wins, stale results dropped
+        self.jobs = JobScheduler(lambda fn: self.root.after(0, fn), self.state_version)
+        # Compare gets its own lane so a decision never waits behind a long EV/EOR run
+        self.quick_jobs = JobScheduler(lambda fn: self.root.after(0, fn), self.state_version)
+        # Advisor/Compare answers by spot (hand, upcard, composition, rules, TC), LRU-bounded
+        self.memo = MemoCache()
+        self.chart_win = None; self.chart_cells = {}
+
+        self.count = CountState(self.decks_var.get(), self.pen_var.get())
+        # card entry changes the count at once; the redraw runs once per burst (after_idle)
+        self._refresh_pending = False
+        self._shown = {}   # (tree, row) -> values last pushed, so refreshes touch changed cells only
 
         # EOR model
         self.eor_base_ev = None
         self.eor_vec = None
+        self.eor_se = None
         self.eor_ref_counts = None
         self.ace_tc_weight = 0.0
 
@@ -549,6 +165,8 @@ class ProApp:
         self._build_status()
 
         self.update_all()
+        workers = self.workers()
+        self.jobs.submit("warm", lambda job: warm_pool(workers))   # spawn the pool before the first click
 
         
         # --- Key shortcuts to add cards (ignored when typing in inputs) ---
@@ -648,12 +266,16 @@ class ProApp:
         up_opts = [DISPLAY[r] for r in CARD_ORDER]
         self.upcombo = ttk.Combobox(tab2, textvariable=self.upvar, values=up_opts, width=6, state="readonly"); self.upcombo.grid(row=row, column=3, sticky="w")
         ttk.Button(tab2, text="Advisor", command=self.advise_btn).grid(row=row, column=4, padx=6)
-        ttk.Button(tab2, text="Compare (simulate)", command=self.compare_btn).grid(row=row, column=5, padx=6)
+        ttk.Button(tab2, text="Compare (exact)", command=self.compare_btn).grid(row=row, column=5, padx=6)
+        ttk.Checkbutton(tab2, text="Monte-Carlo", variable=self.compare_mc_var).grid(row=row, column=6, padx=6, sticky="w")
+        ttk.Button(tab2, text="Strategy chart…", command=self.chart_btn).grid(row=row, column=7, padx=6)
         row+=1
         self.advice_base = tk.StringVar(value="Action (base + indexes): —")
         self.advice_sim  = tk.StringVar(value="EV comparison (%): —")
         ttk.Label(tab2, textvariable=self.advice_base, foreground="#333333").grid(row=row, column=0, columnspan=6, sticky="w", padx=6, pady=2); row+=1
-        ttk.Label(tab2, textvariable=self.advice_sim,  foreground="#333333").grid(row=row, column=0, columnspan=6, sticky="w", padx=6, pady=2)
+        ttk.Label(tab2, textvariable=self.advice_sim,  foreground="#333333").grid(row=row, column=0, columnspan=6, sticky="w", padx=6, pady=2); row+=1
+        self.memo_var = tk.StringVar(value="Memo: —")
+        ttk.Label(tab2, textvariable=self.memo_var, foreground="#666666").grid(row=row, column=0, columnspan=6, sticky="w", padx=6, pady=(0,4))
 
     def _build_ev_panel(self):
         box = ttk.LabelFrame(self.page, text="Advanced EV")
@@ -672,6 +294,33 @@ class ProApp:
         ttk.Label(box, textvariable=self.ev_sim_var).grid(row=1, column=0, columnspan=3, sticky="w", padx=6, pady=(6,0))
         ttk.Label(box, textvariable=self.kelly_var).grid(row=1, column=3, columnspan=2, sticky="w", padx=6, pady=(6,0))
         ttk.Label(box, textvariable=self.eor_status).grid(row=1, column=5, columnspan=2, sticky="w", padx=6, pady=(6,0))
+        ttk.Label(box, text="Workers (processes)").grid(row=2, column=1, padx=6, pady=(6,0), sticky="e")
+        ttk.Spinbox(box, from_=1, to=max(64, default_workers()), textvariable=self.workers_var, width=9, justify="center").grid(row=2, column=2, padx=2, pady=(6,0), sticky="w")
+        ttk.Checkbutton(box, text="Paired EOR (CRN)", variable=self.eor_crn_var).grid(row=2, column=3, padx=6, pady=(6,0), sticky="w")
+        ttk.Button(box, text="Load indices…", command=self.load_indices_btn).grid(row=2, column=4, padx=6, pady=(6,0))
+        self.index_status = tk.StringVar(value="Indices: Hi-Lo Ill18+Fab4")
+        ttk.Label(box, textvariable=self.index_status).grid(row=2, column=5, columnspan=3, sticky="w", padx=6, pady=(6,0))
+        self.eor_detail = tk.StringVar(value="")
+        ttk.Label(box, textvariable=self.eor_detail, foreground="#333333").grid(row=3, column=0, columnspan=8, sticky="w", padx=6, pady=(4,0))
+        ttk.Checkbutton(box, text="Live telemetry", variable=self.telemetry_var).grid(row=4, column=0, padx=6, pady=(4,0), sticky="w")
+        self.tel_var = tk.StringVar(value="")
+        ttk.Label(box, textvariable=self.tel_var, foreground="#333333").grid(row=4, column=1, columnspan=7, sticky="w", padx=6, pady=(4,0))
+        ttk.Label(box, text="Target SE % (0 = off)").grid(row=5, column=1, padx=6, pady=(4,0), sticky="e")
+        ttk.Spinbox(box, from_=0, to=5, increment=0.05, textvariable=self.target_se_var, width=9, justify="center").grid(row=5, column=2, padx=2, pady=(4,0), sticky="w")
+        ttk.Button(box, text="Cancel", command=self.cancel_ev_btn).grid(row=5, column=5, padx=8, pady=(4,0))
+        ttk.Button(box, text="Rate systems", command=self.rate_systems_btn).grid(row=5, column=6, padx=8, pady=(4,0))
+        self.rate_var = tk.StringVar(value="")
+        ttk.Label(box, textvariable=self.rate_var, foreground="#333333").grid(row=6, column=0, columnspan=8, sticky="w", padx=6, pady=(4,0))
+        ttk.Label(box, text="Max spread (units)").grid(row=7, column=1, padx=6, pady=(4,0), sticky="e")
+        ttk.Spinbox(box, from_=1, to=100, textvariable=self.spread_var, width=9, justify="center").grid(row=7, column=2, padx=2, pady=(4,0), sticky="w")
+        ttk.Button(box, text="Best spread", command=self.best_spread_btn).grid(row=7, column=6, padx=8, pady=(4,0))
+        self.ramp_var = tk.StringVar(value="")
+        ttk.Label(box, textvariable=self.ramp_var, foreground="#333333").grid(row=8, column=0, columnspan=8, sticky="w", padx=6, pady=(4,0))
+        ttk.Label(box, text="Horizon (rounds)").grid(row=9, column=1, padx=6, pady=(4,0), sticky="e")
+        ttk.Spinbox(box, from_=1000, to=10_000_000, increment=10_000, textvariable=self.horizon_var, width=9, justify="center").grid(row=9, column=2, padx=2, pady=(4,0), sticky="w")
+        ttk.Button(box, text="Bankroll sweep", command=self.bankroll_btn).grid(row=9, column=6, padx=8, pady=(4,0))
+        self.bankroll_var = tk.StringVar(value="")
+        ttk.Label(box, textvariable=self.bankroll_var, foreground="#333333").grid(row=10, column=0, columnspan=8, sticky="w", padx=6, pady=(4,0))
 
     def _build_status(self):
         box = ttk.LabelFrame(self.page, text="Status / tools")
@@ -691,129 +340,108 @@ class ProApp:
     def decks_total_cards(self):
         return int(self.decks_var.get())*52
 
+    def count_state(self):
+        """The live CountState, re-configured if decks/penetration were edited."""
+        return self.count.configure(self.decks_var.get(), self.pen_var.get())
+
+    @property
+    def cards_seen(self):
+        return self.count.seen
+
     def decks_remaining(self):
-        # TC denominator = cards remaining UP TO THE CUT (penetration), not the whole shoe.
-        seen = sum(self.cards_seen[r] for r in CARD_ORDER)
-        total = self.decks_total_cards()
-        cut = int(total*(self.pen_var.get()/100.0))  # number of cards dealt before reshuffle
-        seen_to_cut = min(seen, cut)
-        remain_to_cut = max(0, cut - seen_to_cut)
-        decks = remain_to_cut/52.0
-        return max(MIN_DECKS_DEN, decks)
+        return self.count_state().decks_remaining()
 
     def shoe_progress(self):
-        total = self.decks_total_cards()
-        cut = int(total*(self.pen_var.get()/100.0))
-        seen = sum(self.cards_seen[r] for r in CARD_ORDER)
-        seen_to_cut = min(seen, cut)
-        remain_to_cut = max(0, cut - seen_to_cut)
-        return seen_to_cut, cut, total, remain_to_cut
+        return self.count_state().shoe_progress()
 
     def remaining_counts(self):
-        total = self.decks_total_cards()
-        base = {r:(total//13) for r in CARD_ORDER}
-        # 52*D is always divisible by 13 -> no remainder, but keep generic code
-        for r in CARD_ORDER: base[r] += 1 if CARD_ORDER.index(r) < (total % 13) else 0
-        for r in CARD_ORDER: base[r] -= self.cards_seen[r]
-        return {r:max(0, base[r]) for r in CARD_ORDER}
+        return dict(self.count_state().remaining)
+
+    def rules_version(self):
+        return tuple(sorted(self.current_rules().items()))
+
+    def state_version(self):
+        """What a background result depends on: rules, shoe geometry and the unseen cards."""
+        st = self.count_state()
+        return (self.rules_version(), int(self.decks_var.get()), int(self.pen_var.get()),
+                tuple(st.remaining[r] for r in CARD_ORDER))
 
     # ---- counting ----
     def add_card(self, r):
         if r not in CARD_ORDER: return
-        rem = self.remaining_counts()
-        if sum(rem.values()) <= 0: return
-        if rem.get(r, 0) <= 0:
+        st = self.count_state()
+        if st.remaining_total <= 0: return
+        if not st.add(r):
             try: self.root.bell()
             except Exception: pass
             return
-        self.cards_seen[r] += 1
-        self.history.append(r)
-        self.update_all()
+        self.schedule_refresh()
 
     def undo(self):
-        if not self.history: return
-        r = self.history.pop()
-        self.cards_seen[r] = max(0, self.cards_seen[r]-1)
-        self.update_all()
+        if self.count.undo() is None: return
+        self.schedule_refresh()
 
     def reset_shoe(self):
-        self.cards_seen = {r:0 for r in CARD_ORDER}
-        self.history = []
+        self.count.reset()
+        self.schedule_refresh()
+
+    def schedule_refresh(self):
+        """update_all once the event queue is idle: a burst of keypresses redraws once."""
+        if self._refresh_pending: return
+        self._refresh_pending = True
+        self.root.after_idle(self._refresh)
+
+    def _refresh(self):
+        self._refresh_pending = False
         self.update_all()
 
+    def show_row(self, tree, row, values):
+        """Push to the Treeview only the cells that differ from what it shows."""
+        old = self._shown.get((tree, row))
+        if old == values: return
+        cells = changed_cells(old, values)
+        if cells is None:
+            tree.item(row, values=values)
+        else:
+            cols = tree["columns"]
+            for i, v in cells:
+                tree.set(row, cols[i], v)
+        self._shown[(tree, row)] = values
+
     def compute_running(self, system_map):
-        rc = 0
-        for r in CARD_ORDER:
-            rc += system_map.get(r,0)*self.cards_seen[r]
-        return rc
+        return self.count.running(system_map)
 
     def tc_values(self, system_name, system_map):
-        rc = self.compute_running(system_map)
-        rem_decks = self.decks_remaining()
+        rc = self.count.running(system_map)
+        rem_decks = self.count_state().decks_remaining()
         tc_float = rc / rem_decks if rem_decks>0 else 0.0
         tc_floor = math.floor(tc_float)
         tc_trunc = math.trunc(tc_float)  # truncated (betting)
         return rc, tc_float, tc_floor, tc_trunc
 
     def insurance_ev_comp(self):
-        rem = self.remaining_counts()
-        denom = sum(rem[r] for r in CARD_ORDER)
-        if denom<=0: return None
-        tens = rem['T']+rem['J']+rem['Q']+rem['K']
-        p = tens/denom
-        # Insurance ROI (2:1): EV = 2p - 1 → in %
-        return (2.0*p - 1.0)*100.0
+        return self.count_state().insurance_ev()
 
     
     def update_all(self):
-        base_edge = estimate_base_edge(self.decks_var.get(), self.h17_var.get(), self.das_var.get(),
-                                       self.rsa_var.get(), self.hsa_var.get(), self.dos_var.get(),
-                                       self.d10_var.get(), self.ls_var.get(), (self.peek_var.get() and not self.enhc_var.get()))
-        rem_decks = self.decks_remaining()
-
-        rc_hilo = self.compute_running(HI_LO)
-        tc_hilo = rc_hilo / rem_decks if rem_decks>0 else 0.0
-        tc_hilo_floor = math.floor(tc_hilo)
-
-        ins_ev = self.insurance_ev_comp()
-        ins_text = f"{ins_ev:+.2f}%" if ins_ev is not None else "—"
-
-        # --- EOR adjustment (composition-sensitive EV correction) ---
-        eor_delta = 0.0
+        eor = None
         if (getattr(self, "eor_vec", None) is not None and
             getattr(self, "eor_ref_counts", None) is not None and
             getattr(self, "eor_base_ev", None) is not None):
-            cur = self.remaining_counts()
-            ref = self.eor_ref_counts
-            # eor_vec[r]: ΔEV (percentage points) when REMOVING 1 card r from the reference shoe
-            eor_delta = sum(self.eor_vec.get(r, 0.0) * (ref.get(r, 0) - cur.get(r, 0)) for r in CARD_ORDER)
-
-        # Main table
-        for name, sys_map in SYSTEMS:
-            rc, tc_float, tc_floor, tc_trunc = self.tc_values(name, sys_map)
-            slope = slope_for(name, self.decks_var.get(), side_ace_used=(self.asc_var.get() if name in ("Omega II","Hi-Opt II") else True))
-            # Count-based EV + composition-based correction (EOR)
-            ev = base_edge + slope * tc_floor + eor_delta
-            self.tree.item(self.rows[name], values=(
-                name, f"{rc:+d}", f"{tc_trunc:+d}", f"{tc_floor:+d}", f"{tc_float:+.2f}", f"{ev:+.2f}", ins_text
-            ))
+            eor = (self.eor_vec, self.eor_ref_counts)
+        main, seen, remaining, progress = count_view(self.count_state(), self.decks_var.get(), self.current_rules(),
+                                                     self.asc_var.get(), eor)
+        for name, _ in SYSTEMS:
+            self.show_row(self.tree, self.rows[name], main[name])
 
         # Tab1: visible count + shoe progress
         try:
             if hasattr(self, "tab1_tree"):
-                rem = self.remaining_counts()
-                seen_vals = ("Seen",) + tuple(str(self.cards_seen[r]) for r in CARD_ORDER)
-                rem_vals  = ("Remaining",) + tuple(str(rem[r]) for r in CARD_ORDER)
-                self.tab1_tree.item(self.tab1_rows["Seen"], values=seen_vals)
-                self.tab1_tree.item(self.tab1_rows["Remaining"], values=rem_vals)
-
-            if hasattr(self, "progress_var"):
-                seen_to_cut, cut_cards, total_cards, remain_to_cut = self.shoe_progress()
-                seen_total = sum(self.cards_seen[r] for r in CARD_ORDER)
-                self.progress_var.set(
-                    f"Shoe progress: seen {seen_total}/{total_cards}  |  seen up to cut {seen_to_cut}/{cut_cards}  (remaining up to cut: {remain_to_cut})"
-                )
-        except Exception as _e:
+                self.show_row(self.tab1_tree, self.tab1_rows["Seen"], seen)
+                self.show_row(self.tab1_tree, self.tab1_rows["Remaining"], remaining)
+            if hasattr(self, "progress_var") and self.progress_var.get() != progress:
+                self.progress_var.set(progress)
+        except Exception:
             # do not block the app if the tab isn't built yet
             pass
 
@@ -830,15 +458,121 @@ class ProApp:
         apply_idx = bool(self.apply_idx_var.get())
         self.ev_sim_var.set("Simulated EV: in progress…")
         self.kelly_var.set("Kelly (≈): …")
-        def work():
-            mean,var = simulate_ev(rem, rules, hands=hands, seed=random.randrange(1,10_000_000), tc_floor=tc_floor, apply_idx=apply_idx)
-            edge_units = mean/100.0
-            kelly = max(0.0, min(1.0, edge_units/var)) if var>0 else 0.0
-            def ui():
-                self.ev_sim_var.set(f"Simulated EV: {mean:+.2f}%  (var≈{var:.3f}, hands={hands}, idx={'ON' if apply_idx else 'OFF'})")
-                self.kelly_var.set(f"Kelly (≈): {kelly*100:.1f}% of unit bankroll")
-            self.root.after(0, ui)
-        threading.Thread(target=work, daemon=True).start()
+        engine = "numpy" if numpy_available() else "python"
+        workers = self.workers()
+        decks = int(self.decks_var.get())
+        try:
+            target_se = max(0.0, float(self.target_se_var.get()))
+        except (tk.TclError, ValueError):
+            target_se = 0.0
+        def show(mean, var, n, state):
+            se = 100.0*math.sqrt(var/n)
+            kelly = max(0.0, min(1.0, (mean/100.0)/var)) if var>0 else 0.0
+            self.ev_sim_var.set(f"Simulated EV: {mean:+.2f}% ± {1.96*se:.2f} (95%)  (var≈{var:.3f}, hands={n:,}/{hands:,}, idx={'ON' if apply_idx else 'OFF'}, {state})")
+            self.kelly_var.set(f"Kelly (≈): {kelly*100:.1f}% of unit bankroll")
+        # full runs are cached under the same key as before; early stops are not
+        cache = result_cache()
+        key = result_key("ev", rules, decks, rem, tc_floor, apply_idx, hands)
+        vals = cache.get(key)
+        if vals is not None:
+            self.jobs.cancel("ev", supersede=True)
+            show(vals[0], vals[1], hands, "cached"); return
+        if self.jobs.busy() and not self.jobs.busy("ev"):
+            self.ev_sim_var.set("Simulated EV: queued…")
+        tel = self.new_telemetry(hands)
+        def run(job):
+            self.jobs.deliver(job, self.watch_telemetry, "EV", tel)
+            state = engine
+            with instrument(tel):
+                for n, mean, var, se in simulate_ev_progressive(rem, rules, hands=hands, seed=random.randrange(1,10_000_000), tc_floor=tc_floor,
+                                                                apply_idx=apply_idx, engine=engine, workers=workers, target_se=target_se):
+                    if job.cancelled():
+                        state = "cancelled"; break
+                    self.jobs.deliver(job, show, mean, var, n, "running…")
+            if n == hands:
+                cache.put(key, (mean, var))
+            elif state == engine:
+                state = f"target SE {target_se:g}% reached"
+            return mean, var, n, state
+        self.jobs.submit("ev", run, version=self.state_version(), on_done=lambda res: show(*res),
+                         on_drop=lambda: self.ev_sim_var.set("Simulated EV: discarded (shoe or rules changed)"))
+
+    def cancel_ev_btn(self):
+        if self.jobs.busy("ev"):
+            self.jobs.cancel("ev")
+            self.ev_sim_var.set(self.ev_sim_var.get().replace("running…", "cancelling…"))
+
+    def rate_systems_btn(self):
+        """BC / PE / IC of every system, against the calibrated EOR when there is one."""
+        rules = self.current_rules(); decks = int(self.decks_var.get()); workers = self.workers()
+        eor = self.eor_vec
+        self.rate_var.set("Systems: rating (exact playing effects)…")
+        def run(job):
+            return evaluate_systems(SYSTEMS, eor=eor, effects=play_effects(rules, decks, workers=workers))
+        def done(rows):
+            src = "calibrated EOR" if eor is not None else "reference EOR"
+            self.rate_var.set(f"Systems (BC / PE / IC, {src}):  " + "   |   ".join(
+                f"{d['name']} {d['bc']:.2f} / {d['pe']:.2f} / {d['ic']:.2f}" for d in rows))
+        current = lambda: (self.rules_version(), int(self.decks_var.get()))
+        self.jobs.submit("rate", run, version=current(), current=current, on_done=done,
+                         on_drop=lambda: self.rate_var.set("Systems: discarded (rules or decks changed)"))
+
+    def best_spread_btn(self):
+        """Hi-Lo bet ramp with the best SCORE for the decks, penetration and max spread."""
+        rules = self.current_rules(); decks = int(self.decks_var.get()); pen = int(self.pen_var.get())
+        workers = self.workers()
+        try:
+            spread = max(1.0, float(self.spread_var.get()))
+        except (tk.TclError, ValueError):
+            spread = 8.0
+        self.ramp_var.set("Spread: dealing shoes for the TC frequencies…")
+        current = lambda: (self.rules_version(), int(self.decks_var.get()), int(self.pen_var.get()))
+        version = current()
+        def run(job):
+            freq, true_tc = tc_histogram(decks, pen, "Hi-Lo", shoes=100_000, workers=workers)
+            model = linear_tc_model(rules, decks, "Hi-Lo", true_tc=true_tc)
+            return freq, model, optimize_ramp(freq, model, spread=spread)
+        def done(out):
+            freq, model, res = out
+            self.spread_result = (freq, model, res["ramp"], version)
+            ramp = ",".join(f"{tc}:{u:g}" for tc, u in res["ramp"])
+            self.ramp_var.set(f"Spread 1-{spread:g} (Hi-Lo, best SCORE): {ramp}   WR {res['win_rate']:+.2f}/100, "
+                              f"SD {res['sd']:.1f}, SCORE {res['score']:.1f}, N0 {res['n0']:,.0f}")
+        self.jobs.submit("spread", run, version=version, current=current, on_done=done,
+                         on_drop=lambda: self.ramp_var.set("Spread: discarded (rules, decks or penetration changed)"))
+
+    def bankroll_btn(self):
+        """RoR, drawdown and time to double at full, half and quarter Kelly for the last
+        "Best spread" ramp (the default ramp until there is one) over the horizon."""
+        rules = self.current_rules(); decks = int(self.decks_var.get()); pen = int(self.pen_var.get())
+        workers = self.workers()
+        try:
+            rounds = max(1000, int(self.horizon_var.get()))
+        except (tk.TclError, ValueError):
+            rounds = 100_000
+        current = lambda: (self.rules_version(), int(self.decks_var.get()), int(self.pen_var.get()))
+        version = current()
+        last = self.spread_result if self.spread_result and self.spread_result[3] == version else None
+        self.bankroll_var.set("Bankroll: simulating trajectories…")
+        def run(job):
+            if last is not None:
+                freq, model, ramp, _ = last
+            else:
+                freq, true_tc = tc_histogram(decks, pen, "Hi-Lo", shoes=100_000, workers=workers)
+                model = linear_tc_model(rules, decks, "Hi-Lo", true_tc=true_tc); ramp = DEFAULT_RAMP
+            mean, var = round_moments(freq, model, ramp)
+            if mean <= 0: return ramp, None
+            return ramp, kelly_sweep(mean, var, (1.0, 0.5, 0.25), rounds)
+        def done(out):
+            ramp, rows = out
+            name = ",".join(f"{tc}:{u:g}" for tc, u in ramp)
+            if rows is None:
+                self.bankroll_var.set(f"Bankroll: ramp {name} loses money, no Kelly bankroll"); return
+            self.bankroll_var.set(f"Ramp {name}, {rounds:,} rounds:  " + "   |   ".join(
+                f"Kelly×{r['kelly']:g} ({r['bankroll']:,.0f} u): RoR {r['ror']:.1%}, DD95 {r['drawdown'][0.95]:,.0f}, "
+                f"doubled {r['doubled']:.0%}" for r in rows))
+        self.jobs.submit("bankroll", run, version=version, current=current, on_done=done,
+                         on_drop=lambda: self.bankroll_var.set("Bankroll: discarded (rules, decks or penetration changed)"))
 
     def calibrate_eor_btn(self):
         rules=self.current_rules()
@@ -849,21 +583,101 @@ class ProApp:
         hands=max(6000,int(self.hands_eor_var.get()))
         tc_floor = math.floor(self.compute_running(HI_LO)/self.decks_remaining())
         apply_idx = bool(self.apply_idx_var.get())
-        self.eor_status.set("EOR: calibrating…")
-        def work():
-            base,eor = calibrate_eor(rem, rules, hands=hands, seed=random.randrange(1,10_000_000), tc_floor=tc_floor, apply_idx=apply_idx)
-            def ui():
-                self.eor_base_ev = base; self.eor_vec = eor; self.eor_ref_counts = rem
-                self.eor_status.set(f"EOR: calibrated (EV0={base:+.2f}%)")
-                self.update_all()
-            self.root.after(0, ui)
-        threading.Thread(target=work, daemon=True).start()
+        workers = self.workers()
+        crn = bool(self.eor_crn_var.get())
+        decks = int(self.decks_var.get())
+        self.eor_status.set("EOR: queued…" if self.jobs.busy() and not self.jobs.busy("eor") else "EOR: calibrating…")
+        if crn:
+            rounds = max(1000, hands//2)
+        else:
+            rounds = hands + sum(max(2000, hands//2) for r in CARD_ORDER if rem.get(r, 0) > 0)
+        tel = self.new_telemetry(rounds)
+        def run(job):
+            self.jobs.deliver(job, self.watch_telemetry, "EOR", tel)
+            seed = random.randrange(1,10_000_000)
+            nr = len(CARD_ORDER)
+            with instrument(tel):
+                if crn:
+                    # ~14 replays per round: hands//2 rounds cost about as much as the independent runs
+                    def compute():
+                        res = calibrate_eor_crn(rem, rules, hands=max(1000, hands//2), seed=seed, tc_floor=tc_floor, apply_idx=apply_idx,
+                                                workers=workers, cancelled=job.cancelled)
+                        if res is None: return None
+                        base,eor,se = res
+                        return [base] + [eor[r] for r in CARD_ORDER] + [se[r] for r in CARD_ORDER]
+                    vals, cached = cached_result("eor-crn", (rules, decks, rem, tc_floor, apply_idx, hands), compute)
+                    if vals is None: return None
+                    se = dict(zip(CARD_ORDER, vals[1+nr:]))
+                else:
+                    def compute():
+                        res = calibrate_eor(rem, rules, hands=hands, seed=seed, tc_floor=tc_floor, apply_idx=apply_idx, engine="auto",
+                                            workers=workers, cancelled=job.cancelled)
+                        if res is None: return None
+                        base,eor = res
+                        return [base] + [eor[r] for r in CARD_ORDER]
+                    vals, cached = cached_result("eor", (rules, decks, rem, tc_floor, apply_idx, hands), compute)
+                    if vals is None: return None
+                    se = None
+            return vals[0], dict(zip(CARD_ORDER, vals[1:1+nr])), se, cached
+        def done(res):
+            if res is None:   # cancelled: the previous calibration stays in use
+                self.eor_status.set("EOR: cancelled"); return
+            base, eor, se, cached = res
+            self.eor_base_ev = base; self.eor_vec = eor; self.eor_se = se; self.eor_ref_counts = rem
+            self.eor_status.set(f"EOR: calibrated (EV0={base:+.2f}%{', cached' if cached else ''})")
+            if se:
+                self.eor_detail.set("EOR ± SE (%):  " + "  ".join(f"{DISPLAY[r]} {eor[r]:+.2f}±{se[r]:.2f}"
+                                                               for r in CARD_ORDER if r not in ('J','Q','K')))
+            else:
+                self.eor_detail.set("")
+            self.update_all()
+        # EOR deltas are relative to eor_ref_counts, so only a rules change makes them stale
+        self.jobs.submit("eor", run, version=self.rules_version(), current=self.rules_version, on_done=done,
+                         on_drop=lambda: self.eor_status.set("EOR: discarded (rules changed)"))
+
+    def new_telemetry(self, rounds):
+        """Telemetry for one EV/EOR run of `rounds` rounds, None when switched off."""
+        return Telemetry(rounds) if self.telemetry_var.get() else None
+
+    def watch_telemetry(self, label, tel):
+        """Show `tel` live in tel_var until its run ends (called when the job starts)."""
+        if tel is None: return
+        def show():
+            self.tel_var.set(f"{label}: " + (tel.summary() if tel.start is not None else "starting…"))
+            if tel.end is None: self.root.after(250, show)
+        show()
+
+    def load_indices_btn(self):
+        path = filedialog.askopenfilename(title="Index table (python -m blackjack_core indices -o …)",
+                                          filetypes=[("Index table", "*.json"), ("All files", "*")])
+        if not path: return
+        try:
+            table = load_index_table(path)
+            compile_strategy(self.current_rules(), indices=table)   # builds the tables for the current rules
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            messagebox.showerror("Indices", f"Cannot use {path}:\n{e}"); return
+        if table.system not in dict(SYSTEMS):
+            messagebox.showerror("Indices", f"Unknown counting system {table.system!r}."); return
+        self.index_table = table
+        meta = table.meta
+        self.index_status.set(f"Indices: {table.system} ({len(table.entries)} plays, {meta.get('decks', '?')}D)  — Advisor")
+
+    def play_tc_floor(self):
+        """(system name, TC floor) that drives index plays: the loaded table's system, else Hi-Lo."""
+        name = self.index_table.system if self.index_table is not None else "Hi-Lo"
+        return name, math.floor(self.compute_running(dict(SYSTEMS)[name]) / self.decks_remaining())
 
     def ev_eor_btn(self):
         if self.eor_vec is None or self.eor_base_ev is None or self.eor_ref_counts is None:
             messagebox.showwarning("EOR", "Calibrate EOR first."); return
         self.update_all()
 
+    def workers(self):
+        try:
+            return max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+
     def current_rules(self):
         return {
             "H17": self.h17_var.get(),
@@ -888,27 +702,39 @@ class ProApp:
         up = inv.get(self.upvar.get(), 'T')
 
         rules=self.current_rules()
-        rc_hilo = self.compute_running(HI_LO); tc_floor = math.floor( rc_hilo / self.decks_remaining() )
-
+        tc_name, tc_floor = self.play_tc_floor()
+        table = self.index_table
+        key = spot_key("advice", ranks, up, None, rules, tc_floor, bool(self.apply_idx_var.get()),
+                       (table.system, table.entries) if table is not None else None)
+        action = self.memo.get(key)
+        if action is None:
+            action = self.advise_action(ranks, up, rules, tc_floor)
+            self.memo.put(key, action)
+        self.advice_base.set(f"Action (base + indices): {action}  |  (TC {tc_name}={tc_floor:+d})")
+        self.memo_var.set(f"Memo: {self.memo.summary()}")
+
+    def advise_action(self, ranks, up, rules, tc_floor):
         tot, soft = hand_total(ranks)
         pair = (('T' if ranks[0] in TEN_RANKS else ranks[0]) == ('T' if ranks[1] in TEN_RANKS else ranks[1]))
+        strat = compile_strategy(rules, indices=self.index_table)
         action = None
-        if pair and should_split('T' if ranks[0] in TEN_RANKS else ranks[0], up, rules):
+        override = None
+        if pair and strat.split('T' if ranks[0] in TEN_RANKS else ranks[0], up):
             action = 'Split'
         else:
-            override = apply_indices_override(tot, soft, up, True, True, tc_floor, rules) if self.apply_idx_var.get() else None
+            override = strat.override(tot, soft, up, True, True, tc_floor) if self.apply_idx_var.get() else None
             if override == 'D': action = 'Double'
             elif override == 'S': action = 'Stand'
             elif override == 'H': action = 'Hit'
             elif override == 'SUR': action = 'Surrender'
-            else: action = {'H':'Hit','S':'Stand','D':'Double'}.get(soft_action(tot, up, rules, True) if soft else hard_action(tot, up, rules, True), 'Hit')
+            else: action = {'H':'Hit','S':'Stand','D':'Double'}.get(strat.action(tot, soft, up, True), 'Hit')
 
         # Base surrender if no index forces another action (and not 8,8)
         first_two = (len(ranks) == 2)
         if action in ('Hit','Stand','Double') and self.ls_var.get() and first_two and not soft and not (ranks[0]=='8' and ranks[1]=='8'):
             if (tot == 16 and up in ('9','T','J','Q','K','A')) or (tot == 15 and up == 'T'):
                 action = 'Surrender'
-        self.advice_base.set(f"Action (base + indices): {action}  |  (TC Hi-Lo={tc_floor:+d})")
+        return action
 
     def compare_btn(self):
         hand_txt = getattr(self, "hand_entry").get().strip()
@@ -926,15 +752,86 @@ class ProApp:
         if (('T' if ranks[0] in TEN_RANKS else ranks[0]) == ('T' if ranks[1] in TEN_RANKS else ranks[1])): actions.append('SPLIT')
         if rules["LS"] and not (ranks[0]=='8' and ranks[1]=='8'): actions.append('SURRENDER')
 
-        results = {}
-        for a in actions:
-            ev = simulate_fixed_action(rem, rules, ranks, up, hands=hands, seed=random.randrange(1,10_000_000),
-                                       tc_floor=tc_floor, apply_idx=apply_idx, force=a)
-            results[a]=ev
-
-        best = max(results, key=lambda k: results[k])
-        parts = [f"{a}: {results[a]:+5.2f}%" for a in ['STAND','HIT','DOUBLE','SPLIT','SURRENDER'] if a in results]
-        self.advice_sim.set(f"EV comparison (%):  " + "   |   ".join(parts) + f"   →  Recommended: {best}")
+        order = ['STAND','HIT','DOUBLE','SPLIT','SURRENDER']
+        mode = "simulated" if self.compare_mc_var.get() else "exact"
+        key = spot_key("compare", ranks, up, rem, rules, mode, *((tc_floor, apply_idx, hands) if mode == "simulated" else ()))
+        def show(results, final, memo=False):
+            parts = [f"{a}: {results[a]:+5.2f}%" if a in results else f"{a}: …" for a in order if a in actions]
+            text = f"EV comparison (%, {mode}{', memo' if memo else ''}):  " + "   |   ".join(parts)
+            if final and results:
+                text += f"   →  Recommended: {max(results, key=lambda k: results[k])}"
+            self.advice_sim.set(text)
+            self.memo_var.set(f"Memo: {self.memo.summary()}")
+        def done(results):
+            if len(results) == len(actions):   # a cancelled run is not an answer
+                self.memo.put(key, results)
+            show(results, True)
+        cached = self.memo.get(key)
+        if cached is not None:
+            self.quick_jobs.cancel("compare", supersede=True)
+            show(cached, True, memo=True); return
+        if mode == "simulated":
+            workers = self.workers(); seed = random.randrange(1,10_000_000)
+            def run(job):
+                # all actions share the pool; each EV is shown as soon as its runs are in
+                results = {}
+                for a, ev in simulate_actions(rem, rules, ranks, up, actions, hands=hands, seed=seed,
+                                              tc_floor=tc_floor, apply_idx=apply_idx, workers=workers):
+                    if job.cancelled(): break
+                    results[a] = ev
+                    self.quick_jobs.deliver(job, show, dict(results), False)
+                return results
+        else:
+            def run(job):
+                return exact_action_evs(rem, rules, ranks, up, actions=actions)
+        show({}, False)
+        self.quick_jobs.submit("compare", run, version=self.state_version(), on_done=done,
+                               on_drop=lambda: self.advice_sim.set("EV comparison: discarded (shoe or rules changed)"))
+
+    # ---- strategy chart ----
+    CHART_COLORS = {'S': "#f3df86", 'H': "#ffffff", 'D': "#a9dfa3", 'P': "#a7cbf2", 'R': "#d4d4d4"}
+
+    def chart_btn(self):
+        rules = self.current_rules(); rem = self.remaining_counts(); workers = self.workers()
+        if sum(rem.values()) < 20:
+            messagebox.showerror("Strategy chart", "Not enough cards."); return
+        status = self.chart_window()
+        status.set("Chart: queued…" if self.jobs.busy() and not self.jobs.busy("chart") else "Chart: computing every cell exactly…")
+        self.jobs.submit("chart", lambda job: strategy_chart(rem, rules, workers=workers), version=self.state_version(),
+                         on_done=self.show_chart, on_drop=lambda: status.set("Chart: discarded (shoe or rules changed)"))
+
+    def chart_window(self):
+        """The chart Toplevel (built once, re-shown when closed); returns its status variable."""
+        if self.chart_win is not None and self.chart_win.winfo_exists():
+            self.chart_win.deiconify(); self.chart_win.lift()
+            return self.chart_status
+        win = self.chart_win = tk.Toplevel(self.root); win.title("Strategy chart (current shoe)")
+        self.chart_status = tk.StringVar(value="")
+        ttk.Label(win, textvariable=self.chart_status).grid(row=0, column=0, columnspan=11, sticky="w", padx=6, pady=(6,2))
+        ttk.Label(win, text="Best play (S/H/D/P/R) and its EV margin over the next best, in %.  "
+                            "Red * = not basic strategy.", foreground="#666666").grid(row=1, column=0, columnspan=11, sticky="w", padx=6)
+        for j, up in enumerate(RANKS10):
+            ttk.Label(win, text=DISPLAY[up], anchor="center").grid(row=2, column=j+1, sticky="we")
+        self.chart_cells = {}
+        for i, (kind, row) in enumerate(chart_rows()):
+            ttk.Label(win, text=row_label(kind, row)).grid(row=i+3, column=0, sticky="w", padx=(6,4))
+            for j, up in enumerate(RANKS10):
+                cell = tk.Label(win, text="", width=8, relief="groove", font=("TkFixedFont", 9))
+                cell.grid(row=i+3, column=j+1, sticky="nsew")
+                self.chart_cells[(kind, row, up)] = cell
+        return self.chart_status
+
+    def show_chart(self, chart):
+        status = self.chart_window()
+        for key, label in self.chart_cells.items():
+            c = chart.get(key)
+            if c is None:
+                label.configure(text="—", bg="#eeeeee", fg="#999999"); continue
+            label.configure(text=f"{c['best']}{'*' if c['differs'] else ' '}{c['margin']:5.2f}",
+                            bg=self.CHART_COLORS[c['best']], fg="#c0392b" if c["differs"] else "#222222")
+        n = sum(c["differs"] for c in chart.values())
+        status.set(f"Chart: {len(chart)} cells, {n} differ from basic strategy "
+                   f"(TC Hi-Lo {math.floor(self.compute_running(HI_LO)/self.decks_remaining()):+d})")
 
 # ---- parsing main text ----
 def parse_hand_text(s):
@@ -0,0 +1,13 @@
+"""Strategy chart cells offer the same actions as the Advisor and Compare."""
+
+from blackjack_core.chart import _chart_column, basic_play
+from blackjack_core.cli import parse_rules
+from blackjack_core.counting import shoe_counts
+from blackjack_core.dealer import RANKS10, comp10
+
+def test_no_surrender_of_eights():
+    rules = parse_rules("LS")
+    col = _chart_column(comp10(shoe_counts(6)), rules, RANKS10.index('T'))
+    assert 'R' not in col[("pair", '8')]
+    assert 'R' in col[("hard", 16)]
+    assert basic_play("pair", '8', 'T', rules) == 'P'
@@ -0,0 +1,30 @@
+"""play_hand follows the compiled strategy, index plays included."""
+
+import random
+
+import pytest
+
+from blackjack_core.cards import Hand, Shoe
+from blackjack_core.cli import parse_rules
+from blackjack_core.counting import shoe_counts
+from blackjack_core.play import play_hand
+from blackjack_core.strategy import INDEX_ALWAYS, IndexTable, compile_strategy
+
+@pytest.mark.parametrize("cards, up, action", [(('T', '6'), 'T', 'S'), (('T', '3'), '2', 'H')])
+def test_stand_hit_index_decides_first_move(cards, up, action):
+    """An index standing 16 vs T never draws; one hitting 13 vs 2 always does."""
+    rules = parse_rules("LS=0")   # keep surrender out of the way
+    table = IndexTable("check", [(Hand(cards).total, False, up, action, True, INDEX_ALWAYS)])
+    strat = compile_strategy(rules, indices=table)
+    rnd = random.Random(1)
+    for _ in range(1000):
+        p = Hand(cards)
+        play_hand(p, up, None, Shoe(shoe_counts(6)), rules, rnd, 0, True, strat=strat)
+        assert (p.n == 2) == (action == 'S')
+
+def test_basic_surrender_ahead_of_stand_index():
+    rules = parse_rules("LS")
+    rnd = random.Random(2)
+    for tc in (0, 5, 10):
+        ev = play_hand(Hand(('T', '6')), 'T', None, Shoe(shoe_counts(6)), rules, rnd, tc, True)
+        assert ev == -0.5
@@ -0,0 +1,51 @@
+"""Compiled strategy tables against the strategy functions they are built from."""
+
+import pytest
+
+from blackjack_core.cards import CARD_ORDER
+from blackjack_core.cli import parse_rules
+from blackjack_core.strategy import (INDEX_ALWAYS, IndexTable, StrategyTables, apply_indices_override,
+                                     hard_action, should_split, soft_action)
+
+RULE_SETS = ["", "S17", "DAS=0,LS=0", "D10,ENHC,OBO", "HSA,RSA=0,DOS=0"]
+
+def check_tables(st, rules, indices=None):
+    """Every table cell equals the function it caches, including TCs past the bucket
+    range (so clamping is exact)."""
+    override = apply_indices_override if indices is None else indices.override
+    for up in CARD_ORDER:
+        for r in CARD_ORDER:
+            assert st.split(r, up) == should_split(r, up, rules), (r, up)
+        for cd in (False, True):
+            for soft in (False, True):
+                act = soft_action if soft else hard_action
+                for t in range(32):
+                    assert st.action(t, soft, up, cd) == act(t, up, rules, cd), (t, soft, up, cd)
+                    for tc in range(st.tc_min - 4, st.tc_max + 5):
+                        for ft in (False, True):
+                            assert st.override(t, soft, up, ft, cd, tc) == override(t, soft, up, ft, cd, tc, rules), \
+                                (t, soft, up, ft, cd, tc)
+
+@pytest.mark.parametrize("text", RULE_SETS)
+def test_builtin_indices(text):
+    rules = parse_rules(text)
+    check_tables(StrategyTables(rules), rules)
+
+@pytest.mark.parametrize("text", RULE_SETS)
+def test_index_table(text):
+    rules = parse_rules(text)
+    table = IndexTable("Hi-Lo", [(16, False, 'T', 'S', True, 0), (15, False, 'T', 'SUR', False, -2),
+                                 (13, False, '2', 'H', False, -1), (10, False, 'A', 'D', True, 3),
+                                 (19, True, '6', 'D', True, 1), (12, False, '4', 'H', True, INDEX_ALWAYS)])
+    check_tables(StrategyTables(rules, table), rules, table)
+
+def test_basic_surrender_ahead_of_stand_index():
+    rules = parse_rules("LS")
+    for up in ('9', 'T', 'A'):
+        for tc in range(-8, 12):
+            assert apply_indices_override(16, False, up, True, True, tc, rules) is None
+
+@pytest.mark.parametrize("entry", [(16, False, 'X', 'S', True, 0), (16, False, 'T', 'Z', True, 0), (30, False, 'T', 'S', True, 0)])
+def test_index_table_rejects_bad_entries(entry):
+    with pytest.raises(ValueError):
+        IndexTable("Hi-Lo", [entry])
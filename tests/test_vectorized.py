@@ -0,0 +1,32 @@
+"""The NumPy engine plays the same game as the Python one, index plays included."""
+
+import math
+
+import pytest
+
+from blackjack_core.cli import parse_rules
+from blackjack_core.simulate import simulate_ev
+
+pytest.importorskip("numpy")
+from blackjack_core.vectorized import simulate_ev_np  # noqa: E402
+
+# (rules, shoe, TC floor): small shoes on which the named play is frequent and, for the
+# index plays, changes the EV by several SE at that TC (no built-in index splits: the
+# split case checks the pair table)
+CASES = {
+    "stand":     ("LS=0", {'T': 200, '6': 100}, 0),                     # 16 vs T
+    "hit":       ("",     {'T': 120, '3': 100, '2': 80}, -3),           # 13 vs 2/3, 12 vs 4/5/6
+    "double":    ("",     {'T': 100, '4': 100, '6': 100}, 4),           # 10 vs T
+    "split":     ("",     {'8': 100, '9': 80, 'T': 60, '7': 40}, 0),
+    "surrender": ("",     {'T': 150, '5': 60, '4': 60, '9': 40}, 3),    # 14 vs T, 15 vs 9
+}
+
+@pytest.mark.parametrize("name", list(CASES))
+def test_numpy_matches_python(name):
+    text, rem, tc = CASES[name]
+    rules = parse_rules(text)
+    n_py, n_np = 40_000, 200_000
+    py, var_py = simulate_ev(rem, rules, hands=n_py, seed=7, tc_floor=tc)
+    vec, var_np = simulate_ev_np(rem, rules, hands=n_np, seed=7, tc_floor=tc)
+    se = 100.0*math.sqrt(var_py/n_py + var_np/n_np)
+    assert abs(py - vec) < 4*se, f"{name}: Python {py:+.2f}%, NumPy {vec:+.2f}% (SE {se:.2f})"